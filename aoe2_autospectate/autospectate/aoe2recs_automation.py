@@ -1,10 +1,14 @@
 # Create new file: aoe2recs_automation.py
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import re
 import time
 import logging
 import random
 
+from config import AOE2RECS_DASHBOARD_URL
+from match_scoring import MatchScorer
+
 def find_and_spectate_aoe2recs(playwright, config):
     """
     Navigate to AoE2 Recs Dashboard and find a good match to spectate.
@@ -16,7 +20,7 @@ def find_and_spectate_aoe2recs(playwright, config):
         page = context.new_page()
         
         # Go to the dashboard
-        dashboard_url = "https://aoe2recs.com/dashboard/"
+        dashboard_url = config.get('dashboard_url', AOE2RECS_DASHBOARD_URL)
         page.goto(dashboard_url)
         print(f"Navigated to {dashboard_url}")
         
@@ -78,78 +82,59 @@ def find_and_spectate_aoe2recs(playwright, config):
         print(f"Error during aoe2recs automation: {e}")
         return False, {}
 
-def find_best_match_aoe2recs(page, spectate_elements, config):
+def find_best_match_aoe2recs(page, spectate_elements, config, scorer=None):
     """
     Find the best match based on your preferences.
-    This is where you can implement "crowd favorites" logic.
+    Each element's surrounding text becomes a candidate for the shared MatchScorer,
+    so crowd favorites, rating and map preferences are weighed the same way as
+    companion matches.
     """
+    if scorer is None:
+        scorer = MatchScorer(
+            min_rating=config.get('min_rating', 2000),
+            preferred_maps=config.get('preferred_maps', ()),
+            avoid_maps=config.get('avoid_maps', ["arena", "fortress"]),
+            crowd_favorites=config.get('crowd_favorites'),
+            source="aoe2recs",
+        )
     
-    # Define your favorite players (you can expand this list)
-    crowd_favorites = [
-        "hera", "viper", "liereyy", "tatoh", "daut", "jordan23", "villese",
-        "hearttt", "modri", "slam", "capoch", "f1re", "miguelito", "barles"
-    ]
-    
-    # Define minimum rating threshold
-    min_rating = config.get('min_rating', 2000)
-    
-    best_match = None
-    best_score = 0
-    
-    for element in spectate_elements:
+    candidates = []
+    for index, element in enumerate(spectate_elements):
         try:
             # Get the text content around this element to analyze
             # This will need adjustment based on actual page structure
             parent = element.locator("xpath=../..")  # Get parent container
-            match_text = parent.text_content().lower()
-            
-            score = 0
-            
-            # Check for favorite players
-            for favorite in crowd_favorites:
-                if favorite.lower() in match_text:
-                    score += 100  # High bonus for favorites
-                    print(f"Found favorite player: {favorite}")
-            
-            # Check for high ratings (this logic will need refinement)
-            # Look for numbers that might be ratings
-            import re
-            ratings = re.findall(r'\b([2-3]\d{3})\b', match_text)  # Find 2000-3999 range
-            if ratings:
-                avg_rating = sum(int(r) for r in ratings) / len(ratings)
-                if avg_rating >= min_rating:
-                    score += int((avg_rating - min_rating) / 10)  # Bonus for higher rating
-                    print(f"Found high-rated match: {avg_rating}")
-            
-            # Prefer 1v1 matches (adjust based on your preference)
-            if "1v1" in match_text or "1 v 1" in match_text:
-                score += 20
-                print("Found 1v1 match")
-            
-            # Avoid certain maps if you want (example)
-            bad_maps = ["arena", "fortress"]  # Adjust based on your preferences
-            for bad_map in bad_maps:
-                if bad_map in match_text:
-                    score -= 30
-                    print(f"Penalized for map: {bad_map}")
-            
-            if score > best_score:
-                best_score = score
-                best_match = element
-                print(f"New best match found with score: {score}")
-        
+            candidates.append(aoe2recs_candidate(parent.text_content(), index))
         except Exception as e:
             print(f"Error analyzing match element: {e}")
             continue
     
-    if best_match:
-        print(f"Selected match with score: {best_score}")
-    else:
-        # Fallback: just pick the first match
-        print("No scored matches found, using first available")
-        best_match = spectate_elements[0] if spectate_elements else None
+    ranked = scorer.rank(candidates)
+    if ranked:
+        best = ranked[0]
+        print(f"Selected match with score: {best['score']:.2f} ({best['features']})")
+        return spectate_elements[best['element_index']]
     
-    return best_match
+    # Fallback: just pick the first match
+    print("No scored matches found, using first available")
+    return spectate_elements[0] if spectate_elements else None
+
+
+def aoe2recs_candidate(match_text, index):
+    """Turn a dashboard match's text into a candidate dict for MatchScorer"""
+    text = match_text.lower()
+    # Look for numbers that might be ratings
+    ratings = [int(r) for r in re.findall(r'\b([1-3]\d{3})\b', text)]
+    is_1v1 = "1v1" in text or "1 v 1" in text or len(ratings) == 2
+    return {
+        'element_index': index,
+        'text': text,
+        'mode': 'AUTOMATCH',  # The dashboard only lists ranked games
+        'is_1v1': is_1v1,
+        'player_count': 2 if is_1v1 else len(ratings),
+        'rating': int(sum(ratings) / len(ratings)) if ratings else 0,
+        'elos': [str(r) for r in ratings[:2]],
+    }
 
 def extract_match_info_aoe2recs(page, match_element):
     """
@@ -219,5 +204,6 @@ def create_aoe2recs_config():
         'preferred_maps': ["arabia", "arena", "black forest"],
         'avoid_maps': ["nomad", "migration"],
         'prefer_1v1': True,
-        'max_game_time': 5  # Don't spectate games longer than 20 minutes
+        'max_game_time': 5,  # Don't spectate games longer than 20 minutes
+        'dashboard_url': AOE2RECS_DASHBOARD_URL
     }
\ No newline at end of file
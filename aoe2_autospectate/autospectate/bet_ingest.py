@@ -0,0 +1,181 @@
+# autospectate/bet_ingest.py
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from betting_records import Bet, BettingPool
+from chat_scheduler import PRIORITY_HIGH, PRIORITY_NORMAL
+
+
+@dataclass(slots=True)
+class BetRequest:
+    user_id: str
+    username: str
+    amount: int
+    team: str  # 'Blue' or 'Red'
+    received_at: float
+
+
+class BetIngestor:
+    """Queues parsed !bet commands and applies them in validated batches.
+
+    One consumer task drains the queue, so bets are applied strictly in
+    arrival order and a user can never have two bets validated at once.
+    Each batch is applied without awaiting, so close_betting/resolve_bets
+    never see a half-applied batch. Pool totals are kept incrementally by
+    BettingPool.add_bet, and the odds are announced at a fixed cadence
+    rather than in every confirmation.
+    """
+
+    def __init__(self, get_pool: Callable[[], Optional[BettingPool]], get_balance: Callable[[str], int],
+                 debit: Callable[[BetRequest], None], notify: Callable[[str, int], None],
+                 on_batch_applied: Optional[Callable[[], None]] = None,
+                 max_batch: int = 500, batch_window: float = 0.2, snapshot_interval: float = 20.0):
+        self.get_pool = get_pool
+        self.get_balance = get_balance
+        self.debit = debit
+        self.notify = notify
+        self.on_batch_applied = on_batch_applied
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.snapshot_interval = snapshot_interval
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._snapshotter: Optional[asyncio.Task] = None
+        self._last_snapshot_version: Dict[int, int] = {}
+
+        self.stats = {'submitted': 0, 'accepted': 0, 'rejected': 0, 'batches': 0,
+                      'largest_batch': 0, 'max_latency_ms': 0.0}
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def start(self):
+        """Start the batch worker and odds snapshot task. Must be called from the loop."""
+        loop = asyncio.get_running_loop()
+        self._get_queue()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        if self._snapshotter is None or self._snapshotter.done():
+            self._snapshotter = loop.create_task(self._snapshot_loop())
+
+    def submit(self, request: BetRequest):
+        """Queue a bet; validation happens when its batch is applied"""
+        self.stats['submitted'] += 1
+        self._get_queue().put_nowait(request)
+
+    async def flush(self):
+        """Wait until every queued bet has been applied"""
+        queue = self._get_queue()
+        if self._worker is None or self._worker.done():
+            # No worker running (e.g. scripts): apply inline
+            batch = []
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                self.apply_batch(batch)
+                for _ in batch:
+                    queue.task_done()
+            return
+        await queue.join()
+
+    async def stop(self):
+        """Apply what is queued, then stop the background tasks"""
+        if self._worker and not self._worker.done():
+            await self.flush()
+        for task in (self._worker, self._snapshotter):
+            if task and not task.done():
+                task.cancel()
+        self._worker = None
+        self._snapshotter = None
+
+    async def _run(self):
+        queue = self._get_queue()
+        while True:
+            batch = [await queue.get()]
+            # Short window so a chat burst lands in one batch; skipped when already backlogged
+            if self.batch_window > 0 and queue.qsize() < self.max_batch:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                self.apply_batch(batch)
+            except Exception as e:
+                logging.error(f"Error applying bet batch: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def apply_batch(self, batch: List[BetRequest]) -> int:
+        """Validate and apply a batch synchronously. Returns the number of accepted bets."""
+        pool = self.get_pool()
+        accepted = 0
+        now = time.time()
+
+        for request in batch:
+            error = self._validate(pool, request)
+            if error:
+                self.stats['rejected'] += 1
+                self.notify(error, PRIORITY_HIGH)
+                continue
+
+            pool.add_bet(Bet(
+                user_id=request.user_id,
+                username=request.username,
+                amount=request.amount,
+                team=request.team,
+                timestamp=now
+            ))
+            self.debit(request)
+            accepted += 1
+            self.notify(f"@{request.username} bet {request.amount} on {request.team}", PRIORITY_HIGH)
+
+            latency_ms = (now - request.received_at) * 1000
+            self.stats['max_latency_ms'] = max(self.stats['max_latency_ms'], latency_ms)
+
+        self.stats['accepted'] += accepted
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+        if accepted and self.on_batch_applied:
+            self.on_batch_applied()
+        return accepted
+
+    def _validate(self, pool: Optional[BettingPool], request: BetRequest) -> Optional[str]:
+        if not pool or not pool.is_active:
+            return f"@{request.username} No active betting round!"
+        if request.user_id in pool.bets:
+            return f"@{request.username} You already placed a bet this round!"
+        current_points = self.get_balance(request.user_id)
+        if current_points < request.amount:
+            return f"@{request.username} Not enough salt! You have {current_points}"
+        return None
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            pool = self.get_pool()
+            if not pool or not pool.is_active:
+                continue
+            # Only announce when something changed since the last snapshot of this pool
+            if self._last_snapshot_version.get(id(pool)) == pool.version:
+                continue
+            self._last_snapshot_version = {id(pool): pool.version}
+            self.notify(format_pool_summary(pool), PRIORITY_NORMAL)
+
+
+def format_pool_summary(pool: BettingPool) -> str:
+    """One-line pool and odds summary built from the running aggregates"""
+    blue_odds, red_odds = pool.odds()
+    return (
+        f"Current Pool: {pool.total:,} 🧂 | "
+        f"Blue: {pool.total_blue:,} (x{blue_odds:.2f}) [{pool.blue_bettors} betters] | "
+        f"Red: {pool.total_red:,} (x{red_odds:.2f}) [{pool.red_bettors} betters]"
+    )
@@ -1,46 +1,18 @@
 import asyncio
 from twitchio.ext import commands
 import json
-from dataclasses import dataclass, asdict
+import os
 from typing import Dict, List, Optional
 import time
 import logging
 import random
-import os
-import shutil
+from betting_records import Bet, BettingPool, Player
 from civ_manager import CivilizationManager
-
-@dataclass
-class Bet:
-    user_id: str
-    username: str
-    amount: int
-    team: str
-    timestamp: float
-
-@dataclass
-class BettingPool:
-    is_active: bool
-    total_blue: int
-    total_red: int
-    bets: Dict[str, Bet]
-    start_time: float
-    end_time: Optional[float]
-
-
-@dataclass
-class Player:
-    user_id: str
-    username: str
-    points: int = 500  # Default starting amount
-    age: str = "Dark"
-    biggest_win: int = 0
-    biggest_loss: int = 0
-    biggest_bet: int = 0
-    total_bets: int = 0
-    wins: int = 0
-    losses: int = 0
-    last_updated: float = time.time()  # Timestamp
+from persistence import PersistenceService, atomic_write_bytes
+from leaderboard_index import LeaderboardIndex
+from chat_scheduler import ChatScheduler, PRIORITY_HIGH, PRIORITY_LOW
+from bet_ingest import BetIngestor, BetRequest, format_pool_summary
+from player_snapshot import encode_snapshot, load_snapshot, save_snapshot
 
 
 class HouseBetting:
@@ -97,16 +69,46 @@ class BettingBot(commands.Bot):
             initial_channels=[channel]
         )
         self.channel = channel
+        # All chat output goes through the rate-limited, coalescing scheduler
+        self.chat = ChatScheduler(lambda: self.get_channel(self.channel))
         self.claim_cooldowns = {}  # Track when users last claimed
         self.claim_cooldown_time = 1800  # 30 minutes in seconds
-        self.points_file = 'user_points.json'
+        self.points_file = 'user_points.json'  # Legacy format, read if no snapshot exists
+        self.snapshot_file = 'user_points.bin'
         self.user_points = self.load_points()
+        self.leaderboard = LeaderboardIndex()
+        self.leaderboard.rebuild(self.user_points)
         self._tasks = set()
-        self.civ_manager = CivilizationManager()
+
+        # Writes are coalesced and done off the event loop
+        self.save_delay = 2.0  # seconds
+        self.persistence = PersistenceService(flush_delay=self.save_delay)
+        self.persistence.register(
+            'points', self.snapshot_file, self._points_snapshot,
+            writer=lambda path, data: atomic_write_bytes(path, data, backup=True)
+        )
+        self.civ_manager = CivilizationManager(persistence=self.persistence)
         self.betting_pool = None
+
+        # !bet commands are queued and applied in batches
+        self.bet_ingestor = BetIngestor(
+            get_pool=lambda: self.betting_pool,
+            get_balance=self.get_player_points,
+            debit=self._debit_bet,
+            notify=self.chat.send,
+            on_batch_applied=self.schedule_save
+        )
         logging.info(f"BettingBot initialized for channel: {channel}")
 
     def load_points(self) -> Dict[str, Player]:
+        if os.path.exists(self.snapshot_file):
+            try:
+                players = load_snapshot(self.snapshot_file)
+                logging.info(f"Loaded {len(players)} players from {self.snapshot_file}")
+                return players
+            except Exception as e:
+                logging.error(f"Error loading point snapshot, falling back to JSON: {e}")
+
         try:
             with open(self.points_file, 'r') as f:
                 data = json.load(f)
@@ -140,35 +142,18 @@ class BettingBot(commands.Bot):
         except FileNotFoundError:
             return {}
 
-    def save_points(self):
-        """Save points with verification and backup"""
-        try:
-            # Create backup of current file if it exists
-            if os.path.exists(self.points_file):
-                backup_file = f"{self.points_file}.backup"
-                shutil.copy2(self.points_file, backup_file)
-
-            # Convert Player objects to dictionaries
-            data_to_save = {}
-            for user_id, player in self.user_points.items():
-                if isinstance(player, Player):
-                    data_to_save[user_id] = asdict(player)
-                else:
-                    # Handle old data format for compatibility
-                    data_to_save[user_id] = player
-            
-            # Save new data
-            with open(self.points_file, 'w') as f:
-                json.dump(data_to_save, f, indent=2)
+    def _points_snapshot(self) -> bytes:
+        """Encode the player table on the loop so the write sees a consistent copy"""
+        return encode_snapshot(self.user_points)
 
-            # Verify save
-            with open(self.points_file, 'r') as f:
-                saved_data = json.load(f)
-                # Basic verification
-                if len(saved_data) != len(self.user_points):
-                    logging.error("Point save verification failed!")
-                    return False
+    def schedule_save(self):
+        """Mark points dirty; the persistence service writes them shortly after"""
+        self.persistence.mark_dirty('points')
 
+    def save_points(self):
+        """Save points immediately (blocking) with an atomic write and backup"""
+        try:
+            save_snapshot(self.snapshot_file, self.user_points, backup=True)
             logging.info(f"Points saved successfully. Active users: {len(self.user_points)}")
             return True
 
@@ -186,6 +171,20 @@ class BettingBot(commands.Bot):
             return player.points
         return player  # Old format
 
+    def sync_leaderboard(self, user_id):
+        """Re-index a player after their entry in user_points changed"""
+        player = self.user_points.get(user_id)
+        if isinstance(player, Player):
+            self.leaderboard.update(user_id, player.points)
+        else:
+            self.leaderboard.discard(user_id)
+
+    def adjust_points(self, player: Player, amount: int):
+        """Add (or subtract) points and keep the leaderboard index in sync"""
+        player.points += amount
+        player.last_updated = time.time()
+        self.leaderboard.update(player.user_id, player.points)
+
     def update_player_points(self, user_id, username, amount):
         """Update player points with tracking"""
         if user_id not in self.user_points:
@@ -193,9 +192,8 @@ class BettingBot(commands.Bot):
         else:
             player = self.user_points[user_id]
             if isinstance(player, Player):
-                player.points = max(0, player.points + amount)
                 player.username = username  # Always update username
-                player.last_updated = time.time()
+                self.adjust_points(player, max(-player.points, amount))
             else:
                 # Convert to new format
                 new_points = max(0, player + amount)
@@ -204,6 +202,7 @@ class BettingBot(commands.Bot):
                     username=username,
                     points=new_points
                 )
+        self.sync_leaderboard(user_id)
 
 
     def track_bet(self, user_id, username, amount, team):
@@ -263,27 +262,25 @@ class BettingBot(commands.Bot):
         house_blue = HouseBetting.get_bet_amount()
         house_red = HouseBetting.get_bet_amount()
         
-        self.betting_pool.bets['house_blue'] = Bet(
+        self.betting_pool.add_bet(Bet(
             user_id='house_blue',
             username='SaltCasino',
             amount=house_blue,
             team='Blue',
             timestamp=time.time()
-        )
-        self.betting_pool.bets['house_red'] = Bet(
+        ))
+        self.betting_pool.add_bet(Bet(
             user_id='house_red',
             username='SaltCasino',
             amount=house_red,
             team='Red',
             timestamp=time.time()
-        )
-        
-        self.betting_pool.total_blue += house_blue
-        self.betting_pool.total_red += house_red
+        ))
 
         announcement = HouseBetting.get_announcement(house_blue, house_red)
-        await self.get_channel(self.channel).send(
-            f"Betting is now open for {duration} seconds! {announcement} Use !bet <amount> blue/red"
+        self.chat.send(
+            f"Betting is now open for {duration} seconds! {announcement} Use !bet <amount> blue/red",
+            PRIORITY_HIGH
         )
         
 
@@ -291,8 +288,9 @@ class BettingBot(commands.Bot):
         await asyncio.sleep(duration - 30)
         if self.betting_pool and self.betting_pool.is_active:
             total_pool = self.betting_pool.total_blue + self.betting_pool.total_red
-            await self.get_channel(self.channel).send(
-                f"⚠️ 30 SECONDS LEFT TO BET! Current pool: {total_pool} 🧂 (Blue: {self.betting_pool.total_blue}, Red: {self.betting_pool.total_red})"
+            self.chat.send(
+                f"⚠️ 30 SECONDS LEFT TO BET! Current pool: {total_pool} 🧂 (Blue: {self.betting_pool.total_blue}, Red: {self.betting_pool.total_red})",
+                PRIORITY_HIGH
             )
 
         await asyncio.sleep(55)
@@ -303,25 +301,32 @@ class BettingBot(commands.Bot):
         if not self.betting_pool or not self.betting_pool.is_active:
             return False
 
+        # Apply bets that arrived before the deadline
+        await self.bet_ingestor.flush()
+
         self.betting_pool.is_active = False
         self.betting_pool.end_time = time.time()
 
         total_pool = self.betting_pool.total_blue + self.betting_pool.total_red
-        await self.get_channel(self.channel).send(
+        self.chat.send(
             f"Betting closed! Total pool: {total_pool} points "
-            f"(Blue: {self.betting_pool.total_blue}, Red: {self.betting_pool.total_red})"
+            f"(Blue: {self.betting_pool.total_blue}, Red: {self.betting_pool.total_red})",
+            PRIORITY_HIGH
         )
         return True
 
     async def event_ready(self):
         logging.info(f"Bot ready | {self.nick}")
+        self.persistence.start()
+        self.chat.start()
+        self.bet_ingestor.start()
         channel = self.get_channel(self.channel)
         if channel:
-            await channel.send("Salt Casino Online! Use !bet <amount> <blue/red> to place bets!")
+            self.chat.send("Salt Casino Online! Use !bet <amount> <blue/red> to place bets!", PRIORITY_LOW)
 
     async def event_channel_joined(self, channel):
         logging.info(f"Joined channel: {channel.name}")
-        await channel.send("Betting Starts when spectator scene switches, and is open for 3 minutes")
+        self.chat.send("Betting Starts when spectator scene switches, and is open for 3 minutes", PRIORITY_LOW)
 
     async def event_message(self, message):
         if message.echo:
@@ -336,10 +341,13 @@ class BettingBot(commands.Bot):
     @commands.command(name='ages')
     async def ages_command(self, ctx):
         """Display age advancement information"""
-        await ctx.send("🏰 AGE ADVANCEMENT 🏰")
-        await ctx.send("Dark Age → Feudal Age (1000 salt): Better pound (50-240) and faster cooldown (27 min)")
-        await ctx.send("Feudal Age → Castle Age (2000 salt): Better pound (60-280) and faster cooldown (24 min)")
-        await ctx.send("Castle Age → Imperial Age (5000 salt): Best pound (80-350) and fastest cooldown (20 min)")
+        self.chat.send(
+            "🏰 AGE ADVANCEMENT 🏰\n"
+            "Dark Age → Feudal Age (1000 salt): Better pound (50-240) and faster cooldown (27 min)\n"
+            "Feudal Age → Castle Age (2000 salt): Better pound (60-280) and faster cooldown (24 min)\n"
+            "Castle Age → Imperial Age (5000 salt): Best pound (80-350) and fastest cooldown (20 min)",
+            PRIORITY_LOW
+        )
 
     @commands.command(name='pound')
     async def claim_command(self, ctx):
@@ -366,7 +374,7 @@ class BettingBot(commands.Bot):
             time_since_last = current_time - self.claim_cooldowns[user_id]
             if time_since_last < modified_cooldown:
                 minutes_left = int((modified_cooldown - time_since_last) / 60)
-                await ctx.send(f"@{ctx.author.name} You can claim more salt in {minutes_left} minutes!")
+                self.chat.send(f"@{ctx.author.name} You can claim more salt in {minutes_left} minutes!")
                 return
 
         # If user is new, give starting amount
@@ -377,26 +385,27 @@ class BettingBot(commands.Bot):
                 points=500,
                 age="Dark"
             )
-            await ctx.send(f"@{ctx.author.name} Welcome! You received 500 pounds of starting salt!")
+            self.sync_leaderboard(user_id)
+            self.chat.send(f"@{ctx.author.name} Welcome! You received 500 pounds of starting salt!")
         else:
             # Give random amount based on age
             min_amount = age_benefits[player_age]["min"]
             max_amount = age_benefits[player_age]["max"]
             claim_amount = random.randint(min_amount, max_amount)
             
-            player.points += claim_amount
-            await ctx.send(f"@{ctx.author.name} You claimed {claim_amount} pounds of salt! You now have {player.points} total!")
+            self.adjust_points(player, claim_amount)
+            self.chat.send(f"@{ctx.author.name} You claimed {claim_amount} pounds of salt! You now have {player.points} total!")
 
         # Update cooldown and save
         self.claim_cooldowns[user_id] = current_time
-        self.save_points()
+        self.schedule_save()
 
 
     @commands.command(name='advance')
     async def advance_command(self, ctx):
         user_id = str(ctx.author.id)
         if user_id not in self.user_points:
-            await ctx.send(f"@{ctx.author.name} You need to claim some salt first!")
+            self.chat.send(f"@{ctx.author.name} You need to claim some salt first!")
             return
             
         player = self.user_points[user_id]
@@ -412,7 +421,7 @@ class BettingBot(commands.Bot):
         
         # Check if already at max age
         if current_age == "Imperial":
-            await ctx.send(f"@{ctx.author.name} You've already reached the Imperial Age!")
+            self.chat.send(f"@{ctx.author.name} You've already reached the Imperial Age!")
             return
         
         # Get advancement details
@@ -421,15 +430,15 @@ class BettingBot(commands.Bot):
         
         # Check if player has enough points
         if player.points < cost:
-            await ctx.send(f"@{ctx.author.name} You need {cost} salt to advance to {next_age} Age. You have {player.points}.")
+            self.chat.send(f"@{ctx.author.name} You need {cost} salt to advance to {next_age} Age. You have {player.points}.")
             return
         
         # Process advancement
-        player.points -= cost
+        self.adjust_points(player, -cost)
         player.age = next_age
-        self.save_points()
+        self.schedule_save()
         
-        await ctx.send(f"🎉 @{ctx.author.name} has advanced to the {next_age} Age! 🎉")
+        self.chat.send(f"🎉 @{ctx.author.name} has advanced to the {next_age} Age! 🎉")
 
 
 
@@ -439,7 +448,7 @@ class BettingBot(commands.Bot):
         logging.info(f"Bet command received - Args: {arg1} {arg2}, User: {ctx.author.name}")
         
         if arg1 is None or arg2 is None:
-            await ctx.send("Usage: !bet <amount> <blue/red>")
+            self.chat.send("Usage: !bet <amount> <blue/red>", PRIORITY_HIGH)
             return
         
         # Determine which parameter is amount and which is team
@@ -458,7 +467,7 @@ class BettingBot(commands.Bot):
                 amount_str = arg2
                 team = arg1.lower()
             except ValueError:
-                await ctx.send("Please provide a valid bet amount and team (blue/red)")
+                self.chat.send("Please provide a valid bet amount and team (blue/red)", PRIORITY_HIGH)
                 return
         
         # Standardize team name (accept variations)
@@ -467,80 +476,42 @@ class BettingBot(commands.Bot):
         elif team in ['red', 'r', 're']:
             team = 'Red'
         else:
-            await ctx.send("Please bet on either 'blue' or 'red'")
+            self.chat.send("Please bet on either 'blue' or 'red'", PRIORITY_HIGH)
             return
         
         # Process amount
         try:
             amount = int(amount_str)
             if amount < 10:
-                await ctx.send(f"@{ctx.author.name} Minimum bet is 10 pounds!")
+                self.chat.send(f"@{ctx.author.name} Minimum bet is 10 pounds!", PRIORITY_HIGH)
                 return
             if amount <= 0:
                 raise ValueError
         except ValueError:
-            await ctx.send("Please provide a valid positive number for your bet")
-            return
-
-        user_id = str(ctx.author.id)
-        
-        # Get current points with compatibility for both formats
-        current_points = 0
-        if user_id in self.user_points:
-            player = self.user_points[user_id]
-            if isinstance(player, Player):
-                current_points = player.points
-            else:
-                current_points = player
-        
-        if current_points < amount:
-            await ctx.send(f"@{ctx.author.name} Not enough salt! You have {current_points}")
-            return
-        
-        if not hasattr(self, 'betting_pool') or not self.betting_pool.is_active:
-            await ctx.send("No active betting round!")
-            return
-            
-        # Check if user already bet this round
-        if user_id in self.betting_pool.bets:
-            await ctx.send(f"@{ctx.author.name} You already placed a bet this round!")
+            self.chat.send("Please provide a valid positive number for your bet", PRIORITY_HIGH)
             return
 
-        team = team.capitalize()
-        if team not in ['Blue', 'Red']:
-            await ctx.send("Please bet on either 'blue' or 'red'")
-            return
-
-        # Create the bet
-        self.betting_pool.bets[user_id] = Bet(
-            user_id=user_id,
+        # Balance, round and duplicate checks happen when the batch is applied
+        self.bet_ingestor.submit(BetRequest(
+            user_id=str(ctx.author.id),
             username=ctx.author.name,
             amount=amount,
             team=team,
-            timestamp=time.time()
-        )
+            received_at=time.time()
+        ))
 
-        # Update totals
-        if team == 'Blue':
-            self.betting_pool.total_blue += amount
-        else:
-            self.betting_pool.total_red += amount
-
-        # Track statistics
-        if isinstance(self.user_points.get(user_id), Player):
-            player = self.user_points[user_id]
+    def _debit_bet(self, request: BetRequest):
+        """Take an accepted bet's stake from the player and track statistics"""
+        player = self.user_points.get(request.user_id)
+        if isinstance(player, Player):
             player.total_bets += 1
-            player.biggest_bet = max(player.biggest_bet, amount)
-            player.points -= amount
-            player.username = ctx.author.name  # Always update username
+            player.biggest_bet = max(player.biggest_bet, request.amount)
+            player.username = request.username  # Always update username
+            self.adjust_points(player, -request.amount)
         else:
             # Old format - just update points
-            self.user_points[user_id] = current_points - amount
-
-        self.save_points()
-
-        pool_total = getattr(self.betting_pool, f"total_{team.lower()}")
-        await ctx.send(f"@{ctx.author.name} bet {amount} pounds of salt on {team}! Total {team} pool: {pool_total}")
+            self.user_points[request.user_id] = self.get_player_points(request.user_id) - request.amount
+            self.sync_leaderboard(request.user_id)
 
 
     async def resolve_bets(self, winner: str):
@@ -558,9 +529,9 @@ class BettingBot(commands.Bot):
         winning_bets = [bet for bet in self.betting_pool.bets.values() if bet.team == winner]
         losing_bets = [bet for bet in self.betting_pool.bets.values() if bet.team != winner]
         
-        # Send a single summary message first
+        # Summary first; the chat scheduler packs the per-winner lines after it
         if winning_bets:
-            await self.get_channel(self.channel).send(f"Results for {winner} victory:")
+            self.chat.send(f"Results for {winner} victory:")
         
         # Process each winner
         for bet in winning_bets:
@@ -571,7 +542,7 @@ class BettingBot(commands.Bot):
             if isinstance(self.user_points.get(bet.user_id), Player):
                 player = self.user_points[bet.user_id]
                 profit = winnings - bet.amount
-                player.points += winnings
+                self.adjust_points(player, winnings)
                 player.wins += 1
                 player.biggest_win = max(player.biggest_win, profit)
                 player.username = bet.username  # Ensure username is current
@@ -579,9 +550,10 @@ class BettingBot(commands.Bot):
                 # Old format
                 current_points = self.user_points.get(bet.user_id, 0)
                 self.user_points[bet.user_id] = current_points + winnings
+                self.sync_leaderboard(bet.user_id)
             
             # Single announcement per winner
-            await self.get_channel(self.channel).send(
+            self.chat.send(
                 f"@{bet.username} won {winnings} pounds! (Bet: {bet.amount}, Bonus: {int(losing_pool * share)})"
             )
         
@@ -593,7 +565,7 @@ class BettingBot(commands.Bot):
                 player.biggest_loss = max(player.biggest_loss, bet.amount)
 
         # Save updated points
-        self.save_points()
+        self.schedule_save()
         self.betting_pool = None  # Clear betting pool after resolution
         return True
     
@@ -613,47 +585,49 @@ class BettingBot(commands.Bot):
             if isinstance(player, Player):
                 age = player.age
         
-        # Display points with age
-        await ctx.send(f"@{ctx.author.name} [{age} Age] you have {points} pounds of salt!")
+        # Display points with age and leaderboard rank
+        rank = self.leaderboard.rank(user_id)
+        rank_text = f" (Rank #{rank} of {len(self.leaderboard)})" if rank else ""
+        self.chat.send(f"@{ctx.author.name} [{age} Age] you have {points} pounds of salt!{rank_text}")
 
     @commands.command(name='help')
     async def help_command(self, ctx):
         """Show available commands in Twitch-friendly format"""
         
         # Core betting commands
-        await ctx.send("💰 BETTING: !bet <amount> <blue/red> · !mybet · !pool")
+        self.chat.send("💰 BETTING: !bet <amount> <blue/red> · !mybet · !pool", PRIORITY_LOW)
         
         # Age advancement system
-        await ctx.send("🏰 AGES: !pound to claim salt · !salt to check balance · !advance to level up · !ages for info")
+        self.chat.send("🏰 AGES: !pound to claim salt · !salt to check balance · !advance to level up · !ages for info", PRIORITY_LOW)
         
         # Stats and results
-        await ctx.send("📊 STATS: !stats for your stats · !winners · !losers · !leaderboard for rankings")
+        self.chat.send("📊 STATS: !stats for your stats · !winners · !losers · !leaderboard for rankings", PRIORITY_LOW)
         
         # More help
-        await ctx.send("ℹ️ Need more info? Try !helpbet or !helpages for detailed command help")
+        self.chat.send("ℹ️ Need more info? Try !helpbet or !helpages for detailed command help", PRIORITY_LOW)
             
     @commands.command(name='helpages')
     async def help_ages_command(self, ctx):
         """Detailed help for the age advancement system"""
         
-        await ctx.send("🏰 AGE ADVANCEMENT SYSTEM 🏰")
-        await ctx.send("Advance through ages to get better rewards and shorter cooldowns!")
-        await ctx.send("!advance - Level up to the next age (costs salt)")
-        await ctx.send("!ages - View advancement costs and benefits")
-        await ctx.send("!pound - Claim salt (rewards scale with your age)")
-        await ctx.send("!salt - Check your current salt balance")
-        await ctx.send("!stats - View your age, salt, and other statistics")
+        self.chat.send("🏰 AGE ADVANCEMENT SYSTEM 🏰", PRIORITY_LOW)
+        self.chat.send("Advance through ages to get better rewards and shorter cooldowns!", PRIORITY_LOW)
+        self.chat.send("!advance - Level up to the next age (costs salt)", PRIORITY_LOW)
+        self.chat.send("!ages - View advancement costs and benefits", PRIORITY_LOW)
+        self.chat.send("!pound - Claim salt (rewards scale with your age)", PRIORITY_LOW)
+        self.chat.send("!salt - Check your current salt balance", PRIORITY_LOW)
+        self.chat.send("!stats - View your age, salt, and other statistics", PRIORITY_LOW)
 
     @commands.command(name='helpbet')
     async def help_bet_command(self, ctx):
         """Detailed help for betting system"""
         
-        await ctx.send("💰 BETTING SYSTEM 💰")
-        await ctx.send("!bet <amount> <blue/red> - Place a bet (also works as !bet blue 100)")
-        await ctx.send("!mybet - View your current bet and potential winnings")
-        await ctx.send("!pool - See current betting pool sizes and odds")
-        await ctx.send("!winners - See biggest winners from last round")
-        await ctx.send("!losers - See biggest losers from last round")
+        self.chat.send("💰 BETTING SYSTEM 💰", PRIORITY_LOW)
+        self.chat.send("!bet <amount> <blue/red> - Place a bet (also works as !bet blue 100)", PRIORITY_LOW)
+        self.chat.send("!mybet - View your current bet and potential winnings", PRIORITY_LOW)
+        self.chat.send("!pool - See current betting pool sizes and odds", PRIORITY_LOW)
+        self.chat.send("!winners - See biggest winners from last round", PRIORITY_LOW)
+        self.chat.send("!losers - See biggest losers from last round", PRIORITY_LOW)
    
    
    
@@ -661,26 +635,11 @@ class BettingBot(commands.Bot):
     async def pool_command(self, ctx):
         """Show current betting pool information"""
         if not hasattr(self, 'betting_pool') or not self.betting_pool:
-            await ctx.send("No active betting pool!")
+            self.chat.send("No active betting pool!")
             return
         
-        total_pool = self.betting_pool.total_blue + self.betting_pool.total_red
-        
-        # Prevent division by zero
-        blue_odds = (total_pool / self.betting_pool.total_blue) if self.betting_pool.total_blue > 0 else 0
-        red_odds = (total_pool / self.betting_pool.total_red) if self.betting_pool.total_red > 0 else 0
-        
-        # Count unique betters per side (excluding house)
-        blue_betters = sum(1 for bet in self.betting_pool.bets.values() 
-                        if bet.team == 'Blue' and not bet.user_id.startswith('house_'))
-        red_betters = sum(1 for bet in self.betting_pool.bets.values() 
-                        if bet.team == 'Red' and not bet.user_id.startswith('house_'))
-        
-        await ctx.send(
-            f"Current Pool: {total_pool:,} 🧂\n"
-            f"Blue: {self.betting_pool.total_blue:,} (x{blue_odds:.2f}) [{blue_betters} betters]\n"
-            f"Red: {self.betting_pool.total_red:,} (x{red_odds:.2f}) [{red_betters} betters]"
-        )
+        # Totals, odds and bettor counts are maintained incrementally by the pool
+        self.chat.send(format_pool_summary(self.betting_pool))
     
     
     @commands.command(name='mybet')
@@ -689,7 +648,7 @@ class BettingBot(commands.Bot):
         user_id = str(ctx.author.id)
         
         if not hasattr(self, 'betting_pool') or not self.betting_pool:
-            await ctx.send("No active betting pool!")
+            self.chat.send("No active betting pool!")
             return
         
         user_bet = self.betting_pool.bets.get(user_id)
@@ -703,13 +662,13 @@ class BettingBot(commands.Bot):
             potential_share = (user_bet.amount / team_pool) if team_pool > 0 else 0
             potential_winnings = user_bet.amount + int((total_pool - team_pool) * potential_share)
             
-            await ctx.send(
+            self.chat.send(
                 f"@{ctx.author.name} Your bet: {user_bet.amount:,} 🧂 on {user_bet.team}\n"
                 f"Potential win: {potential_winnings:,} 🧂 "
                 f"(+{potential_winnings - user_bet.amount:,})"
             )
         else:
-            await ctx.send(f"@{ctx.author.name} You haven't placed a bet this round")
+            self.chat.send(f"@{ctx.author.name} You haven't placed a bet this round")
 
 
     @commands.command(name='stats')
@@ -717,13 +676,13 @@ class BettingBot(commands.Bot):
         """Show user statistics with age"""
         user_id = str(ctx.author.id)
         if user_id not in self.user_points:
-            await ctx.send(f"@{ctx.author.name} No stats available.")
+            self.chat.send(f"@{ctx.author.name} No stats available.")
             return
             
         player = self.user_points[user_id]
         age = getattr(player, 'age', "Dark")
         
-        await ctx.send(
+        self.chat.send(
             f"@{ctx.author.name} [{age} Age] | Salt: {player.points} | "
             f"W/L: {player.wins}/{player.losses} | "
             f"Biggest Win: {player.biggest_win}"
@@ -732,33 +691,29 @@ class BettingBot(commands.Bot):
     @commands.command(name='leaderboard')
     async def leaderboard_command(self, ctx):
         """Show top 5 players by points"""
-        # Get players in new format
-        valid_players = {k: v for k, v in self.user_points.items() 
-                        if isinstance(v, Player) and not k.startswith('house_')}
-        
-        # Sort by points
-        top_players = sorted(valid_players.values(), key=lambda p: p.points, reverse=True)[:5]
+        # Top entries come straight from the incrementally maintained index
+        top_players = [self.user_points[user_id] for user_id, _ in self.leaderboard.top(5)]
         
         if not top_players:
-            await ctx.send("No players on the leaderboard yet!")
+            self.chat.send("No players on the leaderboard yet!", PRIORITY_LOW)
             return
             
         message = "🏆 SALT LEADERBOARD 🏆\n"
         for i, player in enumerate(top_players, 1):
             message += f"{i}. {player.username}: {player.points} salt\n"
             
-        await ctx.send(message)
+        self.chat.send(message, PRIORITY_LOW)
 
     @commands.command(name='winners')
     async def winners_command(self, ctx):
         """Show biggest winners from last betting round"""
         if not hasattr(self, 'last_round_results'):
-            await ctx.send("No completed betting rounds yet!")
+            self.chat.send("No completed betting rounds yet!", PRIORITY_LOW)
             return
         
         # Make sure we're working with a list
         if not isinstance(self.last_round_results, list):
-            await ctx.send("No results data available!")
+            self.chat.send("No results data available!", PRIORITY_LOW)
             return
             
         # Sort results by profit
@@ -769,7 +724,7 @@ class BettingBot(commands.Bot):
         )[:3]
         
         if not sorted_winners:
-            await ctx.send("No winners from last round!")
+            self.chat.send("No winners from last round!", PRIORITY_LOW)
             return
         
         entries = []
@@ -782,20 +737,20 @@ class BettingBot(commands.Bot):
                 )
         
         if entries:
-            await ctx.send("BIGGEST WINNERS:\n" + "\n".join(entries))
+            self.chat.send("BIGGEST WINNERS:\n" + "\n".join(entries), PRIORITY_LOW)
         else:
-            await ctx.send("No winners last round!")
+            self.chat.send("No winners last round!", PRIORITY_LOW)
 
     @commands.command(name='losers')
     async def losers_command(self, ctx):
         """Show biggest losers from last betting round"""
         if not hasattr(self, 'last_round_results'):
-            await ctx.send("No completed betting rounds yet!")
+            self.chat.send("No completed betting rounds yet!", PRIORITY_LOW)
             return
         
         # Make sure we're working with a list
         if not isinstance(self.last_round_results, list):
-            await ctx.send("No results data available!")
+            self.chat.send("No results data available!", PRIORITY_LOW)
             return
             
         # Sort results by profit (ascending for losers)
@@ -805,7 +760,7 @@ class BettingBot(commands.Bot):
         )[:3]
         
         if not sorted_losers:
-            await ctx.send("No results from last round!")
+            self.chat.send("No results from last round!", PRIORITY_LOW)
             return
         
         entries = []
@@ -818,9 +773,9 @@ class BettingBot(commands.Bot):
                 )
         
         if entries:
-            await ctx.send("BIGGEST LOSSES:\n" + "\n".join(entries))
+            self.chat.send("BIGGEST LOSSES:\n" + "\n".join(entries), PRIORITY_LOW)
         else:
-            await ctx.send("No losses last round!")
+            self.chat.send("No losses last round!", PRIORITY_LOW)
 
 
 
@@ -899,7 +854,7 @@ class BettingBot(commands.Bot):
         user_id = str(ctx.author.id)
         
         if user_id not in self.user_points:
-            await ctx.send(f"@{ctx.author.name} No profile found. Get started with !pound to claim salt!")
+            self.chat.send(f"@{ctx.author.name} No profile found. Get started with !pound to claim salt!")
             return
         
         player = self.user_points[user_id]
@@ -933,6 +888,9 @@ class BettingBot(commands.Bot):
         if total_bets > 0:
             record_stats = f" | Best Win: {biggest_win:,} | Worst Loss: {biggest_loss:,}"
         
-        message = f"@{ctx.author.name} [{age} Age] Salt: {points:,}{betting_stats}{winrate_stats}{record_stats}"
+        rank = self.leaderboard.rank(user_id)
+        rank_stats = f" | Rank: #{rank}" if rank else ""
+
+        message = f"@{ctx.author.name} [{age} Age] Salt: {points:,}{rank_stats}{betting_stats}{winrate_stats}{record_stats}"
         
-        await ctx.send(message)
\ No newline at end of file
+        self.chat.send(message)
\ No newline at end of file
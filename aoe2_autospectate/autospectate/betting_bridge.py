@@ -175,6 +175,11 @@ class BettingBridge:
         """Safely stop the bot"""
         if self.bot and self.loop and self.loop.is_running():
             async def cleanup():
+                # Flush any coalesced writes before the loop goes away
+                await self.bot.bet_ingestor.stop()
+                await self.bot.chat.stop()
+                await self.bot.persistence.stop()
+                logging.info(f"Persistence metrics: {self.bot.persistence.get_metrics()}")
                 await self.bot.close()
             
             future = asyncio.run_coroutine_threadsafe(cleanup(), self.loop)
@@ -0,0 +1,67 @@
+# autospectate/betting_records.py
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+# Slotted records: no per-instance __dict__, which matters once the
+# player table is in the tens of thousands.
+
+@dataclass(slots=True)
+class Bet:
+    user_id: str
+    username: str
+    amount: int
+    team: str
+    timestamp: float
+
+@dataclass(slots=True)
+class BettingPool:
+    is_active: bool
+    total_blue: int
+    total_red: int
+    bets: Dict[str, Bet]
+    start_time: float
+    end_time: Optional[float]
+    # Running aggregates so !pool and odds snapshots are O(1)
+    blue_bettors: int = 0  # Excludes house bets
+    red_bettors: int = 0
+    version: int = 0  # Bumped on every change to the pool
+
+    def add_bet(self, bet: Bet):
+        """Record a bet and update the running totals"""
+        self.bets[bet.user_id] = bet
+        is_house = bet.user_id.startswith('house_')
+        if bet.team == 'Blue':
+            self.total_blue += bet.amount
+            self.blue_bettors += 0 if is_house else 1
+        else:
+            self.total_red += bet.amount
+            self.red_bettors += 0 if is_house else 1
+        self.version += 1
+
+    @property
+    def total(self) -> int:
+        return self.total_blue + self.total_red
+
+    def odds(self) -> Tuple[float, float]:
+        """Payout multipliers (blue, red); 0 for an empty side"""
+        total = self.total
+        blue_odds = (total / self.total_blue) if self.total_blue > 0 else 0
+        red_odds = (total / self.total_red) if self.total_red > 0 else 0
+        return blue_odds, red_odds
+
+
+@dataclass(slots=True)
+class Player:
+    user_id: str
+    username: str
+    points: int = 500  # Default starting amount
+    age: str = "Dark"
+    biggest_win: int = 0
+    biggest_loss: int = 0
+    biggest_bet: int = 0
+    total_bets: int = 0
+    wins: int = 0
+    losses: int = 0
+    last_updated: float = field(default_factory=time.time)  # Timestamp at creation
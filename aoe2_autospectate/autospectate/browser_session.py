@@ -0,0 +1,182 @@
+# autospectate/browser_session.py
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+import psutil
+from playwright.sync_api import sync_playwright
+
+BROWSER_ARGS = [
+    '--disable-features=PromptOnMultipleDownload',
+    '--disable-blink-features=AutomationControlled',
+]
+
+PROTOCOL_HANDLER_SCRIPT = """
+    if (navigator.registerProtocolHandler) {
+        navigator.registerProtocolHandler('aoe2de', 'https://www.aoe2companion.com/handle/%s', 'Age of Empires');
+    }
+"""
+
+
+class BrowserSession:
+    """Long-lived Chromium with one warm aoe2companion page.
+
+    The first `acquire_page()` pays the cold start (launch, context, page,
+    networkidle). Later calls reload the same page in place and only wait
+    for the match rows. The browser is torn down and relaunched when it gets
+    too old, uses too much memory, or the page breaks.
+
+    Playwright's sync API is bound to the thread that started it, so the
+    session must be used from a single thread (MainFlow's automation thread).
+    """
+
+    def __init__(self, url: str, headless: bool = False, max_age_minutes: float = 120,
+                 max_memory_mb: float = 1500, max_uses: int = 100, row_timeout_ms: int = 10000):
+        self.url = url
+        self.headless = headless
+        self.max_age_seconds = max_age_minutes * 60
+        self.max_memory_mb = max_memory_mb
+        self.max_uses = max_uses
+        self.row_timeout_ms = row_timeout_ms
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page = None
+        self._launched_at = 0.0
+        self._uses = 0
+
+        self.cold_start_times: List[float] = []
+        self.warm_refresh_times: List[float] = []
+        self.recycles: Dict[str, int] = {}
+
+    @property
+    def is_open(self) -> bool:
+        return self._page is not None and not self._page.is_closed()
+
+    def acquire_page(self):
+        """Return the warm page with fresh match rows, cold-starting or recycling as needed"""
+        reason = self._recycle_reason()
+        if reason:
+            self.recycle(reason)
+
+        if self.is_open:
+            try:
+                return self._warm_refresh()
+            except Exception as e:
+                logging.warning(f"Warm refresh failed, relaunching browser: {e}")
+                self.recycle("refresh_error")
+
+        return self._cold_start()
+
+    def _cold_start(self):
+        started = time.perf_counter()
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+
+        self._browser = self._playwright.chromium.launch(headless=self.headless, args=BROWSER_ARGS)
+        self._context = self._browser.new_context(
+            permissions=['clipboard-read', 'clipboard-write'],
+            bypass_csp=True,
+        )
+        self._page = self._context.new_page()
+        try:
+            self._page.add_init_script(PROTOCOL_HANDLER_SCRIPT)
+        except Exception:
+            pass
+
+        self._page.goto(self.url, wait_until='networkidle')
+        self._page.wait_for_selector('tbody tr', timeout=self.row_timeout_ms)
+        self._launched_at = time.time()
+        self._uses = 1
+
+        elapsed = time.perf_counter() - started
+        self.cold_start_times.append(elapsed)
+        logging.info(f"Browser cold start: {elapsed:.2f}s")
+        return self._page
+
+    def _warm_refresh(self):
+        started = time.perf_counter()
+        # A finished spectate can leave the modal open or the page elsewhere
+        if self._page.url.split('#')[0] != self.url:
+            self._page.goto(self.url, wait_until='domcontentloaded')
+        else:
+            self._page.reload(wait_until='domcontentloaded')
+        self._page.wait_for_selector('tbody tr', timeout=self.row_timeout_ms)
+        self._uses += 1
+
+        elapsed = time.perf_counter() - started
+        self.warm_refresh_times.append(elapsed)
+        logging.info(f"Browser warm refresh: {elapsed:.2f}s (use {self._uses}/{self.max_uses})")
+        return self._page
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self._browser is None:
+            return None
+        if not self._browser.is_connected():
+            return "disconnected"
+        if time.time() - self._launched_at > self.max_age_seconds:
+            return "age"
+        if self._uses >= self.max_uses:
+            return "uses"
+        memory_mb = self.memory_mb()
+        if memory_mb > self.max_memory_mb:
+            logging.info(f"Browser using {memory_mb:.0f}MB (limit {self.max_memory_mb:.0f}MB)")
+            return "memory"
+        return None
+
+    def memory_mb(self) -> float:
+        """RSS of the Chromium processes launched by this interpreter"""
+        total = 0
+        try:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    if 'chrom' in child.name().lower():
+                        total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except Exception as e:
+            logging.error(f"Error reading browser memory: {e}")
+        return total / 1024 / 1024
+
+    def recycle(self, reason: str):
+        """Close the browser so the next acquire_page() cold-starts"""
+        logging.info(f"Recycling browser (reason: {reason})")
+        self.recycles[reason] = self.recycles.get(reason, 0) + 1
+        self._close_browser()
+
+    def _close_browser(self):
+        for resource in (self._context, self._browser):
+            try:
+                if resource:
+                    resource.close()
+            except Exception as e:
+                logging.debug(f"Error closing browser resource: {e}")
+        self._page = None
+        self._context = None
+        self._browser = None
+
+    def close(self):
+        """Close the browser and stop Playwright"""
+        self._close_browser()
+        if self._playwright:
+            try:
+                self._playwright.stop()
+            except Exception as e:
+                logging.debug(f"Error stopping Playwright: {e}")
+            self._playwright = None
+        logging.info(f"Browser session closed: {self.get_metrics()}")
+
+    def get_metrics(self) -> Dict:
+        def avg(values):
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            'cold_starts': len(self.cold_start_times),
+            'warm_refreshes': len(self.warm_refresh_times),
+            'avg_cold_start_s': round(avg(self.cold_start_times), 2),
+            'avg_warm_refresh_s': round(avg(self.warm_refresh_times), 2),
+            'recycles': dict(self.recycles),
+            'memory_mb': round(self.memory_mb(), 1) if self._browser else 0.0,
+        }
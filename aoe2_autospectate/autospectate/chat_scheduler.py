@@ -0,0 +1,173 @@
+# autospectate/chat_scheduler.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+# Priority lanes, lowest number goes first
+PRIORITY_HIGH = 0    # Bet confirmations, betting open/close
+PRIORITY_NORMAL = 1  # Results and command replies
+PRIORITY_LOW = 2     # Help text, leaderboards and other flavor
+
+TWITCH_MAX_MESSAGE_LENGTH = 500
+
+
+class TokenBucket:
+    """Token bucket whose burst plus refill never exceeds `limit` per `period`.
+
+    Twitch counts messages in a fixed 30 s window, so a bucket that starts
+    full with `limit` tokens could send almost twice the limit in one window.
+    Instead the bucket holds `burst` tokens and refills the remaining
+    `limit - burst` evenly over the period.
+    """
+
+    def __init__(self, limit: int, period: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.capacity = max(1, min(burst, limit))
+        self.refill_rate = max(limit - self.capacity, 1) / period
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.last_refill = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def try_acquire(self) -> float:
+        """Take a token. Returns 0 on success, otherwise seconds until one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+
+class ChatScheduler:
+    """Rate-limited, coalescing outbound chat queue.
+
+    `send()` never blocks: text is split on newlines into segments and queued
+    in a priority lane. A single task takes a token, then packs as many queued
+    segments as fit into one line (highest priority first) and sends it.
+    `get_channel` is any callable returning an object with `async send(str)`,
+    so tests can pass a fake channel.
+    """
+
+    def __init__(self, get_channel: Callable[[], object], rate_limit: int = 20, per_seconds: float = 30.0,
+                 burst: int = 5, max_length: int = TWITCH_MAX_MESSAGE_LENGTH, separator: str = " | ",
+                 clock: Callable[[], float] = time.monotonic):
+        self.get_channel = get_channel
+        self.max_length = max_length
+        self.separator = separator
+        self.bucket = TokenBucket(rate_limit, per_seconds, burst, clock=clock)
+
+        self._lanes: List[Deque[str]] = [deque(), deque(), deque()]
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {'queued_segments': 0, 'messages_sent': 0, 'segments_sent': 0, 'send_errors': 0}
+
+    def _events(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._wakeup, self._idle
+
+    def pending(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    def start(self):
+        """Start the sender task. Must be called from the loop."""
+        self._events()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def send(self, content: str, priority: int = PRIORITY_NORMAL):
+        """Queue a message; multi-line text becomes separate segments"""
+        lane = self._lanes[priority]
+        for segment in self._split(content):
+            lane.append(segment)
+            self.stats['queued_segments'] += 1
+
+        wakeup, idle = self._events()
+        if self.pending():
+            idle.clear()
+            wakeup.set()
+
+    def _split(self, content: str) -> List[str]:
+        segments = []
+        for line in str(content).split('\n'):
+            line = line.strip()
+            while len(line) > self.max_length:
+                cut = line.rfind(' ', 0, self.max_length)
+                if cut <= 0:
+                    cut = self.max_length
+                segments.append(line[:cut].rstrip())
+                line = line[cut:].lstrip()
+            if line:
+                segments.append(line)
+        return segments
+
+    def _next_line(self) -> Optional[str]:
+        """Pack queued segments into one line, highest priority first, keeping FIFO within a lane"""
+        parts: List[str] = []
+        length = 0
+        for lane in self._lanes:
+            while lane:
+                extra = len(lane[0]) + (len(self.separator) if parts else 0)
+                if length + extra > self.max_length:
+                    return self.separator.join(parts)
+                parts.append(lane.popleft())
+                length += extra
+        return self.separator.join(parts) if parts else None
+
+    async def _run(self):
+        wakeup, idle = self._events()
+        while True:
+            if not self.pending():
+                idle.set()
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            wait = self.bucket.try_acquire()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            channel = self.get_channel()
+            if channel is None:
+                # Not joined yet; give the token back and retry shortly
+                self.bucket.tokens += 1
+                await asyncio.sleep(1.0)
+                continue
+
+            # Pack after the token wait so anything queued meanwhile rides along
+            line = self._next_line()
+            try:
+                await channel.send(line)
+                self.stats['messages_sent'] += 1
+                self.stats['segments_sent'] += line.count(self.separator) + 1
+            except Exception as e:
+                self.stats['send_errors'] += 1
+                logging.error(f"Error sending chat message: {e}")
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued has been sent. Returns False on timeout."""
+        _, idle = self._events()
+        try:
+            await asyncio.wait_for(idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """Try to send what is queued, then stop the sender task"""
+        if self._task and not self._task.done():
+            if not await self.drain(drain_timeout):
+                logging.warning(f"Dropping {self.pending()} unsent chat segments on shutdown")
+            self._task.cancel()
+        self._task = None
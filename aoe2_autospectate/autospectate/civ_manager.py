@@ -2,6 +2,7 @@ import json
 from dataclasses import dataclass
 from typing import Dict, Optional
 import logging
+from persistence import atomic_write_json
 
 @dataclass
 class CivilizationBonus:
@@ -42,11 +43,18 @@ class CivilizationManager:
     )
 }
 
-    def __init__(self, data_file='user_civilizations.json'):
+    def __init__(self, data_file='user_civilizations.json', persistence=None):
         self.data_file = data_file
         self.user_civilizations: Dict[str, str] = self.load_data()
         self.passive_income_times: Dict[str, float] = {}
 
+        # Optional PersistenceService; without one, saves are synchronous
+        self.persistence = persistence
+        if self.persistence:
+            self.persistence.register(
+                'civilizations', self.data_file, lambda: dict(self.user_civilizations)
+            )
+
     def load_data(self) -> Dict[str, str]:
         """Load civilization data from file"""
         try:
@@ -57,8 +65,7 @@ class CivilizationManager:
 
     def save_data(self):
         """Save civilization data to file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.user_civilizations, f)
+        atomic_write_json(self.data_file, self.user_civilizations)
 
     def select_civilization(self, user_id: str, civ_name: str) -> tuple[bool, str]:
         """Select a civilization for a user"""
@@ -67,7 +74,10 @@ class CivilizationManager:
             return False, f"Invalid unit type. Use !units to see available options."
 
         self.user_civilizations[user_id] = civ_name  # Store as lowercase
-        self.save_data()
+        if self.persistence:
+            self.persistence.mark_dirty('civilizations')
+        else:
+            self.save_data()
         civ = self.CIVILIZATIONS[civ_name]
         return True, f"You are now specialized in {civ.name} {civ.badge}"
 
@@ -22,6 +22,21 @@ GAME_AGES = [
 
 # URLs (if needed)
 AOE2_COMPANION_URL = 'https://www.aoe2companion.com/ongoing'
+AOE2RECS_DASHBOARD_URL = 'https://aoe2recs.com/dashboard/'
+# JSON feed of ongoing matches; set to None to scrape the page instead.
+# Point at fixture_server.py (e.g. 'http://127.0.0.1:8765/companion_ongoing') for offline testing.
+AOE2_COMPANION_API_URL = 'https://data.aoe2companion.com/api/matches/ongoing'
+
+# Match selection (see match_scoring.py). Weights override DEFAULT_WEIGHTS;
+# the rating threshold is MIN_GAME_ELO below.
+MATCH_SCORING_WEIGHTS = {}
+MATCH_SCORING_PREFERRED_MAPS = ['arabia']
+MATCH_SCORING_AVOID_MAPS = []
+# Append every ranked candidate set to this file for offline evaluation, e.g.
+# 'candidate_sets.jsonl'. Off by default: the file grows with every poll.
+MATCH_SCORING_CANDIDATE_LOG = None
+# Per-game state timeline (see timeline.py); None to disable
+TIMELINE_LOG = 'game_timeline.jsonl'
 
 # Spectate Criteria
 GAME_MODE_FILTER = 'Random Map'
@@ -124,4 +139,6 @@ MAX_PLAYERS = 8
 EXPECTED_PLAYERS_1V1 = 2
 
 # Initial buildings
-STARTING_TC_COUNT = 1  # Players start with 1 TC
\ No newline at end of file
+STARTING_TC_COUNT = 1  # Players start with 1 TC
+# Live stats overlay ("StatsOverlay" text source in OBS)
+STATS_OVERLAY_INTERVAL = 2.0  # Seconds between overlay updates
@@ -0,0 +1,153 @@
+# autospectate/fixture_bench.py
+#
+# Headless end-to-end discovery benchmark against the recorded fixtures.
+# Starts fixture_server.py in-process, then for every DOM variant measures
+# the cold start and warm refresh + table extraction + ranking time, and
+# checks the scrapers still read the fixture correctly.
+#
+#   python fixture_bench.py --iterations 5 --latency 150
+#   python fixture_bench.py --variants default,modal_iframe --spectate
+
+import sys
+import time
+import logging
+import argparse
+import statistics
+
+from playwright.sync_api import sync_playwright
+
+from fixture_server import FixtureServer
+from browser_session import BrowserSession
+from web_automation import extract_matches_table, rank_candidates, spectate_candidate, handle_spectate_with_modal
+from spectate_resolver import SpectateResolver
+from aoe2recs_automation import find_best_match_aoe2recs, create_aoe2recs_config
+
+VARIANTS = ['default', 'late_rows', 'civ_icons_only', 'modal_iframe']
+
+# What companion_ongoing.html must parse to
+EXPECTED_ROWS = 6
+EXPECTED_FIRST_ROW = {'match_id': 401234501, 'map': 'Arabia', 'players': ['Hera', 'Viper'], 'civilizations': ['Mayans', 'Franks'], 'rating': 1712}
+EXPECTED_ELIGIBLE = {frozenset({'Hera', 'Viper'}), frozenset({'SaltyPeon', 'Boomer'}), frozenset({'Rising', 'Steady'})}
+EXPECTED_AOE2RECS_PICK = '/spectate/401234601'
+
+
+def check_matches(matches):
+    """Return a list of regressions in the extracted table"""
+    problems = []
+    if len(matches) != EXPECTED_ROWS:
+        problems.append(f"extracted {len(matches)} rows, expected {EXPECTED_ROWS}")
+    if matches:
+        first = matches[0]
+        for key, expected in EXPECTED_FIRST_ROW.items():
+            if first.get(key) != expected:
+                problems.append(f"row 0 {key} = {first.get(key)!r}, expected {expected!r}")
+    eligible = {frozenset(match['players']) for match in rank_candidates(matches, 1100)}
+    if eligible != EXPECTED_ELIGIBLE:
+        problems.append(f"eligible candidates {sorted(map(sorted, eligible))}")
+    return problems
+
+
+def bench_variant(server, variant, iterations, spectate):
+    url = server.url('companion_ongoing.html', variant=None if variant == 'default' else variant)
+    session = BrowserSession(url, headless=True)
+    discovery_times, problems = [], []
+    spectate_result = None
+
+    try:
+        for _ in range(iterations + 1):
+            started = time.perf_counter()
+            page = session.acquire_page()
+            matches = extract_matches_table(page)
+            ranked = rank_candidates(matches, 1100)
+            discovery_times.append(time.perf_counter() - started)
+            problems.extend(check_matches(matches))
+
+        if spectate and ranked:
+            spectate_result = bench_spectate(page, ranked[0], problems)
+    finally:
+        metrics = session.get_metrics()
+        session.close()
+
+    warm = discovery_times[1:]
+    return {
+        'variant': variant,
+        'cold_s': round(discovery_times[0], 3),
+        'warm_median_s': round(statistics.median(warm), 3) if warm else None,
+        'warm_max_s': round(max(warm), 3) if warm else None,
+        'browser': metrics,
+        'spectate': spectate_result,
+        'problems': sorted(set(problems)),
+    }
+
+
+def bench_spectate(page, target, problems):
+    """Spectate the top candidate through the direct path, then again through the modal fallback"""
+    launched = []
+    resolver = SpectateResolver(modal_fallback=handle_spectate_with_modal,
+                                launcher=lambda url: launched.append(url) or True)
+    expected_url = f"aoe2de://1/{target.get('match_id')}"
+
+    spectate_candidate(page, target, resolver)
+    if expected_url not in launched:
+        problems.append(f"direct spectate launched {launched}, expected {expected_url}")
+
+    # Without a match id only the page button and modal can spectate
+    modal_result = spectate_candidate(page, {k: v for k, v in target.items() if k != 'match_id'}, resolver)
+    page_launches = page.evaluate("() => window.__spectateLaunches")
+    if modal_result and expected_url not in page_launches and expected_url not in launched[1:]:
+        problems.append("modal spectate reported success but the aoe2de:// URL was never launched")
+
+    return resolver.get_stats()
+
+
+def bench_aoe2recs(server):
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+        started = time.perf_counter()
+        page.goto(server.url('aoe2recs_dashboard.html'))
+        elements = page.query_selector_all("a[href*='spectate'], button:has-text('Spectate'), .spectate-button")
+        best = find_best_match_aoe2recs(page, elements, create_aoe2recs_config())
+        elapsed = time.perf_counter() - started
+        picked = best.get_attribute('href') if best else None
+        browser.close()
+
+    problems = [] if picked == EXPECTED_AOE2RECS_PICK else [f"picked {picked}, expected {EXPECTED_AOE2RECS_PICK}"]
+    return {'variant': 'aoe2recs', 'seconds': round(elapsed, 3), 'problems': problems}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark match discovery against local fixtures")
+    parser.add_argument('--iterations', type=int, default=5, help='Warm refreshes per variant')
+    parser.add_argument('--latency', type=float, default=0, help='Server latency per response in ms')
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--spectate', action='store_true', help='Also click spectate on the top candidate')
+    args = parser.parse_args()
+
+    # web_automation configures INFO logging on import; keep the report readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+    with FixtureServer(latency_ms=args.latency) as server:
+        for variant in filter(None, args.variants.split(',')):
+            results.append(bench_variant(server, variant, args.iterations, args.spectate))
+        results.append(bench_aoe2recs(server))
+
+    failed = False
+    for result in results:
+        status = "OK" if not result['problems'] else "REGRESSION"
+        failed = failed or bool(result['problems'])
+        if result['variant'] == 'aoe2recs':
+            print(f"{result['variant']:>15}: {status} pick {result['seconds']:.3f}s")
+        else:
+            print(f"{result['variant']:>15}: {status} cold {result['cold_s']:.3f}s | "
+                  f"warm median {result['warm_median_s']}s max {result['warm_max_s']}s | "
+                  f"spectate {result['spectate']}")
+        for problem in result['problems']:
+            print(f"{'':>17}- {problem}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# autospectate/fixture_server.py
+#
+# Local HTTP server that replays recorded responses from fixtures/.
+# GET /<name> serves fixtures/<name>.json (or /<name>.html for page
+# snapshots) with an ETag and Last-Modified, and answers conditional requests
+# with 304 like the real API does.
+#
+# Latency can be set for the whole server (--latency) or per request with
+# ?latency=<ms>. Page snapshots read ?variant=... themselves to switch DOM
+# variations (see the comment at the top of each .html fixture).
+#
+#   python fixture_server.py --port 8765 --latency 150
+#   python fixture_server.py --record https://.../ongoing companion_ongoing
+
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+CONTENT_TYPES = {
+    '.json': 'application/json',
+    '.html': 'text/html; charset=utf-8',
+}
+
+
+class FixtureServer:
+    """Serves recorded fixtures on localhost from a background thread"""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0):
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.stats: Dict[str, int] = {'requests': 0, 'not_modified': 0, 'not_found': 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, name: str, **params) -> str:
+        query = '&'.join(f"{key}={value}" for key, value in params.items() if value is not None)
+        return f"{self.base_url}/{name}" + (f"?{query}" if query else "")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logging.info(f"Fixture server on {self.base_url} serving {self.fixtures_dir}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def resolve(self, path: str):
+        """Map a request path to a fixture file, or None"""
+        name = path.split('?', 1)[0].strip('/')
+        if not name or '..' in name:
+            return None
+        for candidate in (name, name + '.json', name + '.html'):
+            full = os.path.join(self.fixtures_dir, candidate)
+            if os.path.isfile(full):
+                return full
+        return None
+
+    def _make_handler(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture_server._count('requests')
+                self._apply_latency()
+                path = fixture_server.resolve(self.path)
+                if path is None:
+                    fixture_server._count('not_found')
+                    self.send_error(404)
+                    return
+
+                with open(path, 'rb') as f:
+                    body = f.read()
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                mtime = int(os.path.getmtime(path))
+
+                if self._not_modified(etag, mtime):
+                    fixture_server._count('not_modified')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(path)[1], 'application/octet-stream'))
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', formatdate(mtime, usegmt=True))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _apply_latency(self):
+                latency_ms = fixture_server.latency_ms
+                requested = parse_qs(urlsplit(self.path).query).get('latency')
+                if requested:
+                    try:
+                        latency_ms = float(requested[0])
+                    except ValueError:
+                        pass
+                if latency_ms > 0:
+                    time.sleep(latency_ms / 1000)
+
+            def _not_modified(self, etag, mtime):
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match:
+                    return etag in [tag.strip() for tag in if_none_match.split(',')]
+                if_modified_since = self.headers.get('If-Modified-Since')
+                if if_modified_since:
+                    try:
+                        return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+                    except (TypeError, ValueError):
+                        return False
+                return False
+
+            def log_message(self, format, *args):
+                logging.debug(f"Fixture server: {format % args}")
+
+        return Handler
+
+
+def record(url: str, name: str, fixtures_dir: str = FIXTURES_DIR):
+    """Fetch a live response and store it as a fixture (NAME.html stores the raw page)"""
+    import requests
+
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    os.makedirs(fixtures_dir, exist_ok=True)
+    if name.endswith('.html'):
+        path = os.path.join(fixtures_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+    else:
+        path = os.path.join(fixtures_dir, f"{name}.json")
+        with open(path, 'w') as f:
+            json.dump(response.json(), f, indent=2)
+    logging.info(f"Recorded {url} -> {path}")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded API responses")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dir', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0, help='Delay every response by this many ms')
+    parser.add_argument('--record', nargs=2, metavar=('URL', 'NAME'), help='Record a live response and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.record:
+        record(*args.record, fixtures_dir=args.dir)
+    else:
+        server = FixtureServer(args.dir, port=args.port, latency_ms=args.latency).start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
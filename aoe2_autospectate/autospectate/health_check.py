@@ -30,25 +30,14 @@ class HealthCheck:
         return True
 
     def verify_obs_connection(self, obs_manager) -> bool:
-        """Verify OBS connection is active and working."""
-        max_retries = 2
-        retry_delay = 1.0  # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                if not obs_manager.ws or not obs_manager.ws.ws:
-                    if attempt == 0:  # Only log on first attempt
-                        logging.error("OBS connection lost")
-                    if not obs_manager.connect():
-                        time.sleep(retry_delay)
-                        continue
-                return True  # If we have a connection, that's good enough
-                    
-            except Exception as e:
-                logging.error(f"OBS connection check failed (attempt {attempt + 1}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    
+        """Verify OBS connection is active. Doesn't reconnect or wait: a running
+        OBSSupervisor does that in the background."""
+        if obs_manager.is_connected():
+            return True
+        if obs_manager.supervisor is not None:
+            logging.warning(f"OBS disconnected, supervisor reconnecting ({obs_manager.supervisor.stats})")
+            return True
+        logging.error("OBS connection lost and nothing is reconnecting")
         return False
 
     def perform_full_health_check(self, obs_manager) -> bool:
@@ -0,0 +1,100 @@
+# autospectate/leaderboard_index.py
+
+from typing import Dict, List, Optional, Tuple
+from sortedcontainers import SortedList
+
+
+class LeaderboardIndex:
+    """Order-statistics index of players keyed by points.
+
+    Entries are stored as (-points, user_id) in a SortedList, so top-N is a
+    slice and a player's rank is a bisect; both are O(log n) instead of
+    sorting the whole player table on every !leaderboard.
+    """
+
+    def __init__(self, excluded_prefixes: Tuple[str, ...] = ('house_',)):
+        self.excluded_prefixes = excluded_prefixes
+        self._entries = SortedList()
+        self._points: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._points
+
+    def _is_excluded(self, user_id: str) -> bool:
+        return user_id.startswith(self.excluded_prefixes)
+
+    def update(self, user_id: str, points: int):
+        """Insert or move a player to their new point total"""
+        if self._is_excluded(user_id):
+            return
+
+        old_points = self._points.get(user_id)
+        if old_points == points:
+            return
+        if old_points is not None:
+            self._entries.remove((-old_points, user_id))
+
+        self._entries.add((-points, user_id))
+        self._points[user_id] = points
+
+    def discard(self, user_id: str):
+        """Remove a player if present"""
+        old_points = self._points.pop(user_id, None)
+        if old_points is not None:
+            self._entries.remove((-old_points, user_id))
+
+    def rebuild(self, players: Dict[str, object]):
+        """Rebuild from a user_id -> Player mapping (non-Player values are skipped)"""
+        self._points = {
+            user_id: player.points
+            for user_id, player in players.items()
+            if hasattr(player, 'points') and not self._is_excluded(user_id)
+        }
+        self._entries = SortedList((-points, user_id) for user_id, points in self._points.items())
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        """Return the top `n` (user_id, points) pairs, highest first"""
+        return [(user_id, -neg_points) for neg_points, user_id in self._entries.islice(0, n)]
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank; tied players share the best rank of their tie group"""
+        points = self._points.get(user_id)
+        if points is None:
+            return None
+        return self._entries.bisect_left((-points, '')) + 1
+
+    def check_consistency(self, players: Dict[str, object]) -> List[str]:
+        """Compare the index against the player table. Returns a list of problems (empty if consistent)."""
+        problems = []
+
+        if len(self._entries) != len(self._points):
+            problems.append(f"Entry count {len(self._entries)} != tracked players {len(self._points)}")
+
+        expected = {
+            user_id: player.points
+            for user_id, player in players.items()
+            if hasattr(player, 'points') and not self._is_excluded(user_id)
+        }
+        for user_id, points in expected.items():
+            indexed = self._points.get(user_id)
+            if indexed is None:
+                problems.append(f"{user_id} missing from index")
+            elif indexed != points:
+                problems.append(f"{user_id} indexed at {indexed} but has {points}")
+        for user_id in self._points.keys() - expected.keys():
+            problems.append(f"{user_id} indexed but not in player table")
+
+        for neg_points, user_id in self._entries:
+            if self._points.get(user_id) != -neg_points:
+                problems.append(f"Stale entry for {user_id} at {-neg_points}")
+
+        previous = None
+        for entry in self._entries:
+            if previous is not None and entry < previous:
+                problems.append(f"Entries out of order at {entry}")
+            previous = entry
+
+        return problems
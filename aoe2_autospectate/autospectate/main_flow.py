@@ -1,23 +1,34 @@
 # autospectate/main_flow.py
 
+import os
 import time
+import asyncio
 import logging
+import threading
 import pyautogui
 import cv2
 import requests
 import numpy as np
 from PIL import ImageGrab
 from pathlib import Path
-from playwright.sync_api import sync_playwright
 from typing import Optional, Dict, Tuple
 
 from state_management import StateManager, GameState
+from state_runtime import StateRuntime
+from timeline import TimelineRecorder
 from health_check import HealthCheck
 from recovery import RecoveryManager
 from spectator_core import SpectatorCore
-from web_automation import find_and_spectate_game
+from stats_overlay import StatsOverlayPublisher
+from web_automation import find_and_spectate_game, handle_spectate_with_modal
+from browser_session import BrowserSession
+from match_source import CompanionApiSource
+from match_prefetcher import MatchPrefetcher
+from match_scoring import MatchScorer
+from spectate_resolver import SpectateResolver
 from utils import setup_logging, capture_screen
 from obs_control import create_obs_manager
+from obs_supervisor import OBSSupervisor
 from betting_bridge import BettingBridge
 from windows_management import * 
 from windows_management import switch_to_captureage
@@ -42,18 +53,36 @@ class MainFlow:
         self.restart_helper = SimpleRestartHelper()
         self.restart_helper.capture_age_path = r"C:\Users\Alex Hogancamp\AppData\Local\Programs\CaptureAge\CaptureAge.exe"
         self.restart_manager = RestartManager(self.restart_helper)
+        # Per-game cycle breakdown (find -> load -> setup -> spectate -> end) exported as JSONL
+        self.timeline = TimelineRecorder(getattr(config, 'TIMELINE_LOG', 'game_timeline.jsonl'),
+                                         failure_counts=self.restart_manager.failure_counts)
+        self.state_manager.add_listener(self.timeline.on_transition)
 
         self.memory_monitor = SimpleMemoryMonitor()
 
         # Core configuration
         self.game_window_title = "CaptureAge"
         self.companion_url = getattr(config, 'AOE2_COMPANION_URL', 'https://www.aoe2companion.com/ongoing')
+        # Warm aoe2companion page kept open between games
+        self.browser_session = BrowserSession(self.companion_url)
+        api_url = getattr(config, 'AOE2_COMPANION_API_URL', None)
+        self.match_source = CompanionApiSource(api_url) if api_url else None
+        # Keeps ranked candidates warm while the current game is streamed
+        self.match_scorer = MatchScorer.from_config(config)
+        self.spectate_resolver = SpectateResolver(modal_fallback=handle_spectate_with_modal)
+        self.match_prefetcher = None
+        if self.match_source:
+            self.match_prefetcher = MatchPrefetcher(self.match_source, {'MIN_RATING': self.match_scorer.min_rating},
+                                                    scorer=self.match_scorer)
+            self.match_prefetcher.start()
         
         # Initialize OBS Manager
         self.obs_manager = create_obs_manager()
         if not self.obs_manager.connect():
-            logging.error("Failed to connect to OBS")
-            raise Exception("OBS connection failed")
+            logging.warning("OBS not reachable yet, will keep retrying in the background")
+        # Reconnects on socket close; scene/overlay changes made while OBS is down are replayed
+        self.obs_supervisor = OBSSupervisor(self.obs_manager)
+        self.obs_supervisor.start()
         
         logging.info("Initializing with FindingGame scene...")    
         if not self.safe_scene_switch(self.obs_manager.scenes['FINDING_GAME']):
@@ -71,9 +100,12 @@ class MainFlow:
         self.color_check_interval = 3  # 3 seconds between checks
         self.force_color_max_attempts = 10
         self.between_games_delay = 10  # 1 minute
+        self.prefetched_games_delay = 2  # Next game already picked by the prefetcher
         
         # Initialize state
-        self.spectator_core = SpectatorCore(config, betting_bridge=self.betting_bridge)
+        # Ends run_spectator from the event loop; lives here so a stop can't land on an old game's core
+        self.spectator_stop = threading.Event()
+        self.spectator_core = SpectatorCore(config, betting_bridge=self.betting_bridge, stop_event=self.spectator_stop)
         self.current_game_start = None
         self.capture_age_title = "CaptureAge"
         self.initial_game_wait = 180  # 3 minutes wait before switching to CaptureAge
@@ -104,13 +136,7 @@ class MainFlow:
 
         for attempt in range(max_attempts):
             try:
-                if not self.obs_manager.ws or not self.obs_manager.ws.ws:
-                    logging.info(f"Attempt {attempt + 1}: OBS not connected, attempting reconnection...")
-                    if not self.obs_manager.connect():
-                        logging.error("Failed to connect to OBS")
-                        time.sleep(retry_delay)
-                        continue
-
+                # Reconnection is the supervisor's job; while OBS is down the switch is queued
                 if target_scene not in self.obs_manager.scenes.values():
                     logging.error(f"Invalid target scene: {target_scene}")
                     return False
@@ -131,27 +157,16 @@ class MainFlow:
         return False
 
     def ensure_obs_connected(self):
-        """Ensure OBS connection is active, reconnect if needed."""
-        try:
-            if not self.obs_manager.ws or not self.obs_manager.ws.ws:
-                logging.info("OBS connection lost, attempting to reconnect...")
-                if not self.obs_manager.connect():
-                    logging.error("Failed to reconnect to OBS")
-                    return False
-            return True
-        except Exception as e:
-            logging.error(f"Error checking OBS connection: {e}")
-            return False
+        """Whether OBS is connected right now; never blocks, the supervisor reconnects."""
+        return self.obs_manager.ensure_obs_connected()
 
     def safe_scene_switch(self, scene_name):
-        """Safely switch OBS scene with connection check."""
-        if self.ensure_obs_connected():
-            logging.info(f"Attempting to switch to scene: {scene_name}")
-            if self.obs_manager.switch_scene(scene_name):
-                logging.info(f"Successfully switched to scene: {scene_name}")
-                return True
-            else:
-                logging.error(f"Failed to switch to scene: {scene_name}")
+        """Switch OBS scene; queued for replay if OBS is currently down."""
+        logging.info(f"Attempting to switch to scene: {scene_name}")
+        if self.obs_manager.switch_scene(scene_name):
+            logging.info(f"Successfully switched to scene: {scene_name}")
+            return True
+        logging.error(f"Failed to switch to scene: {scene_name}")
         return False
 
     def wait_for_game_load(self) -> bool:
@@ -422,14 +437,9 @@ class MainFlow:
                         self.restart_helper.restart_python_script()
                         return False  # Won't reach here
             
-            # Normal game end cleanup (existing code)
-            self.safe_scene_switch(self.obs_manager.scenes['FINDING_GAME'])
-            time.sleep(1)
-
-            try:
-                self.obs_manager.clear_match_text()
-            except Exception as e:
-                logging.warning(f"Non-critical error clearing match text: {e}")
+            # Normal game end cleanup: scene switch and text clear go out as one OBS batch
+            if not self.obs_manager.set_overlay(self.obs_manager.scenes['FINDING_GAME'], None):
+                logging.warning("Non-critical error resetting the OBS overlay")
 
             # AoE2 window cleanup
             aoe2_window = "Age of Empires II: Definitive Edition"
@@ -489,11 +499,18 @@ class MainFlow:
                 'STARTING_TC_COUNT': self.config.STARTING_TC_COUNT
             })()
 
-            self.spectator_core = SpectatorCore(config_obj, betting_bridge=self.betting_bridge)
+            stats_publisher = StatsOverlayPublisher(self.obs_manager.update_stats_text,
+                                                    interval=getattr(self.config, 'STATS_OVERLAY_INTERVAL', 2.0))
+            self.spectator_core = SpectatorCore(config_obj, betting_bridge=self.betting_bridge,
+                                                stats_publisher=stats_publisher, stop_event=self.spectator_stop)
             self.current_game_start = time.time()
             
             logging.info("Starting spectator core...")
-            spectator_result = self.spectator_core.run_spectator()
+            stats_publisher.start()
+            try:
+                spectator_result = self.spectator_core.run_spectator()
+            finally:
+                stats_publisher.stop()
             self.spectator_core.cleanup_between_games()
 
             if spectator_result:
@@ -511,152 +528,213 @@ class MainFlow:
             return False
 
 
+    def close_discovery(self):
+        """Stop the prefetcher and close the warm browser before exiting or restarting."""
+        if self.match_prefetcher:
+            self.match_prefetcher.stop()
+        self.browser_session.close()
+
+    def build_runtime(self) -> StateRuntime:
+        """Wire the GameState handlers and the background checks into a StateRuntime."""
+        runtime = StateRuntime(self.state_manager, {
+            GameState.FINDING_GAME: self.on_finding_game,
+            GameState.GAME_FOUND: self.on_game_found,
+            GameState.LOADING_GAME: self.on_loading_game,
+            GameState.SETTING_UP_VIEW: self.on_setting_up_view,
+            GameState.SPECTATING: self.on_spectating,
+            GameState.GAME_ENDED: self.on_game_ended,
+            GameState.ERROR: self.on_error_state,
+        }, on_error=self.on_state_error, on_wedged=self.on_automation_wedged)
+        runtime.add_monitor("restart", 5, self.check_nuclear_restart)
+        runtime.add_monitor("health", self.health_checker.health_check_interval, self.check_health)
+        runtime.add_monitor("memory", self.memory_monitor.log_interval, self.check_memory)
+        runtime.add_monitor("obs", 10, self.check_obs)
+        return runtime
+
+    # Background checks
+
+    async def check_nuclear_restart(self):
+        if self.restart_manager.should_nuclear_restart():
+            logging.critical("🚨 Nuclear restart condition met")
+            await self.nuclear_restart()
+
+    async def check_health(self):
+        """OBS is checked on the loop every time. The window checks drive the desktop, so they go
+        through the automation thread and only run between blocking steps, never during a game."""
+        healthy = self.health_checker.verify_obs_connection(self.obs_manager)
+        if healthy and self.state_manager.current_state != GameState.SPECTATING:
+            healthy = await self.runtime.run_blocking(self.health_checker.check_game_windows)
+        if not healthy:
+            logging.error("Health check failed")
+            self.restart_manager.record_failure()
+
+    async def check_memory(self):
+        memory_status = self.memory_monitor.check_and_log()
+        if memory_status == "NUCLEAR":
+            logging.critical("🚨 NUCLEAR MEMORY LEVEL - RESTARTING SCRIPT!")
+            await self.nuclear_restart()
+        elif memory_status == "CRITICAL":
+            logging.error("Consider restarting soon!")
+
+    async def check_obs(self):
+        # The supervisor does the reconnecting; this only makes an outage visible
+        if not self.obs_manager.is_connected():
+            logging.warning(f"OBS offline, reconnect stats: {self.obs_supervisor.stats}")
+
+    async def nuclear_restart(self):
+        """Abandon the current state and restart the script from the automation thread"""
+        self.spectator_stop.set()
+        self.runtime.interrupt()
+        await self.runtime.run_blocking(self._restart_script)
+
+    def _restart_script(self):
+        self.close_discovery()
+        self.restart_helper.restart_python_script()
+
+    async def on_automation_wedged(self):
+        """A blocking call never returned, so nothing can run on the automation thread:
+        restart from a spare thread and exit hard, as a normal exit would wait on the stuck one."""
+        logging.critical("🚨 Automation thread wedged - RESTARTING SCRIPT!")
+        self.spectator_stop.set()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.restart_helper.restart_python_script)
+        except SystemExit as e:
+            logging.shutdown()
+            os._exit(e.code if isinstance(e.code, int) else 1)
+
+    # State handlers
+
+    async def on_finding_game(self):
+        logging.info("Finding new game...")
+        if not await self.runtime.run_blocking(self.safe_scene_switch, self.obs_manager.scenes['FINDING_GAME']):
+            self.restart_manager.record_failure()
+            await self.runtime.sleep(5)
+            return None
+
+        prefetched = self.match_prefetcher.get_candidates() if self.match_prefetcher else None
+        spectated, match_info = await self.runtime.run_blocking(lambda: find_and_spectate_game(
+            None,
+            {'AOE2_COMPANION_URL': self.companion_url, 'MIN_RATING': self.match_scorer.min_rating},
+            session=self.browser_session,
+            source=self.match_source,
+            prefetched=prefetched,
+            scorer=self.match_scorer,
+            resolver=self.spectate_resolver
+        ))
+        logging.info(f"Browser session: {self.browser_session.get_metrics()}")
+        logging.info(f"Spectate paths: {self.spectate_resolver.get_stats()}")
+        if not spectated:
+            logging.warning("No game found to spectate. Waiting before retry...")
+            await self.runtime.sleep(20)
+            return None
+
+        self.match_scorer.record_streamed(match_info)
+        if self.match_prefetcher:
+            self.match_prefetcher.mark_spectated(match_info.get('match_id'))
+
+        if not await self.runtime.run_blocking(self.obs_manager.update_match_text, match_info):
+            logging.error("Failed to update match text")
+            # Non-critical, continue
+        return GameState.GAME_FOUND
+
+    async def on_game_found(self):
+        if await self.runtime.run_blocking(self.wait_for_game_load):
+            return GameState.LOADING_GAME
+        return None
+
+    async def on_loading_game(self):
+        for attempt in range(1, 6):
+            if await self.runtime.run_blocking(switch_to_window, self.game_window_title):
+                logging.info("Successfully switched to CaptureAge window")
+                return GameState.SETTING_UP_VIEW
+            logging.warning(f"Failed to switch to CaptureAge window, attempt {attempt}/5")
+            await self.runtime.sleep(5)
+
+        logging.error("Failed to switch to CaptureAge after 5 attempts")
+        self.restart_manager.record_failure()
+        return GameState.ERROR
+
+    async def on_setting_up_view(self):
+        if not await self.runtime.run_blocking(lambda: self.force_player_colors() and self.setup_game_view()):
+            logging.error("Failed to setup game view")
+            self.restart_manager.record_failure()
+            return GameState.ERROR
+
+        if await self.runtime.run_blocking(self.safe_scene_switch, self.obs_manager.scenes['GAME']):
+            if hasattr(self, 'betting_bridge') and self.betting_bridge:
+                self.betting_bridge.on_game_start()
+            return GameState.SPECTATING
+        return None
+
+    async def on_spectating(self):
+        # Cleared before the job is queued, so a stop sent while it waits isn't lost
+        self.spectator_stop.clear()
+        try:
+            spectator_result = await self.runtime.run_blocking(self.run_spectator)
+        except asyncio.CancelledError:
+            # Out of budget or interrupted: free the automation thread for the next state
+            self.spectator_stop.set()
+            raise
+        if not spectator_result:
+            logging.warning("Spectator ended unexpectedly")
+            self.restart_manager.record_failure()
+        return GameState.GAME_ENDED
+
+    async def on_game_ended(self):
+        if self.match_prefetcher:
+            self.match_prefetcher.poll_now()
+        self.obs_manager.begin_game()
+        logging.info(f"State durations so far: {self.timeline.get_histograms()}")
+        if await self.runtime.run_blocking(self.handle_game_end):
+            # The menu cleanup above already takes ~10s; no need to wait again when the next game is queued
+            delay = self.prefetched_games_delay if self.match_prefetcher and self.match_prefetcher.has_candidates() else self.between_games_delay
+            logging.info(f"Waiting {delay}s before next game...")
+        else:
+            logging.error("Failed to handle game end properly")
+            self.restart_manager.record_failure()
+            # Try to continue anyway
+            delay = self.between_games_delay
+        await self.runtime.sleep(delay)
+        return GameState.FINDING_GAME
+
+    async def on_error_state(self):
+        logging.info("In error state, attempting recovery...")
+        if await self.runtime.run_blocking(self.recovery_manager.attempt_recovery, GameState.ERROR):
+            logging.info("Recovery successful, resuming operation")
+            return GameState.FINDING_GAME
+        logging.error("Recovery failed, will retry")
+        self.restart_manager.record_failure()
+        await self.runtime.sleep(10)  # Longer wait in error state
+        return None
+
+    def on_state_error(self, state, error):
+        """A handler raised: count it, and give up on the state after repeated failures"""
+        import traceback
+        logging.error(traceback.format_exc())
+        self.restart_manager.record_failure()
+        if self.restart_manager.consecutive_failures >= 2:
+            logging.warning("Too many consecutive failures, entering error state")
+            return GameState.ERROR
+        return None
+
+    def shutdown_runtime(self):
+        """Stop whatever the automation thread is doing and close the browser on that thread."""
+        self.spectator_stop.set()
+        try:
+            self.runtime.executor.submit(self.close_discovery).result(timeout=60)
+        except Exception as e:
+            logging.error(f"Error closing discovery: {e}")
+        self.runtime.shutdown()
+
     def main_loop(self):
-        """Enhanced main loop with restart management and recovery."""
+        """Run the state machine until stopped, with restart management and recovery."""
+        self.runtime = self.build_runtime()
         try:
-            self.state_manager.transition_to(GameState.FINDING_GAME)
-            
-            while True:
-                try:
-                    # Check for nuclear restart condition first
-                    if self.restart_manager.should_nuclear_restart():
-                        logging.critical("🚨 Nuclear restart condition met")
-                        self.restart_helper.restart_python_script()
-                        return  # Won't reach here
-                    
-                    # Regular health check
-                    if not self.health_checker.perform_full_health_check(self.obs_manager):
-                        logging.error("Health check failed")
-                        self.restart_manager.record_failure()
-                        # Don't immediately fail, try to continue
-
-                    # Memory monitoring with nuclear option
-                    memory_status = self.memory_monitor.check_and_log()
-                    if memory_status == "NUCLEAR":
-                        logging.critical("🚨 NUCLEAR MEMORY LEVEL - RESTARTING SCRIPT!")
-                        self.restart_helper.restart_python_script()
-                    elif memory_status == "CRITICAL":
-                        logging.error("Consider restarting soon!")
-                        # The restart manager will catch this in should_restart()
-
-                    # State timeout check with recovery
-                    if recovery_state := self.state_manager.handle_timeout():
-                        if recovery_state == GameState.ERROR:
-                            if not self.recovery_manager.attempt_recovery(self.state_manager.current_state):
-                                self.restart_manager.record_failure()
-                                time.sleep(5)
-                                continue
-                        else:
-                            self.state_manager.transition_to(recovery_state)
-                            continue
-
-                    current_state = self.state_manager.current_state
-
-                    # State-specific handling
-                    if current_state == GameState.FINDING_GAME:
-                        logging.info("Finding new game...")
-                        if not self.safe_scene_switch(self.obs_manager.scenes['FINDING_GAME']):
-                            self.restart_manager.record_failure()
-                            time.sleep(5)
-                            continue
-
-                        with sync_playwright() as playwright:
-                            spectated, match_info = find_and_spectate_game(
-                                playwright, 
-                                {'AOE2_COMPANION_URL': self.companion_url}
-                            )
-                            
-                            if not spectated:
-                                logging.warning("No game found to spectate. Waiting before retry...")
-                                time.sleep(20)
-                                continue
-                            
-                            if not self.obs_manager.update_match_text(match_info):
-                                logging.error("Failed to update match text")
-                                # Non-critical, continue
-
-                            self.state_manager.transition_to(GameState.GAME_FOUND)
-
-                    elif current_state == GameState.GAME_FOUND:
-                        if self.wait_for_game_load():
-                            self.state_manager.transition_to(GameState.LOADING_GAME)
-
-                    elif current_state == GameState.LOADING_GAME:
-                        capture_age_attempts = 0
-                        while capture_age_attempts < 5:
-                            if switch_to_window(self.game_window_title):
-                                logging.info("Successfully switched to CaptureAge window")
-                                self.state_manager.transition_to(GameState.SETTING_UP_VIEW)
-                                break
-                            capture_age_attempts += 1
-                            logging.warning(f"Failed to switch to CaptureAge window, attempt {capture_age_attempts}/5")
-                            time.sleep(5)
-                        
-                        if capture_age_attempts >= 5:
-                            logging.error("Failed to switch to CaptureAge after 5 attempts")
-                            self.restart_manager.record_failure()
-                            self.state_manager.transition_to(GameState.ERROR)
-
-                    elif current_state == GameState.SETTING_UP_VIEW:
-                        if self.force_player_colors() and self.setup_game_view():
-                            if self.safe_scene_switch(self.obs_manager.scenes['GAME']):
-                                if hasattr(self, 'betting_bridge') and self.betting_bridge:
-                                    self.betting_bridge.on_game_start()
-                                self.state_manager.transition_to(GameState.SPECTATING)
-                        else:
-                            logging.error("Failed to setup game view")
-                            self.restart_manager.record_failure()
-                            self.state_manager.transition_to(GameState.ERROR)
-
-                    elif current_state == GameState.SPECTATING:
-                        spectator_result = self.run_spectator()
-                        if spectator_result:
-                            self.state_manager.transition_to(GameState.GAME_ENDED)
-                        else:
-                            logging.warning("Spectator ended unexpectedly")
-                            self.restart_manager.record_failure()
-                            self.state_manager.transition_to(GameState.GAME_ENDED)
-
-                    elif current_state == GameState.GAME_ENDED:
-                        if self.handle_game_end():
-                            logging.info(f"Waiting {self.between_games_delay}s before next game...")
-                            time.sleep(self.between_games_delay)
-                            self.state_manager.transition_to(GameState.FINDING_GAME)
-                        else:
-                            logging.error("Failed to handle game end properly")
-                            self.restart_manager.record_failure()
-                            # Try to continue anyway
-                            time.sleep(self.between_games_delay)
-                            self.state_manager.transition_to(GameState.FINDING_GAME)
-
-                    elif current_state == GameState.ERROR:
-                        logging.info("In error state, attempting recovery...")
-                        if self.recovery_manager.attempt_recovery(current_state):
-                            self.state_manager.transition_to(GameState.FINDING_GAME)
-                            logging.info("Recovery successful, resuming operation")
-                        else:
-                            logging.error("Recovery failed, will retry")
-                            self.restart_manager.record_failure()
-                            time.sleep(10)  # Longer wait in error state
-
-                    time.sleep(0.1)  # Prevent CPU thrashing
-                    
-                except Exception as e:
-                    logging.error(f"Error in main loop iteration: {e}")
-                    import traceback
-                    logging.error(traceback.format_exc())
-                    
-                    self.restart_manager.record_failure()
-                    
-                    # If we have too many failures, transition to error state
-                    if self.restart_manager.consecutive_failures >= 2:
-                        logging.warning("Too many consecutive failures, entering error state")
-                        self.state_manager.transition_to(GameState.ERROR)
-                    else:
-                        time.sleep(5)  # Brief pause before retry
-                        
+            asyncio.run(self.runtime.run(GameState.FINDING_GAME))
         except KeyboardInterrupt:
             logging.info("Main loop stopped by user")
+            self.shutdown_runtime()
             self.safe_scene_switch(self.obs_manager.scenes['FINDING_GAME'])
             try:
                 self.obs_manager.clear_match_text()
@@ -680,7 +758,10 @@ class MainFlow:
             # If we're in a really bad state, try nuclear restart
             if self.restart_manager.should_nuclear_restart():
                 logging.critical("Critical error triggering nuclear restart")
+                self.shutdown_runtime()
                 self.restart_helper.restart_python_script()
+        finally:
+            logging.info(f"State machine stats: {self.runtime.get_stats()}")
 
 
 
@@ -696,6 +777,7 @@ class RestartManager:
         self.max_runtime_hours = 12  # Force restart after 8 hours
         self.memory_threshold_gb = 2.0  # Restart if memory > 3GB
         self.consecutive_failures = 0
+        self.total_failures = 0
         self.max_failures = 3  # Nuclear restart after 3 consecutive failures
         
     def should_restart(self, memory_status="OK"):
@@ -757,7 +839,12 @@ class RestartManager:
     def record_failure(self):
         """Call this when something fails"""
         self.consecutive_failures += 1
+        self.total_failures += 1
         logging.warning(f" : {self.consecutive_failures}/{self.max_failures}")
+
+    def failure_counts(self):
+        """Failure counters recorded with each state transition"""
+        return {'consecutive': self.consecutive_failures, 'total': self.total_failures}
     
     def get_status(self):
         """Get current restart manager status"""
@@ -768,6 +855,7 @@ class RestartManager:
             'games_completed': self.games_since_restart,
             'runtime_hours': runtime_hours,
             'consecutive_failures': self.consecutive_failures,
+            'total_failures': self.total_failures,
             'next_restart_games': self.max_games - self.games_since_restart,
             'next_restart_hours': self.max_runtime_hours - runtime_hours
         }
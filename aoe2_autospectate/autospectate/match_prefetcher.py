@@ -0,0 +1,132 @@
+# autospectate/match_prefetcher.py
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from match_scoring import MatchScorer
+
+
+class MatchPrefetcher:
+    """Polls a MatchSource in the background and keeps a ranked, expiring candidate queue.
+
+    Runs on its own thread for the whole game, so when the current game ends
+    MainFlow can pick the next one immediately instead of starting discovery
+    from scratch. Only JSON sources work here: the Playwright page is bound
+    to the main thread.
+
+    A candidate is dropped when it stops appearing in the feed, when it has
+    not been refreshed for `stale_after` seconds, or when the game is older
+    than `max_minutes`. Spectated matches are never offered again. Ranking
+    is left to the shared MatchScorer.
+    """
+
+    def __init__(self, source, config: Optional[Dict[str, Any]] = None, poll_interval: float = 30.0,
+                 max_minutes: float = 15.0, stale_after: float = 120.0, scorer: Optional[MatchScorer] = None):
+        config = config or {}
+        self.source = source
+        self.min_rating = config.get('MIN_RATING', 1100)
+        self.scorer = scorer or MatchScorer(min_rating=self.min_rating)
+        self.poll_interval = poll_interval
+        self.max_minutes = max_minutes
+        self.stale_after = stale_after
+
+        self._lock = threading.Lock()
+        self._candidates: Dict[Any, Dict[str, Any]] = {}
+        self._excluded = set()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+        self.stats = {'polls': 0, 'errors': 0, 'last_poll': 0.0, 'last_poll_ms': 0.0}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MatchPrefetcher", daemon=True)
+        self._thread.start()
+        logging.info(f"Match prefetcher started (every {self.poll_interval:.0f}s via {self.source.name})")
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+        self._thread = None
+
+    def poll_now(self):
+        """Ask the worker to poll immediately (e.g. when the current game is about to end)"""
+        self._wake_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.poll_once()
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+
+    def poll_once(self):
+        started = time.perf_counter()
+        try:
+            matches = self.source.fetch_matches()
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.warning(f"Prefetch poll failed: {e}")
+            return
+        finally:
+            self.stats['polls'] += 1
+            self.stats['last_poll_ms'] = (time.perf_counter() - started) * 1000
+
+        now = time.time()
+        fresh = {}
+        for match in matches:
+            match_id = match.get('match_id')
+            if match_id is None or match_id in self._excluded:
+                continue
+            # Same rule the scorer ranks by, so has_candidates() and get_candidates() agree
+            if not self.scorer.is_eligible(match) or (match.get('minutes') or 0) >= self.max_minutes:
+                continue
+            fresh[match_id] = {'match': match, 'seen_at': now}
+
+        with self._lock:
+            # Games missing from the feed have ended; replace the queue wholesale
+            self._candidates = {match_id: entry for match_id, entry in fresh.items() if match_id not in self._excluded}
+            self.stats['last_poll'] = now
+
+        logging.debug(f"Prefetched {len(fresh)} candidates from {len(matches)} matches")
+
+    def _expire(self, now: float):
+        for match_id, entry in list(self._candidates.items()):
+            match = entry['match']
+            started = match.get('started')
+            if started:
+                match['minutes'] = max(0, int((now - started) // 60))
+            if now - entry['seen_at'] > self.stale_after or (match.get('minutes') or 0) >= self.max_minutes:
+                del self._candidates[match_id]
+
+    def get_candidates(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Best candidates first, with expired ones dropped and rescored at their current minutes"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            matches = [entry['match'] for entry in self._candidates.values()]
+        return self.scorer.rank(matches)[:limit]
+
+    def has_candidates(self) -> bool:
+        with self._lock:
+            self._expire(time.time())
+            return any(self.scorer.is_eligible(entry['match']) for entry in self._candidates.values())
+
+    def mark_spectated(self, match_id):
+        """Never offer this match again"""
+        if match_id is None:
+            return
+        with self._lock:
+            self._excluded.add(match_id)
+            self._candidates.pop(match_id, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = len(self._candidates)
+        return dict(self.stats, queued=queued, age_s=round(time.time() - self.stats['last_poll'], 1))
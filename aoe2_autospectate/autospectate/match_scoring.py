@@ -0,0 +1,306 @@
+# autospectate/match_scoring.py
+#
+# Unified match ranking. Every candidate (from the companion feed, the scraped
+# ongoing table or the aoe2recs dashboard) becomes a feature vector; all
+# candidates are scored at once as X @ w with numpy.
+#
+# Feature extractors are registered with @feature and take (match, scorer).
+# Weights come from DEFAULT_WEIGHTS, overridden by MATCH_SCORING_WEIGHTS in
+# config.py. Candidate sets can be logged to JSONL and re-scored offline:
+#
+#   python match_scoring.py candidate_sets.jsonl --weights rating=2,minutes=-1
+
+import json
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+FEATURES: Dict[str, Callable[[Dict[str, Any], 'MatchScorer'], float]] = {}
+
+DEFAULT_WEIGHTS = {
+    'rating': 2.0,            # per 1000 average rating
+    'rating_gap': -0.5,       # per 100 rating between the two players
+    'minutes': -0.15,         # per minute already played
+    'map': 0.5,               # +1 preferred map, -1 avoided map
+    'civ_novelty': 0.5,       # 1 if this civ matchup wasn't streamed recently
+    'recent_players': -1.0,   # share of players streamed in recent games
+    'favorites': 1.5,         # crowd favorites in the game
+    'one_v_one': 3.0,         # confidence the game is a 1v1 automatch
+}
+
+DEFAULT_CROWD_FAVORITES = [
+    "hera", "viper", "liereyy", "tatoh", "daut", "jordan23", "villese",
+    "hearttt", "modri", "slam", "capoch", "f1re", "miguelito", "barles"
+]
+
+
+def feature(name):
+    """Register a feature extractor under `name`"""
+    def register(func):
+        FEATURES[name] = func
+        return func
+    return register
+
+
+def _player_ratings(match) -> List[float]:
+    ratings = []
+    for elo in match.get('elos', []):
+        try:
+            ratings.append(float(elo))
+        except (TypeError, ValueError):
+            continue
+    return ratings
+
+
+@feature('rating')
+def rating_feature(match, scorer):
+    rating = match.get('rating')
+    if not rating:
+        ratings = _player_ratings(match)
+        rating = sum(ratings) / len(ratings) if ratings else 0
+    return rating / 1000
+
+
+@feature('rating_gap')
+def rating_gap_feature(match, scorer):
+    ratings = _player_ratings(match)
+    if len(ratings) < 2:
+        return 0.0
+    return abs(ratings[0] - ratings[1]) / 100
+
+
+@feature('minutes')
+def minutes_feature(match, scorer):
+    return float(match.get('minutes') or 0)
+
+
+@feature('map')
+def map_feature(match, scorer):
+    map_name = str(match.get('map') or match.get('text') or '').lower()
+    if any(preferred in map_name for preferred in scorer.preferred_maps):
+        return 1.0
+    if any(avoided in map_name for avoided in scorer.avoid_maps):
+        return -1.0
+    return 0.0
+
+
+@feature('civ_novelty')
+def civ_novelty_feature(match, scorer):
+    civs = match.get('civilizations') or []
+    if len(civs) < 2:
+        return 0.0
+    matchup = frozenset(civ.lower() for civ in civs[:2])
+    return 0.0 if matchup in scorer.recent_matchups() else 1.0
+
+
+@feature('recent_players')
+def recent_players_feature(match, scorer):
+    players = [player.lower() for player in match.get('players') or []]
+    if not players:
+        return 0.0
+    recent = scorer.recent_players()
+    return sum(1 for player in players if player in recent) / len(players)
+
+
+@feature('favorites')
+def favorites_feature(match, scorer):
+    players = [player.lower() for player in match.get('players') or []]
+    text = str(match.get('text') or '').lower()
+    return float(sum(1 for favorite in scorer.crowd_favorites if favorite in players or favorite in text))
+
+
+@feature('one_v_one')
+def one_v_one_feature(match, scorer):
+    if match.get('player_count') == 2 and match.get('mode') == 'AUTOMATCH':
+        return 1.0
+    if match.get('is_1v1'):
+        return 0.7
+    return 0.0
+
+
+def match_key(match) -> str:
+    """Stable identity for a candidate across sources"""
+    if match.get('match_id') is not None:
+        return str(match['match_id'])
+    return '|'.join(sorted(player.lower() for player in match.get('players') or []))
+
+
+class MatchScorer:
+    """Weighted linear ranker over the registered features.
+
+    `rank()` drops ineligible candidates (not AUTOMATCH, not 1v1, below
+    min_rating, no spectate button) and returns the rest best first, each
+    with its `score` and `features`. `record_streamed()` feeds the novelty
+    and recently-streamed features.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, min_rating: int = 1100,
+                 preferred_maps=("arabia",), avoid_maps=(), crowd_favorites=None,
+                 history_size: int = 10, candidate_log: Optional[str] = None, source: str = "companion"):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        self.min_rating = min_rating
+        self.preferred_maps = [m.lower() for m in preferred_maps]
+        self.avoid_maps = [m.lower() for m in avoid_maps]
+        self.crowd_favorites = [f.lower() for f in (crowd_favorites or DEFAULT_CROWD_FAVORITES)]
+        self.history = deque(maxlen=history_size)
+        self.candidate_log = candidate_log
+        self.source = source
+        self._last_set_id = None
+
+    @classmethod
+    def from_config(cls, config, **overrides):
+        """Build from config.py attributes (MIN_GAME_ELO, MATCH_SCORING_*)"""
+        kwargs = dict(
+            weights=getattr(config, 'MATCH_SCORING_WEIGHTS', None),
+            min_rating=getattr(config, 'MIN_GAME_ELO', 1100),
+            preferred_maps=getattr(config, 'MATCH_SCORING_PREFERRED_MAPS', ("arabia",)),
+            avoid_maps=getattr(config, 'MATCH_SCORING_AVOID_MAPS', ()),
+            crowd_favorites=getattr(config, 'MATCH_SCORING_CROWD_FAVORITES', None),
+            candidate_log=getattr(config, 'MATCH_SCORING_CANDIDATE_LOG', None),
+        )
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def recent_players(self):
+        return {player for entry in self.history for player in entry['players']}
+
+    def recent_matchups(self):
+        return {entry['matchup'] for entry in self.history if entry['matchup']}
+
+    def is_eligible(self, match) -> bool:
+        return (
+            match.get('mode') == 'AUTOMATCH'
+            and bool(match.get('is_1v1'))
+            and match.get('has_spectate', True)
+            and (match.get('rating') or 0) >= self.min_rating
+        )
+
+    def feature_matrix(self, matches) -> np.ndarray:
+        """One row per match, one column per registered feature"""
+        extractors = list(FEATURES.values())
+        matrix = np.zeros((len(matches), len(extractors)), dtype=np.float64)
+        for i, match in enumerate(matches):
+            for j, extract in enumerate(extractors):
+                try:
+                    matrix[i, j] = extract(match, self)
+                except Exception as e:
+                    logging.debug(f"Feature {list(FEATURES)[j]} failed for {match_key(match)}: {e}")
+        return matrix
+
+    def weight_vector(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        weights = weights or self.weights
+        return np.array([weights.get(name, 0.0) for name in FEATURES], dtype=np.float64)
+
+    def rank(self, matches, eligible_only: bool = True) -> List[Dict[str, Any]]:
+        """Score every candidate at once and return them best first"""
+        if eligible_only:
+            matches = [match for match in matches if self.is_eligible(match)]
+        if not matches:
+            return []
+
+        matrix = self.feature_matrix(matches)
+        scores = matrix @ self.weight_vector()
+        order = np.argsort(-scores, kind='stable')
+
+        names = list(FEATURES)
+        ranked = []
+        for i in order:
+            ranked.append(dict(matches[i], score=float(scores[i]),
+                               features=dict(zip(names, matrix[i].round(4).tolist()))))
+
+        if self.candidate_log:
+            self._log_candidates(ranked)
+        return ranked
+
+    def record_streamed(self, match):
+        """Remember a streamed game for the novelty features (and the offline log)"""
+        civs = match.get('civilizations') or []
+        self.history.append({
+            'players': {player.lower() for player in match.get('players') or []},
+            'matchup': frozenset(civ.lower() for civ in civs[:2]) if len(civs) >= 2 else None,
+        })
+        if self.candidate_log and self._last_set_id is not None:
+            self._append_log({'type': 'streamed', 'set_id': self._last_set_id, 'key': match_key(match)})
+
+    def _log_candidates(self, ranked):
+        self._last_set_id = f"{time.time():.3f}"
+        self._append_log({
+            'type': 'candidates',
+            'set_id': self._last_set_id,
+            'source': self.source,
+            'weights': self.weights,
+            'candidates': [
+                {'key': match_key(match), 'map': match.get('map'), 'players': match.get('players'),
+                 'rating': match.get('rating'), 'features': match['features'], 'score': match['score']}
+                for match in ranked
+            ],
+        })
+
+    def _append_log(self, record):
+        try:
+            with open(self.candidate_log, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        except Exception as e:
+            logging.error(f"Error writing candidate log: {e}")
+
+
+def evaluate(log_path: str, weights: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Re-score logged candidate sets with `weights` using their stored features.
+    Reports how often the new top pick matches the logged one, where the game
+    that was actually streamed would have ranked, and the mean features of the
+    new top picks.
+    """
+    sets, streamed = {}, {}
+    with open(log_path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record['type'] == 'candidates' and record['candidates']:
+                sets[record['set_id']] = record
+            elif record['type'] == 'streamed':
+                streamed[record['set_id']] = record['key']
+
+    agree, streamed_ranks, top_features = 0, [], []
+    for set_id, record in sets.items():
+        candidates = record['candidates']
+        names = list(candidates[0]['features'])
+        matrix = np.array([[c['features'].get(name, 0.0) for name in names] for c in candidates])
+        scores = matrix @ np.array([weights.get(name, 0.0) for name in names])
+        order = np.argsort(-scores, kind='stable')
+
+        if order[0] == 0:
+            agree += 1
+        top_features.append(matrix[order[0]])
+        if set_id in streamed:
+            keys = [candidates[i]['key'] for i in order]
+            if streamed[set_id] in keys:
+                streamed_ranks.append(keys.index(streamed[set_id]) + 1)
+
+    total = len(sets)
+    return {
+        'candidate_sets': total,
+        'top_pick_agreement': agree / total if total else 0.0,
+        'streamed_sets': len(streamed_ranks),
+        'mean_streamed_rank': float(np.mean(streamed_ranks)) if streamed_ranks else None,
+        'mean_top_pick_features': dict(zip(names, np.mean(top_features, axis=0).round(3).tolist())) if total else {},
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-score logged candidate sets with different weights")
+    parser.add_argument('log', help="JSONL written via MATCH_SCORING_CANDIDATE_LOG")
+    parser.add_argument('--weights', default='', help="Overrides, e.g. rating=2.5,minutes=-0.3")
+    args = parser.parse_args()
+
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, args.weights.split(',')):
+        name, value = item.split('=')
+        weights[name.strip()] = float(value)
+
+    print(json.dumps(evaluate(args.log, weights), indent=2))
@@ -0,0 +1,200 @@
+# autospectate/match_source.py
+
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Leaderboards that count as ranked 1v1 automatch on aoe2companion
+AUTOMATCH_LEADERBOARDS = {'rm_1v1', 'ew_1v1', 'rm_1v1_console', 3, 13}
+
+
+class MatchSource(ABC):
+    """Where ongoing matches come from.
+
+    `fetch_matches()` returns match dicts in the same shape as
+    web_automation.parse_table_row (map, mode, minutes, rating, players,
+    elos, civilizations, player_count, is_1v1, has_spectate), plus
+    `match_id` when the source knows it.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def fetch_matches(self) -> List[Dict[str, Any]]:
+        ...
+
+
+class CompanionApiSource(MatchSource):
+    """Pulls the ongoing matches list as JSON over a pooled, conditional HTTP session.
+
+    The ETag / Last-Modified of the last 200 response are sent back on the
+    next poll; a 304 reuses the previously parsed matches (with their game
+    minutes recomputed) instead of downloading and parsing again.
+    """
+
+    name = "companion_api"
+
+    def __init__(self, api_url: str, timeout: float = 5.0, pool_size: int = 4,
+                 session: Optional[requests.Session] = None):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = session or self._build_session(pool_size)
+
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._cached: List[Dict[str, Any]] = []
+        # Shared by the prefetcher thread and the main loop
+        self._lock = threading.Lock()
+
+        self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0, 'last_fetch_ms': 0.0}
+
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Accept': 'application/json', 'User-Agent': 'aoe2-autospectate'})
+        return session
+
+    def fetch_matches(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._fetch_matches()
+
+    def _fetch_matches(self) -> List[Dict[str, Any]]:
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+
+        started = time.perf_counter()
+        self.stats['requests'] += 1
+        try:
+            response = self.session.get(self.api_url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                self.stats['not_modified'] += 1
+                matches = [self._refresh_minutes(dict(match)) for match in self._cached]
+            else:
+                response.raise_for_status()
+                matches = parse_companion_matches(response.json())
+                self._etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
+                self._cached = matches
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.stats['errors'] += 1
+            logging.error(f"Error fetching ongoing matches from {self.api_url}: {e}")
+            raise
+        finally:
+            self.stats['last_fetch_ms'] = (time.perf_counter() - started) * 1000
+
+        logging.info(f"Fetched {len(matches)} ongoing matches from API "
+                     f"({'cached' if response.status_code == 304 else 'fresh'}, {self.stats['last_fetch_ms']:.0f}ms)")
+        return matches
+
+    @staticmethod
+    def _refresh_minutes(match: Dict[str, Any]) -> Dict[str, Any]:
+        started = match.get('started')
+        if started:
+            match['minutes'] = max(0, int((time.time() - started) // 60))
+        return match
+
+    def close(self):
+        self.session.close()
+
+
+class PageScrapeSource(MatchSource):
+    """Reads matches from the rendered ongoing page (see web_automation.extract_matches_table)"""
+
+    name = "page_scrape"
+
+    def __init__(self, get_page: Callable[[], Any]):
+        self.get_page = get_page
+
+    def fetch_matches(self) -> List[Dict[str, Any]]:
+        from web_automation import extract_matches_table
+        return extract_matches_table(self.get_page())
+
+
+def _first(data: Dict[str, Any], *keys, default=None):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ''):
+            return value
+    return default
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        # Accept seconds or milliseconds
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_companion_match(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize one API match into the shared match dict shape"""
+    players_raw = []
+    for team in raw.get('teams') or []:
+        players_raw.extend(team.get('players') or [])
+    if not players_raw:
+        players_raw = raw.get('players') or []
+
+    players, elos, civilizations, ratings = [], [], [], []
+    for player in players_raw:
+        players.append(str(_first(player, 'name', 'playerName', default='Unknown')))
+        rating = _first(player, 'rating', 'elo')
+        elos.append(str(rating) if rating is not None else '?')
+        if isinstance(rating, (int, float)) and rating > 0:
+            ratings.append(rating)
+        civ = _first(player, 'civName', 'civ_name', 'civ')
+        if civ is not None:
+            civilizations.append(str(civ).replace('_', ' ').title() if isinstance(civ, str) else str(civ))
+
+    leaderboard = _first(raw, 'leaderboardId', 'leaderboard_id', 'leaderboard')
+    started = _parse_timestamp(_first(raw, 'started', 'startedAt', 'started_at'))
+    rating = _first(raw, 'averageRating', 'average_rating')
+    if rating is None and ratings:
+        rating = sum(ratings) / len(ratings)
+
+    match = {
+        'match_id': _first(raw, 'matchId', 'match_id'),
+        'map': _first(raw, 'mapName', 'map_name', 'map', default='Unknown'),
+        'mode': 'AUTOMATCH' if leaderboard in AUTOMATCH_LEADERBOARDS or raw.get('ranked') else 'Other',
+        'players': players,
+        'elos': elos,
+        'civilizations': civilizations,
+        'player_count': len(players),
+        'is_1v1': len(players) == 2,
+        'has_spectate': True,
+        'started': started,
+    }
+    if rating is not None:
+        match['rating'] = int(rating)
+    if started:
+        match['minutes'] = max(0, int((time.time() - started) // 60))
+    return match
+
+
+def parse_companion_matches(payload) -> List[Dict[str, Any]]:
+    """Normalize an API response (a list, or an object with a 'matches' list)"""
+    raw_matches = payload.get('matches', []) if isinstance(payload, dict) else payload or []
+    matches = []
+    for raw in raw_matches:
+        try:
+            matches.append(parse_companion_match(raw))
+        except Exception as e:
+            logging.warning(f"Skipping unparseable match {raw.get('matchId', '?')}: {e}")
+    return matches
@@ -0,0 +1,297 @@
+# autospectate/mock_obs_server.py
+#
+# Minimal obs-websocket v5 server for tests, stdlib only. Speaks the
+# Hello/Identify handshake (optionally with a password), single requests and
+# RequestBatch, keeps scene/input state like OBS does and broadcasts the
+# matching events. Counts every request so tests can assert round-trips.
+#
+#   python mock_obs_server.py --port 4455 --latency 20
+
+import json
+import time
+import base64
+import socket
+import struct
+import hashlib
+import logging
+import argparse
+import threading
+import socketserver
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from obs_client import auth_string
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+DEFAULT_SCENES = ['GoingLiveLoop', 'Game', 'GoingOffline', 'FindingGame']
+DEFAULT_INPUTS = {'MatchInfo': {'text': ''}, 'StatsOverlay': {'text': ''}}
+
+
+class MockOBSServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, password: Optional[str] = None,
+                 scenes: Optional[List[str]] = None, inputs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 latency_ms: float = 0):
+        self.password = password
+        self.latency_ms = latency_ms
+        self.scenes = list(scenes or DEFAULT_SCENES)
+        self.current_scene = self.scenes[-1]
+        self.inputs = {name: dict(settings) for name, settings in (inputs or DEFAULT_INPUTS).items()}
+        self.lock = threading.Lock()
+        self.clients = []
+        self.accepting = True  # False: refuse new connections, as if OBS weren't running
+        self.round_trips = 0
+        self.request_types = Counter()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.drop_clients()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def drop_clients(self):
+        """Close every connection, as if OBS had quit"""
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.round_trips = 0
+            self.request_types.clear()
+
+    # OBS behaviour
+
+    def handle_request(self, request_type: str, data: Dict[str, Any]):
+        """Returns (ok, response_data, events)"""
+        with self.lock:
+            self.request_types[request_type] += 1
+            if request_type == 'GetVersion':
+                return True, {'obsWebSocketVersion': '5.0.0', 'rpcVersion': 1}, []
+            if request_type == 'GetSceneList':
+                return True, {'currentProgramSceneName': self.current_scene,
+                              'scenes': [{'sceneName': name} for name in self.scenes]}, []
+            if request_type == 'GetCurrentProgramScene':
+                return True, {'currentProgramSceneName': self.current_scene}, []
+            if request_type == 'SetCurrentProgramScene':
+                if data.get('sceneName') not in self.scenes:
+                    return False, None, []
+                self.current_scene = data['sceneName']
+                return True, None, [('CurrentProgramSceneChanged', {'sceneName': self.current_scene})]
+            if request_type == 'GetInputSettings':
+                if data.get('inputName') not in self.inputs:
+                    return False, None, []
+                return True, {'inputSettings': dict(self.inputs[data['inputName']])}, []
+            if request_type == 'SetInputSettings':
+                name = data.get('inputName')
+                if name not in self.inputs:
+                    return False, None, []
+                if data.get('overlay', True):
+                    self.inputs[name].update(data.get('inputSettings') or {})
+                else:
+                    self.inputs[name] = dict(data.get('inputSettings') or {})
+                return True, None, [('InputSettingsChanged', {'inputName': name, 'inputSettings': dict(self.inputs[name])})]
+        return False, None, []
+
+    def set_scene_externally(self, scene_name: str):
+        """Switch scene as if someone clicked in OBS"""
+        with self.lock:
+            self.current_scene = scene_name
+        self._broadcast([('CurrentProgramSceneChanged', {'sceneName': scene_name})])
+
+    def _broadcast(self, events):
+        with self.lock:
+            clients = list(self.clients)
+        for event_type, event_data in events:
+            message = {'op': 5, 'd': {'eventType': event_type, 'eventIntent': 1, 'eventData': event_data}}
+            for client in clients:
+                client.send_json(message)
+
+    def _respond(self, request: Dict[str, Any]):
+        ok, response_data, events = self.handle_request(request.get('requestType'), request.get('requestData') or {})
+        result = {'requestType': request.get('requestType'),
+                  'requestStatus': {'result': ok, 'code': 100 if ok else 600}}
+        if request.get('requestId'):
+            result['requestId'] = request['requestId']
+        if response_data is not None:
+            result['responseData'] = response_data
+        return result, events
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def setup(self):
+                self.send_lock = threading.Lock()
+                self.closed = False
+
+            def handle(self):
+                if not mock.accepting or not self._handshake():
+                    return
+                with mock.lock:
+                    mock.clients.append(self)
+                try:
+                    self._session()
+                finally:
+                    with mock.lock:
+                        if self in mock.clients:
+                            mock.clients.remove(self)
+
+            def _session(self):
+                hello = {'obsWebSocketVersion': '5.0.0', 'rpcVersion': 1}
+                challenge = salt = None
+                if mock.password:
+                    challenge, salt = base64.b64encode(b'challenge').decode(), base64.b64encode(b'salt').decode()
+                    hello['authentication'] = {'challenge': challenge, 'salt': salt}
+                self.send_json({'op': 0, 'd': hello})
+
+                identify = self.recv_json()
+                if identify is None or identify.get('op') != 1:
+                    return
+                if mock.password and identify['d'].get('authentication') != auth_string(mock.password, salt, challenge):
+                    self.close(4009)
+                    return
+                self.send_json({'op': 2, 'd': {'negotiatedRpcVersion': 1}})
+
+                while True:
+                    message = self.recv_json()
+                    if message is None:
+                        return
+                    op, data = message.get('op'), message.get('d', {})
+                    if mock.latency_ms:
+                        time.sleep(mock.latency_ms / 1000)
+                    events = []
+                    if op == 6:
+                        result, events = mock._respond(data)
+                        response = {'op': 7, 'd': result}
+                    elif op == 8:
+                        results = []
+                        for request in data.get('requests', []):
+                            result, request_events = mock._respond(request)
+                            results.append(result)
+                            events += request_events
+                        response = {'op': 9, 'd': {'requestId': data.get('requestId'), 'results': results}}
+                    else:
+                        continue
+                    with mock.lock:
+                        mock.round_trips += 1
+                    self.send_json(response)
+                    mock._broadcast(events)
+
+            # WebSocket plumbing (RFC 6455, text frames only)
+
+            def _handshake(self):
+                request = b''
+                while b'\r\n\r\n' not in request:
+                    chunk = self.request.recv(4096)
+                    if not chunk:
+                        return False
+                    request += chunk
+                headers = {}
+                for line in request.decode('latin-1').split('\r\n')[1:]:
+                    if ':' in line:
+                        key, value = line.split(':', 1)
+                        headers[key.strip().lower()] = value.strip()
+                accept = base64.b64encode(hashlib.sha1((headers['sec-websocket-key'] + WEBSOCKET_GUID).encode()).digest()).decode()
+                self.request.sendall((
+                    "HTTP/1.1 101 Switching Protocols\r\n"
+                    "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                    f"Sec-WebSocket-Accept: {accept}\r\n"
+                    "Sec-WebSocket-Protocol: obswebsocket.json\r\n\r\n").encode())
+                return True
+
+            def _recv_exact(self, size):
+                data = b''
+                while len(data) < size:
+                    chunk = self.request.recv(size - len(data))
+                    if not chunk:
+                        raise ConnectionError("client closed")
+                    data += chunk
+                return data
+
+            def recv_json(self):
+                try:
+                    while True:
+                        first, second = self._recv_exact(2)
+                        opcode, length = first & 0x0F, second & 0x7F
+                        if length == 126:
+                            length = struct.unpack('>H', self._recv_exact(2))[0]
+                        elif length == 127:
+                            length = struct.unpack('>Q', self._recv_exact(8))[0]
+                        mask = self._recv_exact(4) if second & 0x80 else b'\x00' * 4
+                        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(length)))
+                        if opcode == 0x8:
+                            return None
+                        if opcode == 0x9:
+                            self._send_frame(0xA, payload)
+                        elif opcode == 0x1:
+                            return json.loads(payload.decode('utf-8'))
+                except (ConnectionError, OSError, ValueError):
+                    return None
+
+            def _send_frame(self, opcode, payload):
+                header = bytes([0x80 | opcode])
+                if len(payload) < 126:
+                    header += bytes([len(payload)])
+                elif len(payload) < 65536:
+                    header += bytes([126]) + struct.pack('>H', len(payload))
+                else:
+                    header += bytes([127]) + struct.pack('>Q', len(payload))
+                with self.send_lock:
+                    if not self.closed:
+                        self.request.sendall(header + payload)
+
+            def send_json(self, message):
+                try:
+                    self._send_frame(0x1, json.dumps(message).encode('utf-8'))
+                except OSError:
+                    pass
+
+            def close(self, code=1000):
+                try:
+                    self._send_frame(0x8, struct.pack('>H', code))
+                except OSError:
+                    pass
+                self.closed = True
+                try:
+                    self.request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock obs-websocket v5 server")
+    parser.add_argument('--port', type=int, default=4455)
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--latency', type=float, default=0, help='Delay every response by this many ms')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = MockOBSServer(port=args.port, password=args.password, latency_ms=args.latency).start()
+    logging.info(f"Mock OBS listening on ws://127.0.0.1:{server.port}")
+    try:
+        while True:
+            time.sleep(5)
+            logging.info(f"Round-trips so far: {server.round_trips} {dict(server.request_types)}")
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,260 @@
+# autospectate/obs_client.py
+
+import json
+import uuid
+import base64
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import websocket
+
+# obs-websocket v5 opcodes
+OP_HELLO = 0
+OP_IDENTIFY = 1
+OP_IDENTIFIED = 2
+OP_EVENT = 5
+OP_REQUEST = 6
+OP_REQUEST_RESPONSE = 7
+OP_REQUEST_BATCH = 8
+OP_REQUEST_BATCH_RESPONSE = 9
+
+# Event subscriptions: Scenes (1 << 2) | Inputs (1 << 3)
+EVENT_SUBSCRIPTIONS = (1 << 2) | (1 << 3)
+
+
+class OBSRequestError(Exception):
+    pass
+
+
+def auth_string(password: str, salt: str, challenge: str) -> str:
+    """obs-websocket v5 authentication response"""
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode()).digest()).decode()
+    return base64.b64encode(hashlib.sha256((secret + challenge).encode()).digest()).decode()
+
+
+class OBSClient:
+    """Persistent obs-websocket v5 connection with a local mirror of OBS state.
+
+    The current program scene, scene list and the settings of inputs we
+    write are mirrored locally and kept fresh from OBS events. Writes are
+    diffed against the mirror: switching to the scene that is already live,
+    or setting text that is already shown, costs no round-trip. Everything
+    that does change goes out in one RequestBatch.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 4455, password: Optional[str] = None,
+                 timeout: float = 5.0, inputs: Optional[List[str]] = None,
+                 on_close: Optional[Callable[[], None]] = None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.on_close = on_close  # called from the reader thread when OBS drops us
+        self.ws = None
+        self.connected = False
+        self._reader = None
+        self._send_lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+
+        # Mirrored OBS state
+        self.scenes: List[str] = []
+        self.current_scene: Optional[str] = None
+        self.inputs: Dict[str, Dict[str, Any]] = {}
+        self.tracked_inputs = list(inputs or [])
+        self.state_lock = threading.Lock()
+
+        self.stats = {'round_trips': 0, 'requests': 0, 'skipped': 0, 'events': 0}
+        self.game_stats = dict(self.stats)
+
+    # Connection
+
+    def connect(self) -> bool:
+        try:
+            self.ws = websocket.create_connection(f"ws://{self.host}:{self.port}", timeout=self.timeout,
+                                                  subprotocols=['obswebsocket.json'])
+            hello = json.loads(self.ws.recv())
+            if hello.get('op') != OP_HELLO:
+                raise OBSRequestError(f"Expected Hello, got {hello}")
+
+            identify = {'rpcVersion': 1, 'eventSubscriptions': EVENT_SUBSCRIPTIONS}
+            authentication = hello['d'].get('authentication')
+            if authentication:
+                identify['authentication'] = auth_string(self.password or '', authentication['salt'],
+                                                         authentication['challenge'])
+            self.ws.send(json.dumps({'op': OP_IDENTIFY, 'd': identify}))
+            identified = json.loads(self.ws.recv())
+            if identified.get('op') != OP_IDENTIFIED:
+                raise OBSRequestError(f"Identify failed: {identified}")
+
+            # Reads block on the reader thread from here on
+            self.ws.settimeout(None)
+            self.connected = True
+            self._reader = threading.Thread(target=self._read_loop, name='obs-reader', daemon=True)
+            self._reader.start()
+            self.sync_state(self.tracked_inputs)
+            logging.info(f"Connected to OBS on {self.host}:{self.port}, scene '{self.current_scene}'")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to connect to OBS: {e}")
+            self.close()
+            return False
+
+    def close(self):
+        self.connected = False
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+        self._fail_pending("connection closed")
+
+    def _fail_pending(self, reason: str):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for slot in pending.values():
+            slot['error'] = reason
+            slot['event'].set()
+
+    def _read_loop(self):
+        lost = False
+        while self.connected:
+            try:
+                message = json.loads(self.ws.recv())
+            except Exception as e:
+                # Not lost if close() is what ended the read
+                lost = self.connected
+                if lost:
+                    logging.warning(f"OBS connection lost: {e}")
+                break
+            op, data = message.get('op'), message.get('d', {})
+            if op in (OP_REQUEST_RESPONSE, OP_REQUEST_BATCH_RESPONSE):
+                with self._pending_lock:
+                    slot = self._pending.pop(data.get('requestId'), None)
+                if slot:
+                    slot['response'] = data
+                    slot['event'].set()
+            elif op == OP_EVENT:
+                self._apply_event(data.get('eventType'), data.get('eventData') or {})
+        self.connected = False
+        self._fail_pending("connection lost")
+        if lost and self.on_close:
+            self.on_close()
+
+    def _apply_event(self, event_type: str, event_data: Dict[str, Any]):
+        """Keep the mirror in step with changes made in OBS itself"""
+        self.stats['events'] += 1
+        with self.state_lock:
+            if event_type == 'CurrentProgramSceneChanged':
+                self.current_scene = event_data.get('sceneName')
+            elif event_type == 'SceneCreated':
+                self.scenes.append(event_data.get('sceneName'))
+            elif event_type == 'SceneRemoved':
+                self.scenes = [s for s in self.scenes if s != event_data.get('sceneName')]
+            elif event_type == 'InputSettingsChanged':
+                name = event_data.get('inputName')
+                if name in self.inputs:
+                    self.inputs[name].update(event_data.get('inputSettings') or {})
+            elif event_type == 'InputRemoved':
+                self.inputs.pop(event_data.get('inputName'), None)
+
+    # Requests
+
+    def _round_trip(self, op: int, data: Dict[str, Any], request_count: int) -> Dict[str, Any]:
+        if not self.connected:
+            raise OBSRequestError("Not connected to OBS")
+        request_id = data['requestId']
+        slot = {'event': threading.Event(), 'response': None, 'error': None}
+        with self._pending_lock:
+            self._pending[request_id] = slot
+        with self._send_lock:
+            self.ws.send(json.dumps({'op': op, 'd': data}))
+        for stats in (self.stats, self.game_stats):
+            stats['round_trips'] += 1
+            stats['requests'] += request_count
+
+        if not slot['event'].wait(self.timeout):
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise OBSRequestError(f"OBS did not answer {request_id} within {self.timeout}s")
+        if slot['error']:
+            raise OBSRequestError(slot['error'])
+        return slot['response']
+
+    def call(self, request_type: str, request_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send one request and return its responseData"""
+        data = {'requestType': request_type, 'requestId': uuid.uuid4().hex}
+        if request_data:
+            data['requestData'] = request_data
+        response = self._round_trip(OP_REQUEST, data, 1)
+        status = response.get('requestStatus', {})
+        if not status.get('result'):
+            raise OBSRequestError(f"{request_type} failed: {status.get('comment') or status.get('code')}")
+        return response.get('responseData') or {}
+
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send requests ({'requestType', 'requestData'}) in one RequestBatch; returns their results"""
+        if not requests:
+            return []
+        data = {'requestId': uuid.uuid4().hex, 'haltOnFailure': False, 'executionType': 0,
+                'requests': requests}
+        response = self._round_trip(OP_REQUEST_BATCH, data, len(requests))
+        return response.get('results', [])
+
+    # Mirrored state
+
+    def sync_state(self, input_names: Optional[List[str]] = None):
+        """Refresh the mirror from OBS in a single batch"""
+        names = list(input_names or self.inputs or self.tracked_inputs)
+        requests = [{'requestType': 'GetSceneList'}]
+        requests += [{'requestType': 'GetInputSettings', 'requestData': {'inputName': name}} for name in names]
+        results = self.batch(requests)
+
+        with self.state_lock:
+            scene_list = results[0].get('responseData') or {}
+            self.scenes = [scene['sceneName'] for scene in scene_list.get('scenes', [])]
+            self.current_scene = scene_list.get('currentProgramSceneName', self.current_scene)
+            for name, result in zip(names, results[1:]):
+                if result.get('requestStatus', {}).get('result'):
+                    self.inputs[name] = dict((result.get('responseData') or {}).get('inputSettings') or {})
+
+    def apply(self, scene: Optional[str] = None, inputs: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+        """Bring OBS to the given scene / input settings, sending only what differs from the mirror"""
+        requests, changes = [], []
+        with self.state_lock:
+            if scene is not None and scene != self.current_scene:
+                requests.append({'requestType': 'SetCurrentProgramScene', 'requestData': {'sceneName': scene}})
+                changes.append(('scene', scene, None))
+            for name, settings in (inputs or {}).items():
+                known = self.inputs.get(name)
+                delta = {k: v for k, v in settings.items() if known is None or known.get(k) != v}
+                if delta:
+                    requests.append({'requestType': 'SetInputSettings',
+                                     'requestData': {'inputName': name, 'inputSettings': delta, 'overlay': True}})
+                    changes.append(('input', name, delta))
+
+        if not requests:
+            for stats in (self.stats, self.game_stats):
+                stats['skipped'] += 1
+            return True
+
+        results = self.batch(requests)
+        ok = True
+        with self.state_lock:
+            for (kind, name, delta), result in zip(changes, results):
+                if not result.get('requestStatus', {}).get('result'):
+                    logging.error(f"OBS {result.get('requestType')} failed: {result.get('requestStatus')}")
+                    ok = False
+                elif kind == 'scene':
+                    self.current_scene = name
+                else:
+                    self.inputs.setdefault(name, {}).update(delta)
+        return ok
+
+    def begin_game(self) -> Dict[str, int]:
+        """Start a new per-game round-trip count; returns the finished game's counts"""
+        finished = self.game_stats
+        self.game_stats = {key: 0 for key in self.stats}
+        return finished
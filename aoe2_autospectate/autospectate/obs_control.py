@@ -1,6 +1,13 @@
-from obswebsocket import obsws, requests
 import time
 import logging
+import threading
+
+from obs_client import OBSClient
+
+# Text source showing the current match
+MATCH_INFO_INPUT = "MatchInfo"
+# Text source showing live territory/army stats during a game
+STATS_INPUT = "StatsOverlay"
 
 class OBSManager:
     host = 'localhost'
@@ -18,113 +25,160 @@ class OBSManager:
         self.current_scene = None
         self.last_scene_switch = 0
         self.min_scene_duration = 1.0
+        # What OBS should be showing; replayed by the supervisor after a reconnect
+        self.desired_scene = None
+        self.desired_inputs = {}
+        self.desired_lock = threading.Lock()
+        self.supervisor = None
         logging.info("OBS Manager initialized")
 
     def connect(self):
+        logging.info(f"Attempting to connect to OBS on {self.host}:{self.port}")
+        if self.ws is not None:
+            self.ws.close()
+        # Mirror the overlay text too, so repeated updates are free
+        self.ws = OBSClient(self.host, self.port, self.password, inputs=[MATCH_INFO_INPUT, STATS_INPUT],
+                            on_close=self._connection_lost)
+        if not self.ws.connect():
+            return False
+
+        self.current_scene = self.ws.current_scene
+        logging.info(f"Available scenes: {self.available_scenes}")
+        logging.info("Successfully connected to OBS")
+        return True
+
+    @property
+    def available_scenes(self):
+        return self.ws.scenes if self.ws else []
+
+    def is_connected(self):
+        return self.ws is not None and self.ws.connected
+
+    def _connection_lost(self):
+        logging.warning("OBS closed the connection")
+        if self.supervisor:
+            self.supervisor.connection_lost()
+
+    def ensure_obs_connected(self):
+        """True if OBS is reachable now. With a supervisor running this never blocks:
+        it only asks the supervisor to reconnect."""
         try:
-            logging.info(f"Attempting to connect to OBS on {self.host}:{self.port}")
-            self.ws = obsws(self.host, self.port, self.password)
-            self.ws.connect()
-            
-            # Verify connection by getting scenes
-            scenes_response = self.ws.call(requests.GetSceneList())
-            if scenes_response.status:
-                self.available_scenes = [scene['sceneName'] for scene in scenes_response.datain['scenes']]
-                logging.info(f"Available scenes: {self.available_scenes}")
-                
-                # Get available sources
-                sources_response = self.ws.call(requests.GetSourcesList())
-                if sources_response.status:
-                    self.available_sources = [source['sourceName'] for source in sources_response.datain['sources']]
-                    logging.info(f"Available sources: {self.available_sources}")
-                
-                logging.info("Successfully connected to OBS")
+            if self.is_connected():
                 return True
-            return False
-            
+            if self.supervisor:
+                self.supervisor.request_reconnect()
+                return False
+            logging.info("OBS connection lost, attempting to reconnect...")
+            return self.connect()
         except Exception as e:
-            logging.error(f"Failed to connect to OBS. Error details: {str(e)}")
+            logging.error(f"Error checking OBS connection: {e}")
             return False
 
-    def ensure_obs_connected(self):
+    def _request(self, scene=None, inputs=None):
+        """Record the wanted scene/input state, then push it if OBS is up.
+
+        While disconnected under a supervisor the command counts as queued and
+        succeeds; only the latest state is replayed on reconnect.
+        """
+        with self.desired_lock:
+            if scene is not None:
+                self.desired_scene = scene
+            for name, settings in (inputs or {}).items():
+                self.desired_inputs.setdefault(name, {}).update(settings)
+        if not self.ensure_obs_connected():
+            return self.supervisor is not None
         try:
-            if not self.ws or not self.ws.ws:
-                logging.info("OBS connection lost, attempting to reconnect...")
-                return self.connect()
-            
-            # Test connection with a simple request
-            try:
-                self.ws.call(requests.GetVersion())
+            return self.ws.apply(scene=scene, inputs=inputs)
+        except Exception as e:
+            if self.supervisor and not self.is_connected():
+                # Dropped mid-request; the replay will cover it
+                logging.warning(f"OBS went away during an update, queued for reconnect: {e}")
                 return True
-            except:
-                logging.info("OBS connection test failed, reconnecting...")
-                return self.connect()
-                
+            raise
+
+    def replay(self):
+        """Bring a freshly connected OBS to the latest desired state in one batch"""
+        with self.desired_lock:
+            scene = self.desired_scene
+            inputs = {name: dict(settings) for name, settings in self.desired_inputs.items()}
+        try:
+            ok = self.ws.apply(scene=scene, inputs=inputs)
+            if ok and scene:
+                self.current_scene = scene
+            logging.info(f"Replayed OBS state after reconnect: scene={scene}, inputs={list(inputs)}")
+            return ok
         except Exception as e:
-            logging.error(f"Error checking OBS connection: {e}")
+            logging.error(f"Error replaying OBS state: {e}")
             return False
 
     def switch_scene(self, scene_name):
         try:
-            if not self.ensure_obs_connected():
-                return False
-
-            # Verify scene exists
-            if scene_name not in self.available_scenes:
+            # Verify scene exists (the scene list is only known once we've connected)
+            if self.available_scenes and scene_name not in self.available_scenes:
                 logging.error(f"Scene '{scene_name}' not found. Available scenes: {self.available_scenes}")
                 return False
 
-            # Rate limiting
+            # Rate limiting, only when the scene actually changes on a live connection
             current_time = time.time()
-            if current_time - self.last_scene_switch < self.min_scene_duration:
+            if (self.is_connected() and self.ws.current_scene != scene_name
+                    and current_time - self.last_scene_switch < self.min_scene_duration):
                 time.sleep(self.min_scene_duration - (current_time - self.last_scene_switch))
 
-            response = self.ws.call(requests.SetCurrentProgramScene(sceneName=scene_name))
-            if response.status:
+            if self._request(scene=scene_name):
                 self.current_scene = scene_name
                 self.last_scene_switch = time.time()
                 logging.info(f"Successfully switched to scene: {scene_name}")
                 return True
             else:
-                logging.error(f"Failed to switch scene. Response: {response}")
+                logging.error(f"Failed to switch scene to {scene_name}")
                 return False
 
         except Exception as e:
             logging.error(f"Error switching scene: {e}")
             return False
+
+    def format_match_text(self, match_info):
+        """Format as: "B Tier - Arabia [~1452]" then player names and civs below"""
+        # Extract tier information
+        tier = match_info.get('tier', '?')
+        rating = match_info.get('rating', 0)
+        
+        line1 = f"{tier} Tier - {match_info.get('map', 'Unknown')} [~{rating}]"
+        
+        # Player info
+        p1_name = match_info['players'][0] if len(match_info.get('players', [])) > 0 else 'Player 1'
+        p2_name = match_info['players'][1] if len(match_info.get('players', [])) > 1 else 'Player 2'
+        p1_civ = match_info['civilizations'][0] if len(match_info.get('civilizations', [])) > 0 else '?'
+        p2_civ = match_info['civilizations'][1] if len(match_info.get('civilizations', [])) > 1 else '?'
+        
+        line2 = f"{p1_name} ({p1_civ}) vs {p2_name} ({p2_civ})"
+        
+        return f"{line1}\n{line2}"
+
+    def set_overlay(self, scene_name=None, match_info=None):
+        """Switch scene and update the match text in a single batch; unchanged parts are skipped"""
+        try:
+            text_content = self.format_match_text(match_info) if match_info else ""
+            ok = self._request(scene=scene_name, inputs={MATCH_INFO_INPUT: {"text": text_content}})
+            if ok and scene_name:
+                self.current_scene = scene_name
+                self.last_scene_switch = time.time()
+            return ok
+        except Exception as e:
+            logging.error(f"Error updating OBS overlay: {e}")
+            return False
                             
     def update_match_text(self, match_info):
         """Update the match information text in OBS"""
         try:
             if not match_info:
                 return self.clear_match_text()
+
+            text_content = self.format_match_text(match_info)
             
-            # Extract tier information
-            tier = match_info.get('tier', '?')
-            rating = match_info.get('rating', 0)
-            
-            # Format as: "B Tier - Arabia [~1452]"
-            # Then player names and civs below
-            line1 = f"{tier} Tier - {match_info.get('map', 'Unknown')} [~{rating}]"
-            
-            # Player info
-            p1_name = match_info['players'][0] if len(match_info.get('players', [])) > 0 else 'Player 1'
-            p2_name = match_info['players'][1] if len(match_info.get('players', [])) > 1 else 'Player 2'
-            p1_civ = match_info['civilizations'][0] if len(match_info.get('civilizations', [])) > 0 else '?'
-            p2_civ = match_info['civilizations'][1] if len(match_info.get('civilizations', [])) > 1 else '?'
-            
-            line2 = f"{p1_name} ({p1_civ}) vs {p2_name} ({p2_civ})"
-            
-            text_content = f"{line1}\n{line2}"
-            
-            # Update the text source in OBS
-            response = self.ws.call(requests.SetInputSettings(
-                inputName="MatchInfo",
-                inputSettings={"text": text_content}
-            ))
-            
-            if not response.status:
-                logging.error(f"Failed to update text: {response.datain}")
+            # Only sent if the text differs from what OBS already shows
+            if not self._request(inputs={MATCH_INFO_INPUT: {"text": text_content}}):
+                logging.error("Failed to update text")
                 return False
             
             logging.info(f"Updated OBS text: {text_content.replace(chr(10), ' | ')}")  # Log single line version
@@ -135,33 +189,40 @@ class OBSManager:
             return False
 
     def clear_match_text(self):
-        """Clear the match text using the correct OBS request type."""
+        """Clear the match text"""
         try:
-            if not self.ensure_obs_connected():
-                return False
-
-            response = self.ws.call(requests.SetInputSettings(
-                inputName="MatchInfo",
-                inputSettings={"text": ""}
-            ))
-            
-            if response.status:
+            if self._request(inputs={MATCH_INFO_INPUT: {"text": ""}}):
                 logging.info("Successfully cleared match text")
                 return True
                 
-            logging.error(f"Failed to clear match text. Response: {response}")
+            logging.error("Failed to clear match text")
             return False
 
         except Exception as e:
             logging.error(f"Error clearing match text: {e}")
             return False
 
+    def update_stats_text(self, text):
+        """Set the live stats text; called from the stats overlay thread, never the camera loop"""
+        try:
+            return self._request(inputs={STATS_INPUT: {"text": text}})
+        except Exception as e:
+            logging.error(f"Error updating stats text: {e}")
+            return False
 
+    def begin_game(self):
+        """Log the OBS round-trips spent on the previous game and start counting afresh"""
+        if self.ws:
+            finished = self.ws.begin_game()
+            logging.info(f"OBS traffic last game: {finished['round_trips']} round-trips, "
+                         f"{finished['requests']} requests, {finished['skipped']} no-op updates skipped")
 
     def disconnect(self):
+        if self.supervisor:
+            self.supervisor.stop()
         if self.ws:
             try:
-                self.ws.disconnect()
+                self.ws.close()
                 logging.info("Disconnected from OBS")
             except Exception as e:
                 logging.error(f"Error disconnecting from OBS: {e}")
@@ -0,0 +1,82 @@
+# autospectate/obs_supervisor.py
+
+import random
+import logging
+import threading
+
+
+class OBSSupervisor:
+    """Keeps an OBSManager connected from a background thread.
+
+    It sleeps until the OBS client reports the socket closed, then reconnects
+    with full-jitter exponential backoff. Scene and overlay commands issued
+    meanwhile are only recorded by the manager as its desired state, and the
+    latest of each is replayed once the connection is back, so the main loop
+    never waits on OBS.
+    """
+
+    def __init__(self, obs_manager, base_backoff=1.0, max_backoff=30.0):
+        self.obs_manager = obs_manager
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.attempt = 0
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.stats = {'disconnects': 0, 'attempts': 0, 'reconnects': 0, 'replays': 0}
+
+    def start(self):
+        self.obs_manager.supervisor = self
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='obs-supervisor', daemon=True)
+        self.thread.start()
+        if not self.obs_manager.is_connected():
+            self.wake.set()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+        if self.obs_manager.supervisor is self:
+            self.obs_manager.supervisor = None
+
+    def connection_lost(self):
+        """Called by the OBS client's reader thread when the socket closes"""
+        self.stats['disconnects'] += 1
+        self.wake.set()
+
+    def request_reconnect(self):
+        """A command found OBS down; make sure a reconnect is under way"""
+        self.wake.set()
+
+    @property
+    def reconnecting(self):
+        return self.thread is not None and not self.obs_manager.is_connected()
+
+    def next_delay(self):
+        """Full jitter: uniform between 0 and the capped exponential backoff"""
+        cap = min(self.max_backoff, self.base_backoff * (2 ** self.attempt))
+        return random.uniform(0, cap)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            while not self.stop_event.is_set() and not self.obs_manager.is_connected():
+                self.stats['attempts'] += 1
+                if self.obs_manager.connect():
+                    logging.info(f"Reconnected to OBS after {self.attempt + 1} attempt(s)")
+                    self.attempt = 0
+                    self.stats['reconnects'] += 1
+                    if self.obs_manager.replay():
+                        self.stats['replays'] += 1
+                    break
+                delay = self.next_delay()
+                self.attempt += 1
+                logging.warning(f"OBS reconnect attempt {self.attempt} failed, retrying in {delay:.1f}s")
+                if self.stop_event.wait(delay):
+                    return
@@ -0,0 +1,201 @@
+# autospectate/persistence.py
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+def atomic_write_bytes(path: str, data: bytes, backup: bool = False):
+    """Write bytes to a temp file next to the target, then rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    if backup and os.path.exists(path):
+        shutil.copy2(path, f"{path}.backup")
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = None, backup: bool = False):
+    """Serialize to JSON and write it atomically."""
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode('utf-8'), backup=backup)
+
+
+class _Target:
+    def __init__(self, path: str, snapshot: Callable[[], Any], writer: Callable[[str, Any], None]):
+        self.path = path
+        self.snapshot = snapshot
+        self.writer = writer
+
+
+class PersistenceService:
+    """Coalesces state writes on an asyncio loop and performs them off-loop.
+
+    Callers mark a named target dirty; all marks inside `flush_delay` seconds
+    collapse into one write. The snapshot is taken on the loop (so it is
+    consistent) and the file write runs in the default thread executor.
+    """
+
+    def __init__(self, flush_delay: float = 2.0, stall_probe_interval: float = 0.25,
+                 stall_threshold_ms: float = 50.0):
+        self.flush_delay = flush_delay
+        self.stall_probe_interval = stall_probe_interval
+        self.stall_threshold_ms = stall_threshold_ms
+
+        self._targets: Dict[str, _Target] = {}
+        self._dirty = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        self.metrics = {
+            'dirty_marks': 0,
+            'writes': 0,
+            'write_errors': 0,
+            'last_snapshot_ms': 0.0,
+            'last_write_ms': 0.0,
+            'loop_stall_max_ms': 0.0,
+            'loop_stall_total_ms': 0.0,
+            'loop_stall_events': 0,
+        }
+
+    def register(self, name: str, path: str, snapshot: Callable[[], Any],
+                 writer: Callable[[str, Any], None] = atomic_write_json):
+        """Register a persisted target. `writer(path, data)` runs in a worker thread."""
+        self._targets[name] = _Target(path, snapshot, writer)
+
+    def _wake_event(self) -> asyncio.Event:
+        # Created on the loop before any flush task exists, so stop() can always cut the wait short
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    def start(self):
+        """Start the event-loop stall probe. Must be called from the loop."""
+        self._wake_event()
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    def mark_dirty(self, name: str):
+        """Schedule `name` to be written within `flush_delay` seconds."""
+        if name not in self._targets:
+            logging.error(f"Unknown persistence target: {name}")
+            return
+
+        self._dirty.add(name)
+        self.metrics['dirty_marks'] += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (scripts/tests): fall back to a synchronous write
+            self.flush_sync()
+            return
+
+        if self._flush_task is None or self._flush_task.done():
+            wake = self._wake_event()
+            self._flush_task = loop.create_task(self._delayed_flush(wake))
+
+    async def _delayed_flush(self, wake: asyncio.Event):
+        while self._dirty:
+            try:
+                # stop() sets the event to cut the coalescing window short
+                await asyncio.wait_for(wake.wait(), timeout=self.flush_delay)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if wake.is_set():
+                break
+
+    async def flush(self):
+        """Write every dirty target now."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            names, self._dirty = self._dirty, set()
+            loop = asyncio.get_running_loop()
+
+            for name in names:
+                target = self._targets[name]
+                started = time.perf_counter()
+                data = target.snapshot()
+                self.metrics['last_snapshot_ms'] = (time.perf_counter() - started) * 1000
+
+                started = time.perf_counter()
+                try:
+                    await loop.run_in_executor(None, target.writer, target.path, data)
+                except Exception as e:
+                    logging.error(f"Error persisting {name}: {e}")
+                    self.metrics['write_errors'] += 1
+                    self._dirty.add(name)  # Retry on the next flush
+                    continue
+
+                self.metrics['last_write_ms'] = (time.perf_counter() - started) * 1000
+                self.metrics['writes'] += 1
+                logging.info(
+                    f"Persisted {name} (snapshot {self.metrics['last_snapshot_ms']:.1f}ms, "
+                    f"write {self.metrics['last_write_ms']:.1f}ms, "
+                    f"loop stall max {self.metrics['loop_stall_max_ms']:.1f}ms)"
+                )
+
+    def flush_sync(self):
+        """Write every dirty target on the calling thread."""
+        names, self._dirty = self._dirty, set()
+        for name in names:
+            target = self._targets[name]
+            try:
+                target.writer(target.path, target.snapshot())
+                self.metrics['writes'] += 1
+            except Exception as e:
+                logging.error(f"Error persisting {name}: {e}")
+                self.metrics['write_errors'] += 1
+
+    async def stop(self):
+        """Stop the stall probe and flush anything still pending."""
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
+
+        if self._flush_task and not self._flush_task.done():
+            self._wake.set()
+            await self._flush_task
+        self._flush_task = None
+        self._wake = None
+        await self.flush()
+
+    async def _probe_loop(self):
+        """Measure how late the loop wakes us up; lateness is time the loop was blocked."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.stall_probe_interval
+            await asyncio.sleep(self.stall_probe_interval)
+            stall_ms = max(0.0, (loop.time() - expected) * 1000)
+            if stall_ms >= self.stall_threshold_ms:
+                self.metrics['loop_stall_events'] += 1
+                self.metrics['loop_stall_total_ms'] += stall_ms
+                self.metrics['loop_stall_max_ms'] = max(self.metrics['loop_stall_max_ms'], stall_ms)
+                logging.warning(f"Event loop stalled for {stall_ms:.1f}ms")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return a copy of the persistence and loop-stall metrics."""
+        metrics = dict(self.metrics)
+        metrics['coalesced_marks'] = max(0, metrics['dirty_marks'] - metrics['writes'])
+        return metrics
+
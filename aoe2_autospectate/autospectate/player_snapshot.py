@@ -0,0 +1,259 @@
+# autospectate/player_snapshot.py
+#
+# Columnar binary snapshot of the whole player table.
+#
+# Layout (little-endian):
+#   header   : magic b'SALT', uint16 version, uint32 player count
+#   sections : each is a uint32 byte length followed by the payload
+#     user_ids     NUL-joined UTF-8 strings, one per player
+#     usernames    NUL-joined UTF-8 table of distinct usernames
+#     name_index   uint32 per player, index into the username table
+#     ages         NUL-joined UTF-8 table of distinct ages
+#     age_index    uint8 per player, index into the age table
+#     <int column> int64 per player, one section per INT_COLUMNS entry
+#     last_updated float64 per player
+#
+# Every column is converted with a single array()/tobytes()/frombytes()
+# call instead of per-player struct packing or dict building.
+
+import json
+import logging
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List
+
+from betting_records import Player
+from persistence import atomic_write_bytes
+
+MAGIC = b'SALT'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+SECTION_LENGTH = struct.Struct('<I')
+
+INT_COLUMNS = ('points', 'biggest_win', 'biggest_loss', 'biggest_bet', 'total_bets', 'wins', 'losses')
+
+
+def _to_le(arr: array) -> bytes:
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode: str, payload: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(payload)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def _join_strings(strings: List[str]) -> bytes:
+    return '\0'.join(strings).encode('utf-8')
+
+
+def _split_strings(payload: bytes, count: int) -> List[str]:
+    if count == 0:
+        return []
+    return payload.decode('utf-8').split('\0')
+
+
+def _intern_table(values: List[str]):
+    """Return (distinct values, per-row index into them)"""
+    table: Dict[str, int] = {}
+    indexes = [table.setdefault(value, len(table)) for value in values]
+    return list(table), indexes
+
+
+def encode_snapshot(players: Dict[str, Player]) -> bytes:
+    """Encode a user_id -> Player mapping into the columnar format"""
+    # Old-format integer entries are upgraded the same way load_points does
+    records = [
+        player if isinstance(player, Player) else Player(user_id=user_id, username='Unknown', points=player)
+        for user_id, player in players.items()
+    ]
+    user_ids = list(players)
+
+    usernames, name_index = _intern_table([p.username for p in records])
+    ages, age_index = _intern_table([p.age for p in records])
+
+    sections = [
+        _join_strings(user_ids),
+        _join_strings(usernames),
+        _to_le(array('I', name_index)),
+        _join_strings(ages),
+        _to_le(array('B', age_index)),
+    ]
+    for column in INT_COLUMNS:
+        sections.append(_to_le(array('q', [getattr(p, column) for p in records])))
+    sections.append(_to_le(array('d', [p.last_updated for p in records])))
+
+    parts = [HEADER.pack(MAGIC, VERSION, len(records))]
+    for payload in sections:
+        parts.append(SECTION_LENGTH.pack(len(payload)))
+        parts.append(payload)
+    return b''.join(parts)
+
+
+def decode_snapshot(data: bytes) -> Dict[str, Player]:
+    """Decode the columnar format back into a user_id -> Player mapping"""
+    magic, version, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a player snapshot file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported player snapshot version: {version}")
+
+    view = memoryview(data)
+    offset = HEADER.size
+    sections = []
+    while offset < len(data):
+        (length,) = SECTION_LENGTH.unpack_from(data, offset)
+        offset += SECTION_LENGTH.size
+        sections.append(bytes(view[offset:offset + length]))
+        offset += length
+
+    expected_sections = 5 + len(INT_COLUMNS) + 1
+    if len(sections) != expected_sections:
+        raise ValueError(f"Corrupt player snapshot: {len(sections)} sections, expected {expected_sections}")
+
+    user_ids = _split_strings(sections[0], count)
+    usernames = [sys.intern(name) for name in _split_strings(sections[1], count)]
+    name_index = _from_le('I', sections[2])
+    ages = [sys.intern(age) for age in _split_strings(sections[3], count)]
+    age_index = _from_le('B', sections[4])
+    int_columns = [_from_le('q', payload) for payload in sections[5:5 + len(INT_COLUMNS)]]
+    last_updated = _from_le('d', sections[-1])
+
+    columns = [len(user_ids), len(name_index), len(age_index), len(last_updated)]
+    columns.extend(len(column) for column in int_columns)
+    if any(length != count for length in columns):
+        raise ValueError("Corrupt player snapshot: column lengths do not match player count")
+
+    players = {}
+    for user_id, name_i, age_i, (points, biggest_win, biggest_loss, biggest_bet, total_bets, wins, losses), updated in zip(
+            user_ids, name_index, age_index, zip(*int_columns), last_updated):
+        players[user_id] = Player(
+            user_id, usernames[name_i], points, ages[age_i],
+            biggest_win, biggest_loss, biggest_bet, total_bets, wins, losses, updated
+        )
+    return players
+
+
+def save_snapshot(path: str, players: Dict[str, Player], backup: bool = False):
+    """Encode and atomically write a snapshot"""
+    atomic_write_bytes(path, encode_snapshot(players), backup=backup)
+
+
+def load_snapshot(path: str) -> Dict[str, Player]:
+    """Read and decode a snapshot"""
+    with open(path, 'rb') as f:
+        return decode_snapshot(f.read())
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: python player_snapshot.py --players 100000
+# Compares the snapshot against the legacy JSON path (asdict + json, indent=2).
+# Each load runs in a fresh interpreter so RSS is measured in isolation.
+# ---------------------------------------------------------------------------
+
+def _load_json_players(path: str) -> Dict[str, Player]:
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return {
+        user_id: Player(
+            user_id=user_id,
+            username=value.get('username', 'Unknown'),
+            points=value.get('points', 500),
+            age=value.get('age', 'Dark'),
+            biggest_win=value.get('biggest_win', 0),
+            biggest_loss=value.get('biggest_loss', 0),
+            biggest_bet=value.get('biggest_bet', 0),
+            total_bets=value.get('total_bets', 0),
+            wins=value.get('wins', 0),
+            losses=value.get('losses', 0),
+            last_updated=value.get('last_updated', 0)
+        )
+        for user_id, value in data.items()
+    }
+
+
+def _bench_load(fmt: str, path: str):
+    import psutil
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    started = time.perf_counter()
+    players = load_snapshot(path) if fmt == 'snapshot' else _load_json_players(path)
+    elapsed = time.perf_counter() - started
+    rss = process.memory_info().rss
+    print(json.dumps({
+        'players': len(players),
+        'load_s': elapsed,
+        'rss_mb': rss / 1024 / 1024,
+        'rss_delta_mb': (rss - baseline) / 1024 / 1024,
+    }))
+
+
+def _run_benchmark(count: int, workdir: str):
+    import os
+    import random
+    import subprocess
+    from dataclasses import asdict
+
+    ages = ["Dark", "Feudal", "Castle", "Imperial"]
+    players = {
+        str(100000000 + i): Player(
+            user_id=str(100000000 + i),
+            username=f"viewer_{random.randint(0, count // 2)}",
+            points=random.randint(0, 50000),
+            age=random.choice(ages),
+            wins=random.randint(0, 200),
+            losses=random.randint(0, 200),
+        )
+        for i in range(count)
+    }
+
+    json_path = os.path.join(workdir, 'bench_user_points.json')
+    snapshot_path = os.path.join(workdir, 'bench_user_points.bin')
+
+    started = time.perf_counter()
+    with open(json_path, 'w') as f:
+        json.dump({user_id: asdict(p) for user_id, p in players.items()}, f, indent=2)
+    json_save = time.perf_counter() - started
+
+    started = time.perf_counter()
+    save_snapshot(snapshot_path, players)
+    snapshot_save = time.perf_counter() - started
+
+    print(f"{count:,} players")
+    for fmt, path, save_s in (('json', json_path, json_save), ('snapshot', snapshot_path, snapshot_save)):
+        result = subprocess.run(
+            [sys.executable, __file__, '--bench-load', fmt, path],
+            capture_output=True, text=True, check=True
+        )
+        stats = json.loads(result.stdout)
+        print(
+            f"{fmt:>8}: save {save_s:.3f}s | load {stats['load_s']:.3f}s | "
+            f"file {os.path.getsize(path) / 1024 / 1024:.1f}MB | "
+            f"RSS {stats['rss_mb']:.1f}MB (+{stats['rss_delta_mb']:.1f}MB)"
+        )
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark player snapshot vs JSON")
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--bench-load', nargs=2, metavar=('FORMAT', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.bench_load:
+        _bench_load(*args.bench_load)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            _run_benchmark(args.players, workdir)
@@ -44,9 +44,7 @@ class RecoveryManager:
                 logging.error("Game failed to reach ready state")
                 return False
                 
-            # Reset state
-            self.main_flow.state_manager.transition_to(GameState.FINDING_GAME)
-            
+            # The caller moves back to FINDING_GAME on the event loop
             logging.info(f"Successfully recovered from {error_state}")
             return True
             
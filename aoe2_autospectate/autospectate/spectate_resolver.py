@@ -0,0 +1,104 @@
+# autospectate/spectate_resolver.py
+
+import sys
+import time
+import logging
+import subprocess
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+SPECTATE_URL_TEMPLATE = "aoe2de://1/{match_id}"
+
+
+def build_spectate_url(match_id) -> str:
+    """The same URL the companion spectate modal hands to the AoE2 URL helper"""
+    return SPECTATE_URL_TEMPLATE.format(match_id=match_id)
+
+
+def launch_spectate_url(url: str) -> bool:
+    """Hand an aoe2de:// URL to the OS protocol handler"""
+    try:
+        if sys.platform == "win32":
+            # Use Windows start command
+            subprocess.run(["cmd", "/c", "start", "", url], shell=False, check=True)
+        else:
+            opener = "open" if sys.platform == "darwin" else "xdg-open"
+            subprocess.Popen([opener, url])
+        return True
+    except Exception as e:
+        logging.error(f"Failed to launch {url}: {e}")
+        return False
+
+
+class SpectateResolver:
+    """Spectates a match by launching its aoe2de:// URL directly.
+
+    The match ID comes from the companion feed or the bulk table extraction,
+    so no click, modal or route interception is needed. When a match has no
+    ID (or the launch fails) and a page button is available, the modal dance
+    in web_automation is used as a fallback. Both paths are counted and
+    timed, and the modal fallback reports which of its methods worked.
+    """
+
+    def __init__(self, modal_fallback: Optional[Callable] = None,
+                 launcher: Callable[[str], bool] = launch_spectate_url):
+        self.modal_fallback = modal_fallback
+        self.launcher = launcher
+        self.stats: Dict[str, Any] = {
+            'direct': {'attempts': 0, 'wins': 0, 'total_ms': 0.0},
+            'modal': {'attempts': 0, 'wins': 0, 'total_ms': 0.0},
+            'modal_paths': {},
+        }
+
+    def can_resolve(self, match: Dict[str, Any]) -> bool:
+        return match.get('match_id') is not None
+
+    def spectate(self, match: Dict[str, Any], page=None, button=None):
+        """Returns (success, spectate_url or None)"""
+        if self.can_resolve(match):
+            url = build_spectate_url(match['match_id'])
+            with self._timed('direct') as result:
+                logging.info(f"Launching spectate URL directly: {url}")
+                result['won'] = self.launcher(url)
+            if result['won']:
+                return True, url
+            logging.warning("Direct spectate launch failed, trying the modal")
+
+        if self.modal_fallback is None or page is None or button is None:
+            return False, None
+
+        with self._timed('modal') as result:
+            success, url = self.modal_fallback(page, button, match, on_path=self._record_modal_path)
+            result['won'] = success
+        return success, url
+
+    def _record_modal_path(self, path: str):
+        paths = self.stats['modal_paths']
+        paths[path] = paths.get(path, 0) + 1
+
+    @contextmanager
+    def _timed(self, path: str):
+        stats = self.stats[path]
+        stats['attempts'] += 1
+        result = {'won': False}
+        started = time.perf_counter()
+        try:
+            yield result
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats['total_ms'] += elapsed_ms
+            if result['won']:
+                stats['wins'] += 1
+            logging.info(f"Spectate via {path}: {'ok' if result['won'] else 'failed'} in {elapsed_ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        summary = {}
+        for path in ('direct', 'modal'):
+            stats = self.stats[path]
+            summary[path] = {
+                'attempts': stats['attempts'],
+                'wins': stats['wins'],
+                'avg_ms': round(stats['total_ms'] / stats['attempts'], 1) if stats['attempts'] else 0.0,
+            }
+        summary['modal_paths'] = dict(self.stats['modal_paths'])
+        return summary
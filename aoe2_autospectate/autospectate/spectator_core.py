@@ -7,7 +7,7 @@ import logging
 import random
 from collections import deque
 from typing import Dict, List, Tuple, Optional
-from threading import Lock 
+from threading import Lock, Event 
 import math
 from betting_bridge import BettingBridge 
 import requests
@@ -287,7 +287,7 @@ class BaseMonitor:
 
 
 class SpectatorCore:
-    def __init__(self, config, betting_bridge=None):
+    def __init__(self, config, betting_bridge=None, stats_publisher=None, stop_event=None):
         # Basic configuration
         self.config = config
         self.minimap_x = config.MINIMAP_X
@@ -315,6 +315,12 @@ class SpectatorCore:
         # betting
         self.betting_bridge = betting_bridge
 
+        # Live stats overlay (StatsOverlayPublisher), fed once per iteration
+        self.stats_publisher = stats_publisher
+        self.last_breaches = []
+        # Set from another thread to end run_spectator; owned by MainFlow so it outlives this game
+        self.stop_event = stop_event or Event()
+
         # Initialize
         self.base_monitor = BaseMonitor(self)
         
@@ -548,6 +554,7 @@ class SpectatorCore:
 
             # Handle territory breaches (with increased importance)
             breaches = self.check_territory_breaches(curr_minimap, mask)
+            self.last_breaches = breaches
             for breach in breaches:
                 breach['importance'] *= 3.6
                 if breach.get('color'):
@@ -1734,6 +1741,10 @@ class SpectatorCore:
             focus_checks_enabled = True
             
             while True:
+                if self.stop_event.is_set():
+                    logging.info("Spectator stop requested, leaving spectator loop")
+                    return False
+
                 current_time = time.time()
                 
                 # Only perform focus checks during the initial period
@@ -1771,6 +1782,28 @@ class SpectatorCore:
             return False
     
 
+    def publish_stats(self, military_activities):
+        """Hand this iteration's numbers to the stats overlay; it does its own throttling"""
+        military = {color: 0 for color in self.active_colors}
+        raids = {color: 0 for color in self.active_colors}
+        for act in military_activities:
+            color = act['color']
+            military[color] = military.get(color, 0) + act['area']
+            # A raid is an army standing closer to the enemy town center than to its own
+            enemy_color = 'Red' if color == 'Blue' else 'Blue'
+            own_base = self.base_monitor.get_tc_position(color)
+            enemy_base = self.base_monitor.get_tc_position(enemy_color)
+            if own_base and enemy_base and (self.calculate_distance(act['position'], enemy_base) <
+                                            self.calculate_distance(act['position'], own_base)):
+                raids[color] = raids.get(color, 0) + 1
+        self.stats_publisher.observe(
+            territory=self.territory_tracker.territory_share,
+            military=military,
+            raids=raids,
+            breaches=len(self.last_breaches),
+            colors=self.active_colors
+        )
+
     def run_spectator_iteration(self):
         """Run a single iteration of the spectator logic."""
         try:
@@ -1866,6 +1899,9 @@ class SpectatorCore:
             self.territory_tracker.update(curr_minimap, self.player_colors_config, 
                                         self.active_colors, mask)
 
+            if self.stats_publisher:
+                self.publish_stats(military_activities)
+
             # Handle view duration
             current_activity = self.viewing_queue.get_current_view()
             if current_activity and current_activity.get('type') == 'combat_zone':
@@ -2433,6 +2469,7 @@ class TerritoryTracker:
         """Initialize the territory tracker with updated parameters."""
         self.territories = {}
         self.heat_map = None
+        self.territory_share = {}
         self.last_update = 0
         self.update_interval = 2.0  # Reduced for more frequent updates
         self.last_density_map = None
@@ -2506,9 +2543,11 @@ class TerritoryTracker:
             self.heat_map = np.zeros_like(minimap_image[:,:,0], dtype=float)
         
         # Update each player's territory
+        presence = {}
         for color in active_colors:
             self.initialize_player(color)
             density = self.get_color_density(minimap_image, color, hsv_ranges, minimap_mask)
+            presence[color] = float(np.sum(density[minimap_mask > 0]) if minimap_mask is not None else np.sum(density))
             
             # Update territory info
             main_base = self.identify_main_base(density)
@@ -2520,6 +2559,10 @@ class TerritoryTracker:
                 valid_area = minimap_mask > 0
                 self.heat_map[valid_area] += density[valid_area]
 
+        # Each color's share of everything the heat map saw this update
+        total = sum(presence.values())
+        self.territory_share = {color: (value / total if total > 0 else 0.0) for color, value in presence.items()}
+
         # Normalize heat map to range [0, 1]
         if minimap_mask is not None:
             valid_area = minimap_mask > 0
@@ -1,7 +1,8 @@
 # autospectate/state_management.py
 
 from enum import Enum, auto
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Callable
+from collections import deque
 import time
 import logging
 
@@ -33,25 +34,62 @@ class StateManager:
             GameState.SETTING_UP_VIEW: 3,
             GameState.SPECTATING: 1
         }
+        # Time spent per state, for checking states against their timeouts
+        self.history = deque(maxlen=200)
+        self.state_stats: Dict[GameState, Dict[str, float]] = {}
+        # Called with (old_state, new_state, duration, reason, at) on every transition
+        self.listeners: List[Callable] = []
 
-    def transition_to(self, new_state: GameState) -> bool:
+    def add_listener(self, listener: Callable):
+        self.listeners.append(listener)
+
+    def transition_to(self, new_state: GameState, reason: Optional[str] = None) -> bool:
         """
         Attempt to transition to a new state with validation.
+        `reason` is passed on to listeners (e.g. the timeline).
         Returns True if transition was successful.
         """
         if not self._is_valid_transition(new_state):
             logging.error(f"Invalid state transition: {self.current_state} -> {new_state}")
             return False
 
-        # Reset retry count for new state
-        self.retry_counts[new_state] = 0
+        # Reset retry count for new state (a retry of the same state keeps counting)
+        if new_state != self.current_state:
+            self.retry_counts[new_state] = 0
+        
+        # Record how long the state we're leaving took
+        now = time.time()
+        duration = now - self.last_state_change
+        self._record_duration(self.current_state, new_state, duration, now, reason)
         
         # Update state
-        logging.info(f"State transition: {self.current_state} -> {new_state}")
+        timeout = self.state_timeouts.get(self.current_state)
+        budget = f" (budget {timeout:.0f}s)" if timeout else ""
+        because = f" [{reason}]" if reason else ""
+        logging.info(f"State transition: {self.current_state} -> {new_state} after {duration:.1f}s{budget}{because}")
         self.current_state = new_state
-        self.last_state_change = time.time()
+        self.last_state_change = now
         return True
 
+    def _record_duration(self, old_state: GameState, new_state: GameState, duration: float, now: float,
+                         reason: Optional[str] = None):
+        self.history.append({'from': old_state.name, 'to': new_state.name, 'duration': duration, 'at': now,
+                             'reason': reason})
+        stats = self.state_stats.setdefault(old_state, {'visits': 0, 'total': 0.0, 'max': 0.0})
+        stats['visits'] += 1
+        stats['total'] += duration
+        stats['max'] = max(stats['max'], duration)
+        for listener in self.listeners:
+            try:
+                listener(old_state.name, new_state.name, duration, reason, now)
+            except Exception as e:
+                logging.error(f"State transition listener failed: {e}")
+
+    def get_budget_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-state visits, total/max seconds and the state's timeout"""
+        return {state.name: dict(stats, budget=self.state_timeouts.get(state))
+                for state, stats in self.state_stats.items()}
+
     def _is_valid_transition(self, new_state: GameState) -> bool:
         """Define valid state transitions."""
         if new_state == self.current_state:
@@ -61,8 +99,9 @@ class StateManager:
             GameState.INITIALIZING: [GameState.FINDING_GAME, GameState.ERROR],
             GameState.FINDING_GAME: [GameState.GAME_FOUND, GameState.ERROR],
             GameState.GAME_FOUND: [GameState.LOADING_GAME, GameState.ERROR],
-            GameState.LOADING_GAME: [GameState.SETTING_UP_VIEW, GameState.ERROR],
-            GameState.SETTING_UP_VIEW: [GameState.SPECTATING, GameState.ERROR],
+            # FINDING_GAME / LOADING_GAME are handle_timeout's recovery states
+            GameState.LOADING_GAME: [GameState.SETTING_UP_VIEW, GameState.FINDING_GAME, GameState.ERROR],
+            GameState.SETTING_UP_VIEW: [GameState.SPECTATING, GameState.LOADING_GAME, GameState.ERROR],
             GameState.SPECTATING: [GameState.GAME_ENDED, GameState.ERROR],
             GameState.GAME_ENDED: [GameState.FINDING_GAME, GameState.ERROR],
             GameState.ERROR: [GameState.FINDING_GAME]
@@ -0,0 +1,194 @@
+# autospectate/state_runtime.py
+
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from state_management import StateManager, GameState
+
+# A state handler returns the state to move to, or None to run again
+StateHandler = Callable[[], Awaitable[Optional[GameState]]]
+
+
+class AutomationWedgedError(Exception):
+    """An abandoned blocking call never gave the automation thread back"""
+
+
+class Monitor:
+    """A check run every `interval` seconds alongside the state handlers"""
+
+    def __init__(self, name: str, interval: float, check: Callable[[], Awaitable[None]]):
+        self.name = name
+        self.interval = interval
+        self.check = check
+        self.runs = 0
+        self.failures = 0
+
+
+class StateRuntime:
+    """Runs the GameState machine on an asyncio loop.
+
+    Each state has a coroutine handler; its time budget is the state's timeout
+    in StateManager.state_timeouts and is enforced while the handler is still
+    running, not after it returns. Health, memory and OBS checks are Monitors
+    running as their own tasks. Blocking automation (pyautogui, Playwright,
+    window switching) goes through run_blocking(), which uses one dedicated
+    thread: Playwright's sync API is bound to the thread that started it, and
+    two automation steps must never drive the desktop at the same time.
+
+    A blocking call can't be cancelled, so when a handler is cut off mid-call
+    the runtime waits up to `wedge_timeout` for the thread to come back before
+    starting the next state. If it doesn't, `on_wedged` is awaited (MainFlow
+    restarts the script); without one, AutomationWedgedError ends run().
+    """
+
+    def __init__(self, state_manager: StateManager, handlers: Dict[GameState, StateHandler],
+                 on_error: Optional[Callable[[GameState, Exception], Optional[GameState]]] = None,
+                 idle_interval: float = 0.1, error_backoff: float = 5.0, wedge_timeout: float = 30.0,
+                 on_wedged: Optional[Callable[[], Awaitable[None]]] = None):
+        self.state_manager = state_manager
+        self.handlers = handlers
+        self.on_error = on_error
+        self.idle_interval = idle_interval
+        self.error_backoff = error_backoff
+        self.wedge_timeout = wedge_timeout
+        self.on_wedged = on_wedged
+        self.monitors: List[Monitor] = []
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='automation')
+        self.jobs: Set[Future] = set()  # submitted to the automation thread and not finished
+        self.current_task: Optional[asyncio.Task] = None
+        self.requested_state: Optional[GameState] = None
+        self.stopping = False
+        self.stats = {'handler_runs': 0, 'timeouts': 0, 'errors': 0, 'interrupts': 0, 'abandoned_jobs': 0,
+                      'wedged': 0}
+
+    def add_monitor(self, name: str, interval: float, check: Callable[[], Awaitable[None]]):
+        self.monitors.append(Monitor(name, interval, check))
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking call on the automation thread without blocking the loop"""
+        job = self.executor.submit(func, *args)
+        self.jobs.add(job)
+        job.add_done_callback(self.jobs.discard)
+        return await asyncio.wrap_future(job)
+
+    async def sleep(self, seconds: float):
+        """Wait inside a handler; monitors keep running and the state budget keeps counting"""
+        await asyncio.sleep(seconds)
+
+    def request_transition(self, state: GameState):
+        """Abandon the current handler and move to `state` (used by monitors)"""
+        self.requested_state = state
+        self.interrupt()
+
+    def interrupt(self):
+        if self.current_task and not self.current_task.done():
+            self.stats['interrupts'] += 1
+            self.current_task.cancel()
+
+    def stop(self):
+        self.stopping = True
+        self.interrupt()
+
+    def remaining_budget(self) -> Optional[float]:
+        timeout = self.state_manager.state_timeouts.get(self.state_manager.current_state)
+        if timeout is None:
+            return None
+        return max(0.0, timeout - self.state_manager.get_state_duration())
+
+    async def run(self, initial_state: GameState = GameState.FINDING_GAME):
+        self.state_manager.transition_to(initial_state, reason='start')
+        monitor_tasks = [asyncio.ensure_future(self._run_monitor(monitor)) for monitor in self.monitors]
+        try:
+            while not self.stopping:
+                await self._step()
+                await asyncio.sleep(self.idle_interval)
+        finally:
+            for task in monitor_tasks:
+                task.cancel()
+            await asyncio.gather(*monitor_tasks, return_exceptions=True)
+
+    async def _step(self):
+        state = self.state_manager.current_state
+        handler = self.handlers.get(state)
+        if handler is None:
+            logging.error(f"No handler for {state}")
+            self.state_manager.transition_to(GameState.ERROR, reason='no handler')
+            return
+
+        next_state, reason = None, 'handler'
+        cut_off = False
+        self.stats['handler_runs'] += 1
+        self.current_task = asyncio.ensure_future(handler())
+        try:
+            done, _ = await asyncio.wait({self.current_task}, timeout=self.remaining_budget())
+            if done:
+                try:
+                    next_state = self.current_task.result()
+                except asyncio.CancelledError:
+                    logging.info(f"{state} handler interrupted")
+                    cut_off = True
+            else:
+                # Over budget: cancel the handler and let StateManager pick the recovery state
+                self.current_task.cancel()
+                await asyncio.gather(self.current_task, return_exceptions=True)
+                self.stats['timeouts'] += 1
+                cut_off = True
+                next_state = self.state_manager.handle_timeout() or GameState.ERROR
+                reason = 'timeout'
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.error(f"Error in {state} handler: {e}")
+            next_state = self.on_error(state, e) if self.on_error else GameState.ERROR
+            reason = f"error: {e}"
+            if next_state is None:
+                await asyncio.sleep(self.error_backoff)
+        finally:
+            self.current_task = None
+
+        if self.requested_state is not None:
+            next_state, self.requested_state = self.requested_state, None
+            reason = 'requested'
+        if next_state is not None and not self.stopping:
+            if not self.state_manager.transition_to(next_state, reason=reason):
+                self.state_manager.transition_to(GameState.ERROR, reason=f"refused {next_state.name}")
+        if cut_off:
+            # Leave the state on time, but don't start the next handler until the thread is free
+            await self._reclaim_worker(state)
+
+    async def _reclaim_worker(self, state: GameState):
+        """Wait for a blocking call the cancelled handler left running; escalate if it never returns"""
+        pending = [job for job in list(self.jobs) if not job.done()]
+        if not pending:
+            return
+        self.stats['abandoned_jobs'] += 1
+        logging.warning(f"{state} left a blocking call running, waiting up to {self.wedge_timeout}s for it")
+        _, still_running = await asyncio.wait([asyncio.wrap_future(job) for job in pending],
+                                              timeout=self.wedge_timeout)
+        if not still_running:
+            return
+        self.stats['wedged'] += 1
+        logging.critical(f"Automation thread wedged by a call from {state}")
+        if self.on_wedged is None:
+            raise AutomationWedgedError(f"automation thread still busy {self.wedge_timeout}s after {state} was cut off")
+        await self.on_wedged()
+
+    async def _run_monitor(self, monitor: Monitor):
+        while True:
+            try:
+                await monitor.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                monitor.failures += 1
+                logging.error(f"{monitor.name} check failed: {e}")
+            monitor.runs += 1
+            await asyncio.sleep(monitor.interval)
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats, monitors={m.name: {'runs': m.runs, 'failures': m.failures} for m in self.monitors},
+                    budgets=self.state_manager.get_budget_report())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
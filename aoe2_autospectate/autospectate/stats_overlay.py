@@ -0,0 +1,93 @@
+# autospectate/stats_overlay.py
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+
+def format_stats(snapshot: Dict) -> str:
+    """Render a snapshot as overlay text, rounded so minimap noise doesn't change it every frame"""
+    lines = []
+    for color in snapshot.get('colors', []):
+        territory = round(snapshot['territory'].get(color, 0) * 100)
+        army = snapshot['military'].get(color, 0)
+        # Military area is in minimap pixels; steps of 10 are plenty for a viewer
+        army = int(round(army / 10.0)) * 10
+        lines.append(f"{color}: {territory}% map | army {army} | raids {snapshot['raids'].get(color, 0)}")
+    lines.append(f"Breaches: {snapshot.get('breaches', 0)}")
+    return "\n".join(lines)
+
+
+class StatsOverlayPublisher:
+    """Pushes live game stats to an OBS text source at a fixed low rate.
+
+    The camera loop calls observe() with numbers it has already computed; that
+    only swaps in the latest snapshot. A background thread formats it every
+    `interval` seconds and publishes only when the text actually changed, so
+    OBS traffic never sits on the spectator's path.
+    """
+
+    def __init__(self, publish: Callable[[str], bool], interval: float = 2.0):
+        self.publish = publish
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.snapshot: Optional[Dict] = None
+        self.last_text: Optional[str] = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.stats = {'observed': 0, 'published': 0, 'unchanged': 0, 'errors': 0}
+
+    def observe(self, territory: Dict[str, float], military: Dict[str, float],
+                raids: Dict[str, int], breaches: int, colors=('Blue', 'Red')):
+        """Record the latest frame's numbers; cheap enough to call every iteration"""
+        snapshot = {'colors': list(colors), 'territory': dict(territory), 'military': dict(military),
+                    'raids': dict(raids), 'breaches': breaches}
+        with self.lock:
+            self.snapshot = snapshot
+            self.stats['observed'] += 1
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='stats-overlay', daemon=True)
+        self.thread.start()
+
+    def stop(self, clear: bool = True):
+        """Stop publishing; by default blank the overlay so stale stats don't linger"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+        with self.lock:
+            self.snapshot = None
+        if clear and self.last_text:
+            self._send("")
+        logging.info(f"Stats overlay stopped: {self.stats}")
+
+    def flush(self):
+        """Publish the latest snapshot now if it changes the overlay"""
+        with self.lock:
+            snapshot = self.snapshot
+        if snapshot is None:
+            return
+        text = format_stats(snapshot)
+        if text == self.last_text:
+            self.stats['unchanged'] += 1
+            return
+        self._send(text)
+
+    def _send(self, text: str):
+        try:
+            if self.publish(text):
+                self.last_text = text
+                self.stats['published'] += 1
+            else:
+                self.stats['errors'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.error(f"Error publishing stats overlay: {e}")
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.flush()
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import random
+import time
+
+from betting_records import Bet, BettingPool, Player
+from bet_ingest import BetIngestor, BetRequest
+
+
+async def simulate_bet_burst(bettors=5000, duplicate_rate=0.1, broke_rate=0.05):
+    """Fire thousands of concurrent !bet commands at the ingestor and check the pool afterwards"""
+    players = {}
+    for i in range(bettors):
+        user_id = str(1000 + i)
+        points = 5 if random.random() < broke_rate else random.randint(100, 5000)
+        players[user_id] = Player(user_id=user_id, username=f"user{i}", points=points)
+    starting_points = {user_id: p.points for user_id, p in players.items()}
+
+    pool = BettingPool(is_active=True, total_blue=0, total_red=0, bets={},
+                       start_time=time.time(), end_time=time.time() + 180)
+    pool.add_bet(Bet('house_blue', 'SaltCasino', 150, 'Blue', time.time()))
+    pool.add_bet(Bet('house_red', 'SaltCasino', 150, 'Red', time.time()))
+
+    messages = []
+
+    def debit(request):
+        players[request.user_id].points -= request.amount
+
+    ingestor = BetIngestor(
+        get_pool=lambda: pool,
+        get_balance=lambda user_id: players[user_id].points if user_id in players else 0,
+        debit=debit,
+        notify=lambda text, priority: messages.append(text),
+        snapshot_interval=0.5
+    )
+    ingestor.start()
+
+    async def bettor(user_id):
+        # Spread arrivals over ~1 s like a chat burst at game start
+        await asyncio.sleep(random.random())
+        attempts = 2 if random.random() < duplicate_rate else 1
+        for _ in range(attempts):
+            ingestor.submit(BetRequest(
+                user_id=user_id,
+                username=players[user_id].username,
+                amount=random.randint(10, 100),
+                team=random.choice(['Blue', 'Red']),
+                received_at=time.time()
+            ))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bettor(user_id) for user_id in players))
+    await ingestor.flush()
+    elapsed = time.perf_counter() - started
+    pool.is_active = False
+    await ingestor.stop()
+
+    # Invariants
+    user_bets = [bet for bet in pool.bets.values() if not bet.user_id.startswith('house_')]
+    assert len({bet.user_id for bet in user_bets}) == len(user_bets), "User has more than one bet"
+    assert pool.total_blue == sum(bet.amount for bet in pool.bets.values() if bet.team == 'Blue')
+    assert pool.total_red == sum(bet.amount for bet in pool.bets.values() if bet.team == 'Red')
+    assert pool.blue_bettors == sum(1 for bet in user_bets if bet.team == 'Blue')
+    assert pool.red_bettors == sum(1 for bet in user_bets if bet.team == 'Red')
+    for user_id, player in players.items():
+        assert player.points >= 0, f"{user_id} went negative"
+        bet = pool.bets.get(user_id)
+        expected = starting_points[user_id] - (bet.amount if bet else 0)
+        assert player.points == expected, f"{user_id} has {player.points}, expected {expected}"
+    stats = ingestor.stats
+    assert stats['accepted'] + stats['rejected'] == stats['submitted']
+    assert stats['accepted'] == len(user_bets)
+
+    logging.info(
+        f"{stats['submitted']} bets from {bettors} bettors in {elapsed:.2f}s: "
+        f"{stats['accepted']} accepted, {stats['rejected']} rejected, "
+        f"{stats['batches']} batches (largest {stats['largest_batch']}), "
+        f"max queue latency {stats['max_latency_ms']:.0f}ms, {len(messages)} chat notifications"
+    )
+    return stats
+
+
+def test_bet_ingest_burst():
+    asyncio.run(simulate_bet_burst())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(simulate_bet_burst(bettors=20000))
@@ -68,6 +68,11 @@ async def simulate_betting_round():
         logging.info("\nFinal points:")
         for user in test_users:
             logging.info(f"{user}: {bot.user_points[user]} points")
+
+        # Leaderboard index must match the player table after resolution (see test_leaderboard_index.py)
+        problems = bot.leaderboard.check_consistency(bot.user_points)
+        assert not problems, f"Leaderboard index inconsistent: {problems}"
+        logging.info(f"Leaderboard index consistent ({len(bot.leaderboard)} players)")
             
     finally:
         await bot.close()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from chat_scheduler import ChatScheduler, TokenBucket, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []  # (monotonic time, text)
+
+    async def send(self, text):
+        self.sent.append((time.monotonic(), text))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(limit=20, period=30.0, burst=5, clock=clock)
+
+    # The burst goes out at once, then one token per 30 / (20 - 5) = 2 s
+    assert [bucket.try_acquire() for _ in range(5)] == [0.0] * 5
+    wait = bucket.try_acquire()
+    assert abs(wait - 2.0) < 1e-9, wait
+
+    # Never more than the limit inside one 30 s window
+    sent = 5
+    while clock.now < 30.0:
+        clock.now += 0.25
+        if bucket.try_acquire() == 0.0:
+            sent += 1
+    assert sent <= 20, sent
+
+
+async def run_scheduler_checks():
+    channel = FakeChannel()
+    scheduler = ChatScheduler(lambda: channel, rate_limit=4, per_seconds=0.4, burst=2, max_length=20)
+
+    # Queued before the sender starts: high priority goes first, short segments share a line
+    scheduler.send("help text", priority=PRIORITY_LOW)
+    scheduler.send("Blue won", priority=PRIORITY_NORMAL)
+    scheduler.send("bet ok\nbet ok 2", priority=PRIORITY_HIGH)
+    scheduler.start()
+    assert await scheduler.drain(timeout=2.0)
+    lines = [text for _, text in channel.sent]
+    assert lines == ["bet ok | bet ok 2", "Blue won | help text"], lines
+    assert all(len(line) <= 20 for line in lines)
+
+    # Segments that each fill a line need a token apiece, so they leave at the refill rate (5/s)
+    channel.sent.clear()
+    for i in range(6):
+        scheduler.send(f"message number {i:04d}")
+    assert await scheduler.drain(timeout=3.0)
+    times = [at for at, _ in channel.sent]
+    assert [text for _, text in channel.sent] == [f"message number {i:04d}" for i in range(6)]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps[1:]) >= 0.15, gaps
+
+    # Long text is split on word boundaries rather than truncated
+    channel.sent.clear()
+    scheduler.send("one two three four five six seven eight")
+    assert await scheduler.drain(timeout=3.0)
+    assert " ".join(text for _, text in channel.sent).replace(" | ", " ") == "one two three four five six seven eight"
+
+    await scheduler.stop()
+    return scheduler.stats
+
+
+def test_chat_scheduler():
+    stats = asyncio.run(run_scheduler_checks())
+    assert stats['send_errors'] == 0, stats
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_chat_scheduler()
+    print("PASS")
@@ -0,0 +1,87 @@
+import random
+
+from betting_records import Player
+from leaderboard_index import LeaderboardIndex
+
+
+def make_players(points):
+    return {user_id: Player(user_id, user_id, points=value) for user_id, value in points.items()}
+
+
+def test_updates_ranks_and_top():
+    players = make_players({'alice': 1200, 'bob': 800, 'carol': 1200, 'dave': 500, 'house_blue': 99999})
+    players['legacy'] = 300  # old int entry: not a Player, so not indexed
+    index = LeaderboardIndex()
+    index.rebuild(players)
+    assert index.check_consistency(players) == []
+    assert len(index) == 4 and 'house_blue' not in index and 'legacy' not in index
+
+    # Ties share the best rank and are ordered by user_id
+    assert index.top(3) == [('alice', 1200), ('carol', 1200), ('bob', 800)]
+    assert [index.rank(user) for user in ('alice', 'carol', 'bob', 'dave')] == [1, 1, 3, 4]
+    assert index.rank('house_blue') is None and index.rank('nobody') is None
+
+    # A bet resolves: points move, the index follows
+    for user_id, points in (('dave', 2000), ('alice', 900), ('erin', 1000)):
+        players[user_id] = Player(user_id, user_id, points=points)
+        index.update(user_id, points)
+    index.update('house_blue', 0)
+    assert index.check_consistency(players) == []
+    assert index.top(10) == [('dave', 2000), ('carol', 1200), ('erin', 1000), ('alice', 900), ('bob', 800)]
+    assert index.rank('alice') == 4
+
+    # A player removed from the table
+    del players['bob']
+    index.discard('bob')
+    index.discard('bob')
+    assert index.check_consistency(players) == []
+    assert index.rank('bob') is None and len(index) == 4
+
+
+def test_check_consistency_reports_drift():
+    players = make_players({'alice': 1200, 'bob': 800})
+    index = LeaderboardIndex()
+    index.rebuild(players)
+
+    players['alice'].points = 100   # changed without update()
+    players['carol'] = Player('carol', 'carol', points=50)  # added without update()
+    index.update('ghost', 10)        # indexed but not in the table
+    problems = index.check_consistency(players)
+    assert "alice indexed at 1200 but has 100" in problems
+    assert "carol missing from index" in problems
+    assert "ghost indexed but not in player table" in problems
+
+    index.rebuild(players)
+    assert index.check_consistency(players) == []
+
+
+def test_random_updates_match_a_full_sort():
+    rng = random.Random(42)
+    players = {}
+    index = LeaderboardIndex()
+    for _ in range(2000):
+        user_id = f"viewer_{rng.randrange(200)}"
+        if rng.random() < 0.1:
+            players.pop(user_id, None)
+            index.discard(user_id)
+            continue
+        points = rng.randrange(0, 5000)
+        players[user_id] = Player(user_id, user_id, points=points)
+        index.update(user_id, points)
+
+    assert index.check_consistency(players) == []
+    expected = sorted(((p.points, user_id) for user_id, p in players.items()), key=lambda e: (-e[0], e[1]))
+    assert index.top(20) == [(user_id, points) for points, user_id in expected[:20]]
+    for user_id, player in players.items():
+        assert index.rank(user_id) == 1 + sum(1 for p in players.values() if p.points > player.points)
+
+    rebuilt = LeaderboardIndex()
+    rebuilt.rebuild(players)
+    assert rebuilt.top(len(players)) == index.top(len(players))
+
+
+if __name__ == "__main__":
+    test_updates_ranks_and_top()
+    test_check_consistency_reports_drift()
+    test_random_updates_match_a_full_sort()
+    print("PASS")
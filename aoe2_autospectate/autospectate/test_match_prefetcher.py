@@ -0,0 +1,100 @@
+import time
+
+from match_prefetcher import MatchPrefetcher
+from match_source import MatchSource
+
+
+class FakeSource(MatchSource):
+    """Returns whatever `matches` holds at the time of the poll"""
+
+    name = "fake"
+
+    def __init__(self, matches=()):
+        self.matches = list(matches)
+        self.calls = 0
+
+    def fetch_matches(self):
+        self.calls += 1
+        return [dict(match) for match in self.matches]
+
+
+def make_match(match_id, minutes=1, **overrides):
+    match = {'match_id': match_id, 'mode': 'AUTOMATCH', 'is_1v1': True, 'player_count': 2,
+             'has_spectate': True, 'rating': 1500, 'elos': ['1500', '1500'],
+             'players': [f'p{match_id}a', f'p{match_id}b'], 'civilizations': ['Franks', 'Goths'],
+             'map': 'Arabia', 'minutes': minutes}
+    match.update(overrides)
+    return match
+
+
+def queued_ids(prefetcher):
+    return sorted(match['match_id'] for match in prefetcher.get_candidates(limit=10))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_feed_changes_and_exclusion():
+    source = FakeSource([make_match(1), make_match(2), make_match(3, has_spectate=False), make_match(4, minutes=20)])
+    prefetcher = MatchPrefetcher(source, poll_interval=60, max_minutes=15)
+
+    # Ineligible (no spectate button) and too-old games never enter the queue
+    prefetcher.poll_once()
+    assert queued_ids(prefetcher) == [1, 2]
+    assert prefetcher.has_candidates()
+
+    # A game missing from the next poll has ended
+    source.matches = [make_match(1)]
+    prefetcher.poll_once()
+    assert queued_ids(prefetcher) == [1]
+
+    # A spectated game is dropped now and ignored in later polls
+    prefetcher.mark_spectated(1)
+    assert queued_ids(prefetcher) == []
+    prefetcher.poll_once()
+    assert queued_ids(prefetcher) == [] and not prefetcher.has_candidates()
+
+
+def test_expiry():
+    now = time.time()
+    # Listed at 3 minutes, but it actually started 16 minutes ago
+    source = FakeSource([make_match(1), make_match(2, minutes=3, started=now - 16 * 60)])
+    prefetcher = MatchPrefetcher(source, poll_interval=60, max_minutes=15, stale_after=0.2)
+
+    prefetcher.poll_once()
+    assert queued_ids(prefetcher) == [1]
+
+    # Not refreshed for stale_after seconds: dropped even though nothing else changed
+    time.sleep(0.3)
+    assert not prefetcher.has_candidates()
+    assert prefetcher.get_status()['queued'] == 0
+
+
+def test_poll_now_wakes_worker():
+    source = FakeSource([make_match(1)])
+    prefetcher = MatchPrefetcher(source, poll_interval=60)
+    prefetcher.start()
+    try:
+        assert wait_for(lambda: prefetcher.stats['polls'] == 1)
+        time.sleep(0.1)
+        assert prefetcher.stats['polls'] == 1
+
+        prefetcher.poll_now()
+        assert wait_for(lambda: prefetcher.stats['polls'] == 2, timeout=1.0)
+        assert queued_ids(prefetcher) == [1]
+    finally:
+        prefetcher.stop()
+    assert source.calls == 2
+
+
+if __name__ == "__main__":
+    test_feed_changes_and_exclusion()
+    test_expiry()
+    test_poll_now_wakes_worker()
+    print("PASS")
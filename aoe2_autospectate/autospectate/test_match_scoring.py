@@ -0,0 +1,85 @@
+import os
+import tempfile
+
+from match_scoring import DEFAULT_WEIGHTS, FEATURES, MatchScorer, evaluate
+
+
+def make_match(match_id, rating, players, civs, map_name, minutes, **overrides):
+    match = {'match_id': match_id, 'mode': 'AUTOMATCH', 'is_1v1': True, 'player_count': 2,
+             'has_spectate': True, 'rating': rating, 'elos': [str(rating), str(rating)],
+             'players': players, 'civilizations': civs, 'map': map_name, 'minutes': minutes}
+    match.update(overrides)
+    return match
+
+
+# With the default weights: A = 10.3, C = 7.05 (5.55 once streamed), B = 6.35
+A = make_match(1, 1800, ['Hera', 'Viper'], ['Franks', 'Mayans'], 'Arabia', 2)
+B = make_match(2, 1500, ['Alice', 'Bob'], ['Britons', 'Goths'], 'Arena', 1)
+C = make_match(3, 1600, ['Carol', 'Dave'], ['Huns', 'Aztecs'], 'Arabia', 1)
+INELIGIBLE = [
+    make_match(4, 900, ['Low', 'Rated'], ['Celts', 'Slavs'], 'Arabia', 1),
+    make_match(5, 1900, ['T1', 'T2', 'T3', 'T4'], [], 'Arabia', 1, is_1v1=False, player_count=4),
+    make_match(6, 2000, ['No', 'Button'], ['Celts', 'Slavs'], 'Arabia', 1, has_spectate=False),
+    make_match(7, 2000, ['Un', 'Ranked'], ['Celts', 'Slavs'], 'Arabia', 1, mode='Other'),
+]
+CANDIDATES = [B, INELIGIBLE[0], C, INELIGIBLE[1], A, INELIGIBLE[2], INELIGIBLE[3]]
+
+
+def close(value, expected):
+    return abs(value - expected) < 1e-6
+
+
+def test_feature_matrix():
+    scorer = MatchScorer(min_rating=1100)
+    row = scorer.feature_matrix([A])[0].tolist()
+    expected = {'rating': 1.8, 'rating_gap': 0.0, 'minutes': 2.0, 'map': 1.0, 'civ_novelty': 1.0,
+                'recent_players': 0.0, 'favorites': 2.0, 'one_v_one': 1.0}
+    assert dict(zip(FEATURES, row)) == expected, row
+
+
+def test_rank():
+    scorer = MatchScorer(min_rating=1100)
+    ranked = scorer.rank(CANDIDATES)
+    assert [m['match_id'] for m in ranked] == [1, 3, 2]
+    assert close(ranked[0]['score'], 10.3) and close(ranked[1]['score'], 7.05), ranked
+
+    # Streaming C makes its players and civ matchup stale, dropping it below B
+    scorer.record_streamed(C)
+    ranked = scorer.rank(CANDIDATES)
+    assert [m['match_id'] for m in ranked] == [1, 2, 3]
+    assert close(ranked[2]['score'], 5.55) and ranked[2]['features']['recent_players'] == 1.0
+
+    # Weight overrides: ignore rating and favorites, care a lot about the map
+    overridden = MatchScorer(weights={'rating': 0.0, 'favorites': 0.0, 'map': 3.0}, min_rating=1100)
+    overridden.record_streamed(C)
+    ranked = overridden.rank(CANDIDATES)
+    assert [m['match_id'] for m in ranked] == [1, 3, 2]
+    assert [round(m['score'], 2) for m in ranked] == [6.2, 4.85, 3.35]
+
+    # eligible_only=False keeps everything
+    assert len(scorer.rank(CANDIDATES, eligible_only=False)) == len(CANDIDATES)
+
+
+def test_evaluate():
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, 'candidate_sets.jsonl')
+        scorer = MatchScorer(min_rating=1100, candidate_log=log_path)
+        assert [m['match_id'] for m in scorer.rank(CANDIDATES)] == [1, 3, 2]
+        scorer.record_streamed(B)
+
+        report = evaluate(log_path, DEFAULT_WEIGHTS)
+        assert report['candidate_sets'] == 1 and report['top_pick_agreement'] == 1.0
+        assert report['streamed_sets'] == 1 and report['mean_streamed_rank'] == 3.0
+
+        # Re-scored for the map only, C (Arabia, fresh players) overtakes A as top pick
+        report = evaluate(log_path, dict(DEFAULT_WEIGHTS, rating=0.0, favorites=0.0, map=3.0))
+        assert report['top_pick_agreement'] == 0.0
+        assert report['mean_streamed_rank'] == 3.0
+        assert report['mean_top_pick_features']['favorites'] == 0.0
+
+
+if __name__ == "__main__":
+    test_feature_matrix()
+    test_rank()
+    test_evaluate()
+    print("PASS")
@@ -0,0 +1,37 @@
+import logging
+
+from fixture_server import FixtureServer
+from match_source import CompanionApiSource
+
+
+def test_companion_api_source_against_fixtures():
+    """Fetch recorded ongoing matches twice; the second poll should be a 304 served from cache"""
+    with FixtureServer() as server:
+        source = CompanionApiSource(server.url('companion_ongoing'))
+
+        matches = source.fetch_matches()
+        assert len(matches) == 5
+        hera_viper = next(m for m in matches if m['match_id'] == 401234501)
+        assert hera_viper['players'] == ['Hera', 'Viper']
+        assert hera_viper['civilizations'] == ['Mayans', 'Franks']
+        assert hera_viper['mode'] == 'AUTOMATCH' and hera_viper['is_1v1']
+        assert hera_viper['rating'] == 1712
+
+        team_game = next(m for m in matches if m['match_id'] == 401234503)
+        assert team_game['player_count'] == 4 and not team_game['is_1v1']
+        unranked = next(m for m in matches if m['match_id'] == 401234504)
+        assert unranked['mode'] == 'Other'
+
+        cached = source.fetch_matches()
+        assert [m['match_id'] for m in cached] == [m['match_id'] for m in matches]
+        assert source.stats['not_modified'] == 1
+        assert server.stats['not_modified'] == 1
+
+        source.close()
+        logging.info(f"Source stats: {source.stats}, server stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    test_companion_api_source_against_fixtures()
+    print("Match source test passed")
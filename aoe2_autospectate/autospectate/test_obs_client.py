@@ -0,0 +1,60 @@
+import time
+import logging
+
+from mock_obs_server import MockOBSServer
+from obs_control import OBSManager
+
+MATCH = {'tier': 'A', 'map': 'Arabia', 'rating': 1712,
+         'players': ['Hera', 'Viper'], 'civilizations': ['Mayans', 'Franks']}
+
+
+def simulate_game(obs):
+    """The OBS calls MainFlow makes over one game, including its repeats"""
+    scenes = obs.scenes
+    # FINDING_GAME is re-entered every retry while no match is found
+    for _ in range(3):
+        obs.switch_scene(scenes['FINDING_GAME'])
+    obs.update_match_text(MATCH)
+    obs.update_match_text(MATCH)
+    obs.switch_scene(scenes['GAME'])
+    obs.set_overlay(scenes['FINDING_GAME'], None)
+
+
+def test_obs_client():
+    with MockOBSServer(password='secret') as server:
+        obs = OBSManager()
+        obs.port, obs.password = server.port, 'secret'
+        obs.min_scene_duration = 0
+        assert obs.connect(), "could not connect to the mock server"
+        assert obs.ws.current_scene == 'FindingGame'
+        server.reset_counts()
+        obs.ws.begin_game()
+
+        simulate_game(obs)
+        game = obs.ws.begin_game()
+        print(f"Game 1: {game} | server saw {server.round_trips} round-trips {dict(server.request_types)}")
+
+        # text once, GAME once, FindingGame + clear in one batch; the repeats are free
+        assert server.round_trips == 3, server.round_trips
+        assert server.request_types['SetCurrentProgramScene'] == 2
+        assert server.request_types['SetInputSettings'] == 2
+        assert game['skipped'] == 4
+        assert server.current_scene == 'FindingGame' and server.inputs['MatchInfo']['text'] == ''
+
+        # A scene changed by hand in OBS arrives as an event; the next switch isn't skipped wrongly
+        server.set_scene_externally('GoingOffline')
+        for _ in range(50):
+            if obs.ws.current_scene == 'GoingOffline':
+                break
+            time.sleep(0.01)
+        assert obs.ws.current_scene == 'GoingOffline'
+        obs.switch_scene('FindingGame')
+        assert server.current_scene == 'FindingGame'
+
+        obs.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    test_obs_client()
+    print("PASS")
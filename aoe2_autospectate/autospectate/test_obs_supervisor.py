@@ -0,0 +1,64 @@
+import time
+import logging
+
+from mock_obs_server import MockOBSServer
+from obs_control import OBSManager
+from obs_supervisor import OBSSupervisor
+
+MATCH = {'tier': 'B', 'map': 'Arabia', 'rating': 1452,
+         'players': ['Hera', 'Viper'], 'civilizations': ['Mayans', 'Franks']}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_obs_supervisor():
+    with MockOBSServer() as server:
+        obs = OBSManager()
+        obs.port = server.port
+        obs.min_scene_duration = 0
+        assert obs.connect()
+        supervisor = OBSSupervisor(obs, base_backoff=0.05, max_backoff=0.2)
+        supervisor.start()
+
+        # OBS goes away and stays away for a while
+        server.accepting = False
+        server.drop_clients()
+        assert wait_for(lambda: not obs.is_connected())
+
+        # Commands while it's down return at once and are only queued
+        start = time.perf_counter()
+        for _ in range(20):
+            assert obs.switch_scene('Game')
+            assert obs.update_match_text(MATCH)
+            assert obs.update_stats_text("Blue: 55% map")
+        obs.set_overlay('Game', None)
+        elapsed = time.perf_counter() - start
+        assert elapsed < 0.5, f"main loop blocked for {elapsed:.2f}s"
+        assert wait_for(lambda: supervisor.stats['attempts'] >= 2)
+
+        # Back up: only the latest state is replayed, in one batch after the sync
+        server.reset_counts()
+        server.accepting = True
+        assert wait_for(lambda: supervisor.stats['replays'] == 1)
+        print(f"Supervisor: {supervisor.stats} | server saw {server.round_trips} round-trips {dict(server.request_types)}")
+        assert server.current_scene == 'Game'
+        assert server.inputs['MatchInfo']['text'] == ''
+        assert server.inputs['StatsOverlay']['text'] == "Blue: 55% map"
+        assert server.request_types['SetCurrentProgramScene'] == 1
+        assert server.round_trips == 2  # sync_state + replay
+
+        obs.disconnect()
+        assert supervisor.thread is None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    test_obs_supervisor()
+    print("PASS")
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from persistence import PersistenceService, atomic_write_json
+
+
+def test_atomic_write():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.json')
+        atomic_write_json(path, {'round': 1})
+        atomic_write_json(path, {'round': 2}, backup=True)
+        with open(path) as f:
+            assert json.load(f) == {'round': 2}
+        with open(f"{path}.backup") as f:
+            assert json.load(f) == {'round': 1}
+
+        # A failed write leaves the old file in place and no temp file behind
+        try:
+            atomic_write_json(path, {'bad': object()})
+        except TypeError:
+            pass
+        with open(path) as f:
+            assert json.load(f) == {'round': 2}
+        assert sorted(os.listdir(directory)) == ['state.json', 'state.json.backup'], os.listdir(directory)
+
+
+async def run_service_checks(directory):
+    path = os.path.join(directory, 'bets.json')
+    state = {'bets': 0}
+    writes = []
+
+    def writer(target_path, data):
+        writes.append(data)
+        atomic_write_json(target_path, data)
+
+    service = PersistenceService(flush_delay=0.2)
+    service.register('bets', path, lambda: dict(state), writer)
+    service.start()
+
+    # Fifty marks inside one window collapse into one write of the latest state
+    for i in range(50):
+        state['bets'] = i + 1
+        service.mark_dirty('bets')
+    await asyncio.sleep(0.4)
+    assert writes == [{'bets': 50}], writes
+
+    # stop() flushes at once instead of waiting out the window
+    service.flush_delay = 30.0
+    state['bets'] = 51
+    service.mark_dirty('bets')
+    started = time.perf_counter()
+    await service.stop()
+    assert time.perf_counter() - started < 1.0
+    with open(path) as f:
+        assert json.load(f) == {'bets': 51}
+
+    # ...even on a service that was never started, before its flush task has run
+    other = PersistenceService(flush_delay=5.0)
+    other.register('bets', path, lambda: {'bets': 52})
+    other.mark_dirty('bets')
+    started = time.perf_counter()
+    await other.stop()
+    assert time.perf_counter() - started < 1.0
+    with open(path) as f:
+        assert json.load(f) == {'bets': 52}
+    return service.get_metrics()
+
+
+def test_persistence_service():
+    with tempfile.TemporaryDirectory() as directory:
+        metrics = asyncio.run(run_service_checks(directory))
+    assert metrics['writes'] == 2 and metrics['coalesced_marks'] == 49, metrics
+
+
+if __name__ == "__main__":
+    test_atomic_write()
+    test_persistence_service()
+    print("PASS")
@@ -0,0 +1,71 @@
+import os
+import struct
+import tempfile
+
+from betting_records import Player
+from player_snapshot import HEADER, INT_COLUMNS, decode_snapshot, encode_snapshot, load_snapshot, save_snapshot
+
+
+def sample_players():
+    return {
+        '1001': Player('1001', 'hera_fan', points=12500, age='Imperial', biggest_win=4000, biggest_loss=-1500,
+                       biggest_bet=3000, total_bets=42, wins=25, losses=17, last_updated=1700000000.25),
+        '1002': Player('1002', 'Zuschauer_Überall', points=-250, age='Feudal', losses=3, last_updated=1700000100.5),
+        '1003': Player('1003', '観戦者', points=0, age='Castle', last_updated=1700000200.0),
+        # Shares a username with 1001, so the interned name table has fewer rows than players
+        '1004': Player('1004', 'hera_fan', points=500, last_updated=1700000300.0),
+    }
+
+
+def test_round_trip():
+    players = sample_players()
+    decoded = decode_snapshot(encode_snapshot(players))
+    assert list(decoded) == list(players)
+    assert decoded == players
+
+    # An empty table is valid too
+    assert decode_snapshot(encode_snapshot({})) == {}
+
+    # Old-format entries (bare point counts) come back as Players with defaults
+    decoded = decode_snapshot(encode_snapshot({'2001': 750, '2002': -5}))
+    assert decoded['2001'].username == 'Unknown' and decoded['2001'].points == 750
+    assert decoded['2002'].points == -5 and decoded['2002'].age == 'Dark'
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'user_points.bin')
+        save_snapshot(path, players)
+        assert load_snapshot(path) == players
+
+
+def expect_rejected(data, message):
+    try:
+        decode_snapshot(data)
+    except (ValueError, struct.error) as e:
+        assert message in str(e), e
+        return
+    raise AssertionError(f"accepted a snapshot that should fail with {message!r}")
+
+
+def test_rejects_bad_data():
+    players = sample_players()
+    data = encode_snapshot(players)
+    magic, version, count = HEADER.unpack_from(data, 0)
+
+    expect_rejected(b'JSON' + data[4:], "Not a player snapshot")
+    expect_rejected(HEADER.pack(magic, version + 1, count) + data[HEADER.size:], "Unsupported player snapshot version")
+
+    # Cut off the last section (length prefix + one float64 per player)
+    truncated = data[:len(data) - (4 + 8 * len(players))]
+    expect_rejected(truncated, f"sections, expected {5 + len(INT_COLUMNS) + 1}")
+
+    # Cut inside the last section: the column no longer matches the player count
+    expect_rejected(data[:-8], "column lengths do not match")
+
+    # A header claiming more players than the columns hold
+    expect_rejected(HEADER.pack(magic, version, count + 1) + data[HEADER.size:], "column lengths do not match")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_rejects_bad_data()
+    print("PASS")
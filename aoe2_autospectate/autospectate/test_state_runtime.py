@@ -0,0 +1,139 @@
+import time
+import asyncio
+import logging
+import threading
+
+from state_management import StateManager, GameState
+from state_runtime import StateRuntime
+
+
+def make_runtime(handlers, **kwargs):
+    manager = StateManager()
+    manager.state_timeouts[GameState.LOADING_GAME] = 0.3
+    manager.max_retries[GameState.LOADING_GAME] = 1
+    runtime = StateRuntime(manager, handlers, idle_interval=0.01, **kwargs)
+    return manager, runtime
+
+
+def run(runtime, limit=5):
+    start = time.perf_counter()
+    asyncio.run(asyncio.wait_for(runtime.run(GameState.FINDING_GAME), limit))
+    return time.perf_counter() - start
+
+
+def test_state_runtime():
+    """A state that overruns is cut off at its budget and the next handler runs once the thread is back"""
+    automation_threads = set()
+    events = []
+    hang_for = 0.6
+
+    def blocking_step(name, seconds):
+        automation_threads.add(threading.current_thread().name)
+        time.sleep(seconds)
+        events.append((name, time.perf_counter()))
+        return True
+
+    async def finding_game():
+        await runtime.run_blocking(blocking_step, 'find', 0.1)
+        return GameState.GAME_FOUND
+
+    async def game_found():
+        return GameState.LOADING_GAME
+
+    async def loading_game():
+        # Runs past the 0.3s budget, then comes back on its own
+        await runtime.run_blocking(blocking_step, 'load', hang_for)
+        return GameState.SETTING_UP_VIEW
+
+    async def error_state():
+        # The handler after a timeout still gets the automation thread
+        await runtime.run_blocking(blocking_step, 'recover', 0.05)
+        runtime.stop()
+
+    manager, runtime = make_runtime({
+        GameState.FINDING_GAME: finding_game,
+        GameState.GAME_FOUND: game_found,
+        GameState.LOADING_GAME: loading_game,
+        GameState.ERROR: error_state,
+    }, wedge_timeout=2.0)
+
+    ticks = []
+
+    async def heartbeat():
+        ticks.append(time.perf_counter())
+
+    runtime.add_monitor("heartbeat", 0.05, heartbeat)
+    elapsed = run(runtime)
+    runtime.shutdown()
+
+    stats = runtime.get_stats()
+    print(f"Finished in {elapsed:.2f}s, {len(ticks)} heartbeats: {stats}")
+    assert [name for name, _ in events] == ['find', 'load', 'recover']
+    assert stats['timeouts'] == 1 and stats['abandoned_jobs'] == 1 and stats['wedged'] == 0
+    assert manager.current_state == GameState.ERROR
+    loading = stats['budgets']['LOADING_GAME']
+    # The state is left at its budget, not when the blocking call returned
+    assert 0.3 <= loading['max'] < 0.6 and loading['budget'] == 0.3, loading
+    assert elapsed < 0.1 + hang_for + 0.5, elapsed
+    # Monitors kept ticking while the automation thread was blocked
+    assert len(ticks) >= 6, len(ticks)
+    assert len(automation_threads) == 1
+    assert [h['to'] for h in manager.history] == ['FINDING_GAME', 'GAME_FOUND', 'LOADING_GAME', 'ERROR']
+    assert manager.history[-1]['reason'] == 'timeout'
+
+
+def test_wedged_worker():
+    """A blocking call that never returns escalates instead of stalling every later state"""
+    release = threading.Event()
+    wedged = []
+
+    async def finding_game():
+        return GameState.GAME_FOUND
+
+    async def game_found():
+        return GameState.LOADING_GAME
+
+    async def loading_game():
+        await runtime.run_blocking(release.wait, 30)
+
+    async def error_state():
+        raise AssertionError("ran on a wedged automation thread")
+
+    async def on_wedged():
+        wedged.append(time.perf_counter())
+        runtime.stop()
+
+    manager, runtime = make_runtime({
+        GameState.FINDING_GAME: finding_game,
+        GameState.GAME_FOUND: game_found,
+        GameState.LOADING_GAME: loading_game,
+        GameState.ERROR: error_state,
+    }, wedge_timeout=0.3, on_wedged=on_wedged)
+    elapsed = run(runtime)
+    release.set()
+    runtime.shutdown()
+    assert len(wedged) == 1 and runtime.stats['wedged'] == 1
+    assert elapsed < 1.5, elapsed
+
+
+def test_refused_transition():
+    """A handler asking for a transition the table doesn't allow lands in ERROR"""
+    async def finding_game():
+        return GameState.SPECTATING
+
+    async def error_state():
+        runtime.stop()
+
+    manager, runtime = make_runtime({GameState.FINDING_GAME: finding_game, GameState.ERROR: error_state})
+    run(runtime)
+    runtime.shutdown()
+    assert manager.current_state == GameState.ERROR
+    assert manager.history[-1]['reason'] == 'refused SPECTATING'
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    test_state_runtime()
+    test_wedged_worker()
+    test_refused_transition()
+    print("PASS")
@@ -0,0 +1,31 @@
+import time
+
+from stats_overlay import StatsOverlayPublisher
+
+
+def test_stats_overlay():
+    sent = []
+    publisher = StatsOverlayPublisher(lambda text: sent.append(text) or True, interval=0.05)
+    publisher.start()
+
+    # Many frames with jitter below the display rounding should publish once
+    start = time.perf_counter()
+    for i in range(2000):
+        publisher.observe(territory={'Blue': 0.551 + i * 1e-6, 'Red': 0.449},
+                          military={'Blue': 120 + i % 3, 'Red': 80}, raids={'Blue': 1, 'Red': 0}, breaches=0)
+    observe_cost = (time.perf_counter() - start) / 2000
+    time.sleep(0.2)
+    assert len(sent) == 1, sent
+    assert sent[0].startswith("Blue: 55% map | army 120 | raids 1"), sent[0]
+
+    publisher.observe(territory={'Blue': 0.6, 'Red': 0.4}, military={}, raids={}, breaches=2)
+    time.sleep(0.2)
+    publisher.stop()
+    assert len(sent) == 3 and sent[-1] == "", sent
+    print(f"observe(): {observe_cost * 1e6:.1f}us per call, {publisher.stats}")
+    assert observe_cost < 0.001
+
+
+if __name__ == "__main__":
+    test_stats_overlay()
+    print("PASS")
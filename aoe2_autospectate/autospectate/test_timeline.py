@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+from state_management import StateManager, GameState
+from timeline import TimelineRecorder, load_cycles, summarize
+
+# (state to enter, seconds spent in the state before it)
+GAME = [(GameState.GAME_FOUND, 40), (GameState.LOADING_GAME, 25), (GameState.SETTING_UP_VIEW, 8),
+        (GameState.SPECTATING, 12), (GameState.GAME_ENDED, 1500), (GameState.FINDING_GAME, 14)]
+
+
+def test_timeline():
+    path = os.path.join(tempfile.mkdtemp(), 'timeline.jsonl')
+    failures = {'consecutive': 0, 'total': 0}
+    manager = StateManager()
+    recorder = TimelineRecorder(path, failure_counts=lambda: dict(failures))
+    manager.add_listener(recorder.on_transition)
+
+    def enter(state, spent, reason=None):
+        manager.last_state_change -= spent
+        assert manager.transition_to(state, reason=reason)
+
+    enter(GameState.FINDING_GAME, 0, 'start')
+    for state, spent in GAME:
+        enter(state, spent)
+    # Second game: one failed search before the game is found
+    enter(GameState.FINDING_GAME, 20, 'timeout')
+    failures['total'] += 1
+    for state, spent in GAME:
+        enter(state, spent)
+
+    cycles = load_cycles(path)
+    assert len(cycles) == 2
+    first, second = cycles
+    assert first['completed'] and first['failures'] == 0
+    assert abs(first['states']['SPECTATING'] - 1500) < 1
+    assert abs(first['dead_air'] - 99) < 1, first['dead_air']
+    assert abs(second['states']['FINDING_GAME'] - 60) < 1 and second['failures'] == 1
+    assert second['transitions'][0]['reason'] == 'timeout'
+
+    summary = summarize(cycles)
+    print(summary['dead_air'], summary['states']['FINDING_GAME'])
+    assert summary['cycles'] == 2 and summary['completed'] == 2
+    assert summary['states']['SPECTATING']['buckets'] == {'<=1800s': 2}
+    assert recorder.get_histograms()['FINDING_GAME']['count'] == 3
+
+
+if __name__ == "__main__":
+    test_timeline()
+    print("PASS")
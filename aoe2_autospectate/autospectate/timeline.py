@@ -0,0 +1,151 @@
+# autospectate/timeline.py
+#
+# Game-cycle timeline. Every StateManager transition is recorded with its
+# timestamp, duration, reason and the RestartManager failure counts. A cycle
+# runs from entering FINDING_GAME to the next time we enter it
+# (find -> load -> setup -> spectate -> end) and is appended to a JSONL file
+# when it closes. Per-state durations also go into fixed-bucket histograms,
+# so the dead air between games can be tracked across runs:
+#
+#   python timeline.py game_timeline.jsonl
+
+import json
+import logging
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional
+
+# Histogram bucket upper bounds in seconds; the last bucket is open-ended
+BUCKETS = [1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1800, 3600]
+
+CYCLE_START = 'FINDING_GAME'
+
+
+def bucket_label(index: int) -> str:
+    if index < len(BUCKETS):
+        return f"<={BUCKETS[index]}s"
+    return f">{BUCKETS[-1]}s"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th duration (None if in the open bucket)"""
+        if not self.count:
+            return None
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= q * self.count:
+                return BUCKETS[index] if index < len(BUCKETS) else None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else 0.0,
+            'max': round(self.max, 2),
+            'p50_le': self.quantile(0.5),
+            'p90_le': self.quantile(0.9),
+            'buckets': {bucket_label(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+
+class TimelineRecorder:
+    """Listener for StateManager transitions; see the module comment"""
+
+    def __init__(self, path: Optional[str] = 'game_timeline.jsonl',
+                 failure_counts: Optional[Callable[[], Dict[str, int]]] = None):
+        self.path = path
+        self.failure_counts = failure_counts or (lambda: {})
+        self.histograms: Dict[str, Histogram] = {}
+        self.cycle: Optional[Dict[str, Any]] = None
+        self.cycles_written = 0
+
+    def on_transition(self, old_state: str, new_state: str, duration: float, reason: Optional[str], at: float):
+        failures = self.failure_counts()
+        self.histograms.setdefault(old_state, Histogram()).add(duration)
+
+        if self.cycle is not None:
+            self.cycle['transitions'].append({'from': old_state, 'to': new_state, 'at': round(at, 3),
+                                              'duration': round(duration, 3), 'reason': reason,
+                                              'failures': failures})
+            states = self.cycle['states']
+            states[old_state] = round(states.get(old_state, 0.0) + duration, 3)
+
+        # Entering FINDING_GAME from anywhere else closes the cycle and opens the next
+        if new_state == CYCLE_START and old_state != CYCLE_START:
+            if self.cycle is not None:
+                self._close_cycle(at, failures)
+            self.cycle = {'started_at': round(at, 3), 'states': {}, 'transitions': [],
+                          'failures_at_start': failures}
+
+    def _close_cycle(self, at: float, failures: Dict[str, int]):
+        cycle = self.cycle
+        states = cycle['states']
+        cycle['ended_at'] = round(at, 3)
+        cycle['total'] = round(sum(states.values()), 3)
+        # Time the stream wasn't showing a game
+        cycle['dead_air'] = round(cycle['total'] - states.get('SPECTATING', 0.0), 3)
+        cycle['completed'] = any(t['from'] == 'SPECTATING' and t['to'] == 'GAME_ENDED' for t in cycle['transitions'])
+        cycle['failures'] = failures.get('total', 0) - cycle['failures_at_start'].get('total', 0)
+        self.cycle = None
+
+        logging.info(f"Game cycle: {cycle['total']:.0f}s total, {cycle['dead_air']:.0f}s dead air, "
+                     f"states {states}")
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(cycle) + "\n")
+            self.cycles_written += 1
+        except OSError as e:
+            logging.error(f"Couldn't write game cycle to {self.path}: {e}")
+
+    def get_histograms(self) -> Dict[str, Dict[str, Any]]:
+        return {state: histogram.to_dict() for state, histogram in self.histograms.items()}
+
+
+def load_cycles(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Histograms of per-state time and dead air across exported cycles"""
+    per_state: Dict[str, Histogram] = {}
+    dead_air = Histogram()
+    for cycle in cycles:
+        for state, seconds in cycle['states'].items():
+            per_state.setdefault(state, Histogram()).add(seconds)
+        dead_air.add(cycle['dead_air'])
+    return {
+        'cycles': len(cycles),
+        'completed': sum(1 for cycle in cycles if cycle.get('completed')),
+        'dead_air': dead_air.to_dict(),
+        'states': {state: histogram.to_dict() for state, histogram in per_state.items()},
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize an exported game-cycle timeline")
+    parser.add_argument('log', help="JSONL written by TimelineRecorder")
+    parser.add_argument('--last', type=int, default=0, help="Only the most recent N cycles")
+    args = parser.parse_args()
+
+    cycles = load_cycles(args.log)
+    if args.last:
+        cycles = cycles[-args.last:]
+    print(json.dumps(summarize(cycles), indent=2))
@@ -4,13 +4,25 @@ import time
 import re
 import logging
 import argparse
-import subprocess
-import sys
 from typing import Dict, List, Optional, Tuple, Any
 from playwright.sync_api import Page, ElementHandle, sync_playwright
 
+from match_scoring import MatchScorer
+from spectate_resolver import SpectateResolver, launch_spectate_url
+
 logging.basicConfig(level=logging.INFO)
 
+# List of all AoE2 civilizations to filter out when parsing player names
+CIVILIZATIONS = {
+    'armenians', 'aztecs', 'berbers', 'bohemians', 'britons', 'bulgarians', 'burgundians',
+    'burmese', 'byzantines', 'celts', 'chinese', 'cumans', 'dravidians',
+    'ethiopians', 'franks', 'goths', 'gurjaras', 'hindustanis', 'huns',
+    'incas', 'italians', 'japanese', 'jurchens', 'khmer', 'koreans',
+    'lithuanians', 'magyars', 'malay', 'malians', 'mayans', 'mongols',
+    'persians', 'poles', 'portuguese', 'romans', 'saracens', 'sicilians',
+    'slavs', 'spanish', 'tatars', 'teutons', 'turks', 'vietnamese',
+    'vikings', 'bengalis', 'georgians', 'khitans'
+}
 
 
 def get_rating_tier(rating):
@@ -84,13 +96,17 @@ def extract_player_info(player_element, row) -> Tuple[str, str, str]:
         return None, None, None
 
 
-def handle_spectate_with_modal(page, spectate_button, match_info):
+def handle_spectate_with_modal(page, spectate_button, match_info, on_path=None):
     """
     Handle spectating with proper modal detection and interaction.
-    Returns (success, spectate_url)
+    Returns (success, spectate_url). `on_path(name)` is called with the method that worked.
     """
     spectate_url = None
     
+    def won(path):
+        if on_path:
+            on_path(path)
+    
     # Method 1: Try to intercept the URL
     def handle_navigation(route):
         nonlocal spectate_url
@@ -123,22 +139,23 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
     
     page.on("console", handle_console)
     
-    # Click the spectate button
-    logging.info("Clicking spectate button...")
-    spectate_button.click()
-    
-    # Wait a bit for any URL interception
-    time.sleep(1)
-    
-    # Remove route handler
-    page.unroute("**/*")
+    try:
+        # Click the spectate button
+        logging.info("Clicking spectate button...")
+        spectate_button.click()
+        
+        # Wait a bit for any URL interception
+        time.sleep(1)
+    finally:
+        # Always remove the handlers, a warm page is reused for the next game
+        page.unroute("**/*", handle_navigation)
+        page.remove_listener("console", handle_console)
     
     # If we got the URL, open it directly
     if spectate_url:
         logging.info(f"Opening URL directly: {spectate_url}")
-        if sys.platform == "win32":
-            # Use Windows start command
-            subprocess.run(["cmd", "/c", "start", "", spectate_url], shell=False)
+        launch_spectate_url(spectate_url)
+        won('intercept')
         return True, spectate_url
     
     # Method 2: Modal should be open now, try multiple approaches
@@ -160,6 +177,7 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
                     logging.info("Found modal in iframe!")
                     # Try to click in the iframe
                     frame.get_by_text("Open Age of Empires URL Helper").click()
+                    won('iframe')
                     return True, None
     except Exception as e:
         methods_tried.append(f"iframe search: {e}")
@@ -180,7 +198,9 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
                     let node;
                     const found = [];
                     while (node = walker.nextNode()) {
-                        if (node.textContent && node.textContent.includes('Open Age of Empires URL Helper')) {
+                        // Only clickable elements; every ancestor of the button contains the text too
+                        const clickable = node.tagName === 'BUTTON' || node.tagName === 'A' || node.getAttribute('role') === 'button';
+                        if (clickable && node.textContent && node.textContent.includes('Open Age of Empires URL Helper')) {
                             found.push({
                                 tag: node.tagName,
                                 class: node.className,
@@ -211,6 +231,7 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
         
         logging.info(f"JavaScript search result: {result}")
         if result.get('clicked'):
+            won('js_search')
             return True, None
             
     except Exception as e:
@@ -227,6 +248,7 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
         if open_button:
             logging.info("Found button with wait_for_selector")
             open_button.click()
+            won('wait_for_selector')
             return True, None
     except Exception as e:
         methods_tried.append(f"wait_for_selector: {e}")
@@ -276,6 +298,7 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
             aoe_windows = gw.getWindowsWithTitle("Age of Empires II")
             if aoe_windows:
                 logging.info("Game window detected!")
+                won('pyautogui')
                 return True, None
         except:
             pass
@@ -287,6 +310,10 @@ def handle_spectate_with_modal(page, spectate_button, match_info):
     return False, None
 
 
+# Used when callers don't pass their own resolver
+SPECTATE_RESOLVER = SpectateResolver(modal_fallback=handle_spectate_with_modal)
+
+
 def test_match(page, rows, row_index):
     """
     Test a single match to see if it's a valid 1v1.
@@ -426,18 +453,6 @@ def extract_expanded_data(page, row_index):
         'player_count': 0
     }
     
-    # List of all AoE2 civilizations to filter out when parsing player names
-    CIVILIZATIONS = {
-        'armenians', 'aztecs', 'berbers', 'bohemians', 'britons', 'bulgarians', 'burgundians',
-        'burmese', 'byzantines', 'celts', 'chinese', 'cumans', 'dravidians',
-        'ethiopians', 'franks', 'goths', 'gurjaras', 'hindustanis', 'huns',
-        'incas', 'italians', 'japanese', 'jurchens', 'khmer', 'koreans',
-        'lithuanians', 'magyars', 'malay', 'malians', 'mayans', 'mongols',
-        'persians', 'poles', 'portuguese', 'romans', 'saracens', 'sicilians',
-        'slavs', 'spanish', 'tatars', 'teutons', 'turks', 'vietnamese',
-        'vikings', 'bengalis', 'georgians', 'khitans'
-    }
-    
     try:
         # Look for player elements in the expanded content
         # Target specific player containers to avoid confusion with civs
@@ -537,13 +552,203 @@ def check_if_1v1_expanded(expanded_data):
         return False
 
 
-def find_and_spectate_game(playwright, config, test_mode=False):
+# Serializes the whole ongoing table in one round-trip. Match rows are tagged
+# with data-autospectate-row so the spectate button can be found again later,
+# AUTOMATCH rows are expanded together, and each row's players are read from
+# the row plus any detail rows rendered after it.
+EXTRACT_MATCHES_JS = """
+async ({expand, waitMs}) => {
+    const text = el => el ? (el.innerText || '').trim() : '';
+    document.querySelectorAll('[data-autospectate-row]').forEach(el => el.removeAttribute('data-autospectate-row'));
+    const rows = Array.from(document.querySelectorAll('tbody tr'))
+        .filter(row => row.querySelectorAll(':scope > td').length >= 4);
+    rows.forEach((row, i) => row.setAttribute('data-autospectate-row', String(i)));
+
+    const isAutomatch = row => text(row.querySelector('td:nth-child(2)')).includes('AUTOMATCH');
+    const toExpand = expand ? rows.filter(isAutomatch) : [];
+    for (const row of toExpand) {
+        const cell = row.querySelector('td:first-child');
+        if (cell) cell.click();
+    }
+    if (toExpand.length) {
+        await new Promise(resolve => setTimeout(resolve, waitMs));
+    }
+
+    const matches = rows.map((row, i) => {
+        const mapCell = row.querySelector('td:nth-child(2)');
+        const mapText = text(mapCell);
+        const minutes = /(\\d+)\\s*min/.exec(mapText);
+        const rating = /~?(\\d+)/.exec(text(row.querySelector('td:nth-child(4)')));
+
+        const scope = [row];
+        for (let sib = row.nextElementSibling; sib && !sib.hasAttribute('data-autospectate-row'); sib = sib.nextElementSibling) {
+            scope.push(sib);
+        }
+
+        // Match id from a match link, a spectate link or a data attribute, whichever the row has
+        let matchId = null;
+        for (const el of scope) {
+            const tagged = el.matches('[data-match-id]') ? el : el.querySelector('[data-match-id]');
+            if (tagged) { matchId = tagged.getAttribute('data-match-id'); break; }
+            const link = Array.from(el.querySelectorAll('a[href]'))
+                .map(a => /(?:\/match\/|aoe2de:\/\/\d+\/)(\d+)/.exec(a.getAttribute('href')))
+                .find(m => m);
+            if (link) { matchId = link[1]; break; }
+        }
+
+        const players = [];
+        for (const el of scope) {
+            for (const container of el.querySelectorAll('div.flex.items-center.space-x-2')) {
+                const link = container.querySelector('a');
+                if (!link) continue;
+                const name = text(link);
+                const elo = /\\((\\d+)\\)/.exec(text(container.querySelector('span.text-xs.text-gray-500')));
+                const civLink = container.querySelector('a.flex.flex-row.space-x-1.items-center');
+                const civImg = container.querySelector('img[src*="/civilizations/"]');
+                players.push({
+                    name: name,
+                    elo: elo ? elo[1] : '',
+                    civ: civLink ? text(civLink).replace(name, '').trim() : '',
+                    civ_src: civImg ? civImg.getAttribute('src') : ''
+                });
+            }
+        }
+
+        return {
+            row_index: i,
+            match_id: matchId,
+            map: text(mapCell && mapCell.querySelector('.font-bold')),
+            mode: mapText.includes('AUTOMATCH') ? 'AUTOMATCH' : 'Other',
+            minutes: minutes ? parseInt(minutes[1]) : null,
+            rating: rating ? parseInt(rating[1]) : null,
+            has_spectate: !!row.querySelector('td:nth-child(6) button'),
+            expanded: toExpand.includes(row),
+            players: players
+        };
+    });
+
+    // Collapse again so the table looks the way we found it
+    for (const row of toExpand) {
+        const cell = row.querySelector('td:first-child');
+        if (cell) cell.click();
+    }
+    return matches;
+}
+"""
+
+
+def extract_matches_table(page, expand=True, expand_wait_ms=1500) -> List[Dict[str, Any]]:
+    """
+    Extract every row of the ongoing table with a single page.evaluate call.
+    Returns match dicts in the same shape test_match produces.
+    """
+    started = time.perf_counter()
+    raw_rows = page.evaluate(EXTRACT_MATCHES_JS, {'expand': expand, 'waitMs': expand_wait_ms})
+    matches = [parse_table_row(raw) for raw in raw_rows]
+    logging.info(f"Extracted {len(matches)} matches in one call ({time.perf_counter() - started:.2f}s)")
+    return matches
+
+
+def parse_table_row(raw) -> Dict[str, Any]:
+    """Turn one serialized row into a match dict, filtering civ names out of the player list"""
+    match = {
+        'row_index': raw['row_index'],
+        'map': raw.get('map') or 'Unknown',
+        'mode': raw.get('mode', 'Other'),
+        'has_spectate': raw.get('has_spectate', False),
+        'players': [],
+        'elos': [],
+        'civilizations': [],
+    }
+    if raw.get('match_id'):
+        match['match_id'] = int(raw['match_id']) if str(raw['match_id']).isdigit() else raw['match_id']
+    if raw.get('minutes') is not None:
+        match['minutes'] = raw['minutes']
+    if raw.get('rating') is not None:
+        match['rating'] = raw['rating']
+
+    for player in raw.get('players', []):
+        name = player.get('name', '')
+        if not name or len(name) > 30 or name.lower() in CIVILIZATIONS or name in match['players']:
+            continue
+        match['players'].append(name)
+        match['elos'].append(player.get('elo') or '?')
+
+        civ = player.get('civ', '')
+        if not civ and player.get('civ_src'):
+            civ_match = re.search(r'/civilizations/([^/]+)\.', player['civ_src'])
+            if civ_match:
+                civ = civ_match.group(1).replace('_', ' ').title()
+        if civ:
+            match['civilizations'].append(civ)
+
+    match['player_count'] = len(match['players'])
+    match['is_1v1'] = match['player_count'] == 2
+    return match
+
+
+def rank_candidates(matches, min_rating, scorer=None) -> List[Dict[str, Any]]:
+    """
+    Filter to spectatable AUTOMATCH 1v1s at or above min_rating and rank them
+    best first with the shared MatchScorer.
+    """
+    scorer = scorer or MatchScorer(min_rating=min_rating)
+    return scorer.rank(matches)
+
+
+def get_spectate_button(page, row_index):
+    """Find the spectate button for a row tagged by extract_matches_table"""
+    button = page.query_selector(f'tr[data-autospectate-row="{row_index}"] td:nth-child(6) button')
+    if button:
+        return button
+    # Tags are lost if the table re-rendered; fall back to position
+    rows = page.query_selector_all('tbody tr')
+    if row_index < len(rows):
+        return rows[row_index].query_selector('td:nth-child(6) button')
+    return None
+
+
+def find_and_spectate_game(playwright, config, test_mode=False, session=None, source=None, prefetched=None,
+                           scorer=None, resolver=None):
     """
     Main function to find and spectate a 1v1 game.
+    Prefetched candidates (from MatchPrefetcher) are tried first without polling.
+    With a MatchSource, candidates are picked from its JSON first and the page
+    is only used to click spectate; if the source fails the page is scraped.
+    Candidates with a match ID are spectated by launching their aoe2de:// URL
+    directly, without touching the browser.
+    With a BrowserSession the warm page is reused and left open afterwards;
+    otherwise a browser is launched from `playwright` and closed on return.
     """
-    MIN_RATING = config.get('MIN_RATING', 1100)  # Configurable minimum rating
-    MATCHES_BEFORE_REFRESH = 10
-    
+    resolver = resolver or SPECTATE_RESOLVER
+    candidates = prefetched or None
+    if candidates:
+        logging.info(f"Using {len(candidates)} prefetched candidates")
+    elif source is not None:
+        try:
+            candidates = rank_candidates(source.fetch_matches(), config.get('MIN_RATING', 1100), scorer)
+            logging.info(f"{len(candidates)} candidates from {source.name}")
+        except Exception as e:
+            logging.warning(f"Match source {source.name} failed, falling back to page scrape: {e}")
+        if candidates == []:
+            # Source is healthy and has nothing worth spectating; skip the browser entirely
+            return False, {"reason": "No suitable 1v1 matches found"}
+
+    for candidate in candidates or []:
+        if resolver.can_resolve(candidate):
+            result = spectate_candidate(None, candidate, resolver)
+            if result:
+                return result
+
+    if session is not None:
+        try:
+            page = session.acquire_page()
+            return scan_and_spectate(page, config, candidates, scorer, resolver)
+        except Exception as e:
+            logging.error(f"Error: {e}")
+            session.recycle("error")
+            return False, {"reason": str(e)}
+
     browser = None
     try:
         # Launch browser with specific args to handle protocol handlers
@@ -582,75 +787,10 @@ def find_and_spectate_game(playwright, config, test_mode=False):
         # Wait for matches to load
         page.wait_for_selector('tbody tr', timeout=10000)
         
-        # Find all match rows
-        rows = page.query_selector_all('tbody tr')
-        logging.info(f"Found {len(rows)} matches")
-        
-        matches_checked = 0
-        
-        # Check each match
-        for i in range(len(rows)):
-            matches_checked += 1
-            
-            # Refresh page if we've checked too many
-            if matches_checked >= MATCHES_BEFORE_REFRESH:
-                logging.info("Refreshing page to get new matches...")
-                page.reload()
-                page.wait_for_selector('tbody tr', timeout=10000)
-                rows = page.query_selector_all('tbody tr')
-                matches_checked = 0
-                i = 0  # Reset to start
-                continue
-            
-            try:
-                match = test_match(page, rows, i)
-                
-                # Skip if error or DOM refresh needed
-                if match.get('error'):
-                    if match['error'] == 'DOM refresh needed':
-                        # Page was refreshed, restart from beginning
-                        rows = page.query_selector_all('tbody tr')
-                        i = 0
-                        matches_checked = 0
-                    continue
-                
-                # Skip non-automatch
-                if match.get('mode') != 'AUTOMATCH':
-                    continue
-                
-                # Skip if below minimum rating
-                if match.get('rating', 0) < MIN_RATING:
-                    logging.info(f"Skipping low-rated match: {match.get('rating')}")
-                    continue
-                
-                # If it's a valid 1v1, spectate it immediately
-                if match.get('is_1v1'):
-                    logging.info(f"Found valid 1v1: {match.get('map')} - Rating: {match.get('rating')}")
-                    
-                    # Re-query and find the spectate button
-                    rows = page.query_selector_all('tbody tr')
-                    if match['row_index'] < len(rows):
-                        spectate_button = rows[match['row_index']].query_selector('td:nth-child(6) button')
-                        if spectate_button:
-                            logging.info(f"Spectating match: {match.get('map')} - Rating: {match.get('rating')}")
-                            
-                            # Use the modal handler
-                            success, url = handle_spectate_with_modal(page, spectate_button, match)
-                            if success:
-                                time.sleep(3)  # Wait for game to launch
-                                context.close()
-                                browser.close()
-                                return True, format_match_for_obs(match)
-                            else:
-                                logging.error("Failed to handle spectate modal")
-                
-            except Exception as e:
-                logging.error(f"Error checking match {i}: {e}")
-                continue
-        
+        result = scan_and_spectate(page, config, candidates, scorer, resolver)
         context.close()
         browser.close()
-        return False, {"reason": "No suitable 1v1 matches found"}
+        return result
         
     except Exception as e:
         logging.error(f"Error: {e}")
@@ -658,6 +798,144 @@ def find_and_spectate_game(playwright, config, test_mode=False):
             browser.close()
         return False, {"reason": str(e)}
 
+
+def scan_and_spectate(page, config, candidates=None, scorer=None, resolver=None):
+    """
+    Extract the whole ongoing table in one call, rank every candidate and spectate the best one.
+    Candidates already picked by a MatchSource are tried first by locating their row on the page.
+    Falls back to walking rows one by one if the bulk extraction fails.
+    """
+    MIN_RATING = config.get('MIN_RATING', 1100)  # Configurable minimum rating
+
+    try:
+        matches = extract_matches_table(page)
+    except Exception as e:
+        logging.error(f"Bulk table extraction failed, checking rows one by one: {e}")
+        return scan_matches_one_by_one(page, config)
+
+    if candidates:
+        rows_by_players = {frozenset(p.lower() for p in m['players']): m for m in matches if m['players']}
+        for candidate in candidates:
+            row = rows_by_players.get(frozenset(p.lower() for p in candidate['players']))
+            if row is None:
+                logging.info(f"Match {candidate.get('match_id')} ({' vs '.join(candidate['players'])}) not on page yet")
+                continue
+            # Keep the source's data for OBS, but spectate through the page row
+            result = spectate_candidate(page, {**candidate, 'row_index': row['row_index']}, resolver)
+            if result:
+                return result
+        logging.info("No source candidate could be spectated from the page, ranking page rows instead")
+
+    if not matches:
+        return False, {"reason": "No matches on page"}
+
+    candidates = rank_candidates(matches, MIN_RATING, scorer)
+    logging.info(f"{len(candidates)} of {len(matches)} matches are spectatable 1v1s rated {MIN_RATING}+")
+
+    for match in candidates:
+        result = spectate_candidate(page, match, resolver)
+        if result:
+            return result
+
+    return False, {"reason": "No suitable 1v1 matches found"}
+
+
+def spectate_candidate(page, match, resolver=None):
+    """
+    Spectate a ranked match: directly from its match ID when known, otherwise through
+    the page's spectate button and modal. Returns (True, obs_info) on success, None otherwise.
+    """
+    resolver = resolver or SPECTATE_RESOLVER
+    spectate_button = None
+    if page is not None and 'row_index' in match:
+        spectate_button = get_spectate_button(page, match['row_index'])
+    if spectate_button is None and not resolver.can_resolve(match):
+        logging.warning(f"Spectate button missing for row {match.get('row_index')}")
+        return None
+
+    logging.info(f"Spectating match: {match.get('map')} - Rating: {match.get('rating')} - "
+                 f"{' vs '.join(match['players'])}")
+    success, url = resolver.spectate(match, page=page, button=spectate_button)
+    if success:
+        time.sleep(3)  # Wait for game to launch
+        return True, format_match_for_obs(match)
+    logging.error("Failed to spectate match")
+    return None
+
+
+def scan_matches_one_by_one(page, config):
+    """
+    Walk the match rows on an already loaded ongoing page and spectate the first valid 1v1.
+    """
+    MIN_RATING = config.get('MIN_RATING', 1100)  # Configurable minimum rating
+    MATCHES_BEFORE_REFRESH = 10
+
+    # Find all match rows
+    rows = page.query_selector_all('tbody tr')
+    logging.info(f"Found {len(rows)} matches")
+    
+    matches_checked = 0
+    
+    # Check each match
+    for i in range(len(rows)):
+        matches_checked += 1
+        
+        # Refresh page if we've checked too many
+        if matches_checked >= MATCHES_BEFORE_REFRESH:
+            logging.info("Refreshing page to get new matches...")
+            page.reload()
+            page.wait_for_selector('tbody tr', timeout=10000)
+            rows = page.query_selector_all('tbody tr')
+            matches_checked = 0
+            i = 0  # Reset to start
+            continue
+        
+        try:
+            match = test_match(page, rows, i)
+            
+            # Skip if error or DOM refresh needed
+            if match.get('error'):
+                if match['error'] == 'DOM refresh needed':
+                    # Page was refreshed, restart from beginning
+                    rows = page.query_selector_all('tbody tr')
+                    i = 0
+                    matches_checked = 0
+                continue
+            
+            # Skip non-automatch
+            if match.get('mode') != 'AUTOMATCH':
+                continue
+            
+            # Skip if below minimum rating
+            if match.get('rating', 0) < MIN_RATING:
+                logging.info(f"Skipping low-rated match: {match.get('rating')}")
+                continue
+            
+            # If it's a valid 1v1, spectate it immediately
+            if match.get('is_1v1'):
+                logging.info(f"Found valid 1v1: {match.get('map')} - Rating: {match.get('rating')}")
+                
+                # Re-query and find the spectate button
+                rows = page.query_selector_all('tbody tr')
+                if match['row_index'] < len(rows):
+                    spectate_button = rows[match['row_index']].query_selector('td:nth-child(6) button')
+                    if spectate_button:
+                        logging.info(f"Spectating match: {match.get('map')} - Rating: {match.get('rating')}")
+                        
+                        # Use the modal handler
+                        success, url = SPECTATE_RESOLVER.spectate(match, page=page, button=spectate_button)
+                        if success:
+                            time.sleep(3)  # Wait for game to launch
+                            return True, format_match_for_obs(match)
+                        else:
+                            logging.error("Failed to handle spectate modal")
+            
+        except Exception as e:
+            logging.error(f"Error checking match {i}: {e}")
+            continue
+    
+    return False, {"reason": "No suitable 1v1 matches found"}
+
 def format_match_for_obs(match):
     """
     Format match data for OBS display.
@@ -689,7 +967,8 @@ def format_match_for_obs(match):
         'rating': rating,
         'tier': tier,
         'tier_description': tier_desc,
-        'likely_1v1': True
+        'likely_1v1': True,
+        'match_id': match.get('match_id')
     }
 
 
@@ -704,13 +983,12 @@ def test_automation(config):
         page.goto(url, wait_until='networkidle')
         time.sleep(2)
         
-        rows = page.query_selector_all('tbody tr')
-        logging.info(f"Found {len(rows)} matches")
+        matches = extract_matches_table(page)
+        for match in matches:
+            print(f"\nMatch {match['row_index']}: {match}")
         
-        # Test first few matches
-        for i in range(min(5, len(rows))):
-            match = test_match(page, rows, i)
-            print(f"\nMatch {i}: {match}")
+        candidates = rank_candidates(matches, config.get('MIN_RATING', 1100))
+        print(f"\n{len(candidates)} candidates: {[(m['map'], m.get('rating')) for m in candidates]}")
         
         browser.close()
 
@@ -719,6 +997,8 @@ def test_automation(config):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--test', action='store_true', help='Run in test mode')
+    parser.add_argument('--bench', type=int, metavar='N', help='Time one cold start and N warm refreshes')
+    parser.add_argument('--url', help='Ongoing page to use instead of aoe2companion (e.g. a fixture_server.py URL)')
     args = parser.parse_args()
     
     logging.basicConfig(
@@ -727,12 +1007,21 @@ if __name__ == "__main__":
     )
     
     config = {
-        'AOE2_COMPANION_URL': 'https://www.aoe2companion.com/ongoing',
+        'AOE2_COMPANION_URL': args.url or 'https://www.aoe2companion.com/ongoing',
         'MIN_RATING': 1200  # Minimum rating to consider
     }
     
     if args.test:
         test_automation(config)
+    elif args.bench:
+        from browser_session import BrowserSession
+        session = BrowserSession(config['AOE2_COMPANION_URL'])
+        try:
+            for _ in range(args.bench + 1):
+                session.acquire_page()
+            print(f"Metrics: {session.get_metrics()}")
+        finally:
+            session.close()
     else:
         with sync_playwright() as p:
             success, result = find_and_spectate_game(p, config)
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Bump when the cached layout changes so old cache files are rebuilt
+CACHE_VERSION = 1
+
+# Fuzzy lookups compare against this many trigram candidates and need this similarity
+SHORTLIST_SIZE = 10
+FUZZY_THRESHOLD = 0.7
+
+
+# Function to normalize civ names: lowercase, no accents, punctuation or "the"
+def normalize(name):
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    name = re.sub(r'[^a-z0-9 ]+', ' ', name.lower())
+    name = re.sub(r'^the ', '', ' '.join(name.split()))
+    return name
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def aliases_for(key, info):
+    """Every spelling that should find this civ without fuzzy matching"""
+    base = normalize(key)
+    names = {base, base.replace(' ', '')}
+    # Accept the plural and singular form whichever way the data is keyed
+    names.add(base[:-1] if base.endswith('s') else base + 's')
+    for alias in info.get('aliases', []):
+        names.add(normalize(alias))
+    return names
+
+
+def render_civ(key, info):
+    bonuses = "\n".join(info['bonuses'])
+    unique_units = ", ".join(info['unique_units'])
+    hidden_stats = "\n".join(info['hidden_stats'])
+    return f"**{key.title()} Civilization**\n\n**Bonuses:**\n{bonuses}\n\n**Unique Units:**\n{unique_units}\n\n**Hidden Stats:**\n{hidden_stats}"
+
+
+def render_matchup(key1, info1, key2, info2):
+    response = f"**Matchup: {key1.title()} vs {key2.title()}**\n\n"
+    response += f"**{key1.title()} Bonuses:**\n" + "\n".join(info1['bonuses']) + "\n\n"
+    response += f"**{key2.title()} Bonuses:**\n" + "\n".join(info2['bonuses']) + "\n\n"
+    response += "Strategic Insights:\n"
+    return response
+
+
+# Civilization lookups with typo tolerance and prerendered Discord responses
+class CivKnowledge:
+    def __init__(self, data):
+        self.aliases = {}
+        self.trigram_index = defaultdict(set)
+        self.civ_responses = {}
+        self.matchup_responses = {}
+
+        for key, info in data.items():
+            for alias in aliases_for(key, info):
+                self.aliases.setdefault(alias, key)
+            self.civ_responses[key] = render_civ(key, info)
+
+        for alias in self.aliases:
+            for gram in trigrams(alias):
+                self.trigram_index[gram].add(alias)
+        self.trigram_index = dict(self.trigram_index)
+
+        for key1, info1 in data.items():
+            for key2, info2 in data.items():
+                self.matchup_responses[(key1, key2)] = render_matchup(key1, info1, key2, info2)
+
+    def resolve(self, name):
+        """Return the data key for a civ name, tolerating typos, or None"""
+        normalized = normalize(name)
+        if normalized in self.aliases:
+            return self.aliases[normalized]
+
+        # Trigrams shortlist the candidates, edit similarity picks among them
+        # (swapped letters like "khemr" share few trigrams but are close edits)
+        shared = defaultdict(int)
+        for gram in trigrams(normalized):
+            for alias in self.trigram_index.get(gram, ()):
+                shared[alias] += 1
+        shortlist = sorted(shared, key=shared.get, reverse=True)[:SHORTLIST_SIZE]
+        best, best_score = None, 0.0
+        for alias in shortlist:
+            score = SequenceMatcher(None, normalized, alias).ratio()
+            if score > best_score:
+                best, best_score = alias, score
+        if best_score < FUZZY_THRESHOLD:
+            return None
+        return self.aliases[best]
+
+    def civ_response(self, name):
+        key = self.resolve(name)
+        return self.civ_responses.get(key) if key else None
+
+    def matchup_response(self, name1, name2):
+        key1, key2 = self.resolve(name1), self.resolve(name2)
+        if key1 is None or key2 is None:
+            return None
+        return self.matchup_responses[(key1, key2)]
+
+
+# Function to load the knowledge base, reusing the cache file while the JSON is unchanged
+def load_knowledge(data_path='aoe2_data.json', cache_path=None):
+    cache_path = cache_path or os.path.splitext(data_path)[0] + '.cache'
+    with open(data_path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    try:
+        with open(cache_path, 'rb') as f:
+            version, cached_digest, knowledge = pickle.load(f)
+        if version == CACHE_VERSION and cached_digest == digest:
+            return knowledge
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Rebuilding civ knowledge cache {cache_path}: {e}")
+
+    knowledge = CivKnowledge(json.loads(raw))
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, digest, knowledge), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        logging.warning(f"Could not write civ knowledge cache {cache_path}: {e}")
+    return knowledge
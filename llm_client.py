@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+from profile_cache import TTLCache
+
+
+# Async wrapper around the blocking openai.Completion.create
+class LLMClient:
+    def __init__(self, engine="text-davinci-003", max_concurrency=4, cache_ttl=7 * 24 * 3600,
+                 max_entries=512, disk_path=None, api_base=None, create=None):
+        self.engine = engine
+        # Sent with each request rather than set on the openai module (e.g. a local stub server when testing)
+        self.api_base = api_base
+        self.create = create or openai.Completion.create
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='openai')
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Cached prompts are kept on disk; uncached ones still share an in-flight request
+        self.cache = TTLCache(cache_ttl, max_entries, disk_path)
+        self.in_flight = {}  # key -> future of an uncached request
+        self.uncached_stats = {"requests": 0, "coalesced": 0}
+
+    def _key(self, prompt, max_tokens):
+        return hashlib.sha256(f"{self.engine}\n{max_tokens}\n{prompt}".encode('utf-8')).hexdigest()
+
+    async def _complete(self, prompt, max_tokens):
+        params = {"engine": self.engine, "prompt": prompt, "max_tokens": max_tokens}
+        if self.api_base:
+            params["api_base"] = self.api_base
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.pool, lambda: self.create(**params))
+        return response.choices[0].text.strip()
+
+    async def complete(self, prompt, max_tokens=150, cache=True):
+        """Return the completion text; identical concurrent prompts make one request"""
+        key = self._key(prompt, max_tokens)
+        if cache:
+            return await self.cache.get(key, lambda: self._complete(prompt, max_tokens))
+
+        future = self.in_flight.get(key)
+        if future is None:
+            self.uncached_stats["requests"] += 1
+            future = asyncio.ensure_future(self._complete(prompt, max_tokens))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.uncached_stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    def get_stats(self):
+        return {"cached": dict(self.cache.stats, size=len(self.cache.entries)),
+                "uncached": dict(self.uncached_stats, in_flight=len(self.in_flight))}
+
+    def close(self):
+        self.cache.save()
+        self.pool.shutdown(wait=False)
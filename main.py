@@ -1,49 +1,56 @@
 import discord
 from discord.ext import commands
-import requests
-import json
-import openai
+import aiohttp
 import logging
 import asyncio
+import time
+from profile_cache import AoE2NetClient
+from civ_knowledge import load_knowledge
+from poll_on_going_games import MatchPoller
+from llm_client import LLMClient
+from reminders import ReminderScheduler, ReminderLimitError
+
+# Discord bot that stops its background pollers and closes pooled connections on shutdown
+class AoE2Bot(commands.Bot):
+    async def close(self):
+        await match_poller.stop()
+        await aoe2net.close()
+        llm.close()
+        await super().close()
 
 # Initialize the Discord bot
-bot = commands.Bot(command_prefix='!')
+bot = AoE2Bot(command_prefix='!')
+
+# Load AoE2 data from a JSON file, indexed for typo-tolerant lookups (cached next to the JSON)
+civ_knowledge = load_knowledge('aoe2_data.json')
+
+# Shared AoE2.net client: pooled connections, cached profiles, restarts stay warm via the disk cache
+aoe2net = AoE2NetClient(disk_path='profile_cache.json')
+
+# Reminders from every channel share one timer task and survive restarts
+async def send_reminder(channel_id, text):
+    channel = bot.get_channel(channel_id)
+    if channel is not None:
+        await channel.send(text)
 
-# Load AoE2 data from a JSON file
-with open('aoe2_data.json', 'r') as f:
-    aoe2_data = json.load(f)
+reminder_scheduler = ReminderScheduler(send_reminder, path='reminders.json')
+
+# OpenAI completions run off the event loop; lore and other stable answers are cached on disk
+llm = LLMClient(max_concurrency=4, disk_path='completion_cache.json')
 
 # Function to fetch player winrate profiles from AoE2.net API
-def get_player_profile(profile_id):
-    api_url = f"https://aoe2.net/api/player/profile?game=aoe2de&profile_id={profile_id}"
+async def get_player_profile(profile_id):
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
-        profile = {
-            "name": data['name'],
-            "country": data['country'],
-            "games": data['games'],
-            "wins": data['wins'],
-            "losses": data['losses'],
-            "winrate": data['win_rate'],
-            "favorite_civ": data['favorite_civ']
-        }
-        return profile
-    except requests.exceptions.RequestException as e:
+        return await aoe2net.get_player_profile(profile_id)
+    except (aiohttp.ClientError, asyncio.TimeoutError, KeyError) as e:
         logging.error(f"Error fetching player profile: {str(e)}")
         return None
 
 # Command to get civilization information
 @bot.command(name='civ')
 async def civ(ctx, *, civilization: str):
-    civ_info = aoe2_data.get(civilization.lower())
-    if civ_info:
-        bonuses = "\n".join(civ_info['bonuses'])
-        unique_units = ", ".join(civ_info['unique_units'])
-        hidden_stats = "\n".join(civ_info['hidden_stats'])
-        
-        response = f"**{civilization} Civilization**\n\n**Bonuses:**\n{bonuses}\n\n**Unique Units:**\n{unique_units}\n\n**Hidden Stats:**\n{hidden_stats}"
+    response = civ_knowledge.civ_response(civilization)
+    if response:
         await ctx.send(response)
     else:
         await ctx.send(f"Sorry, I couldn't find information on the civilization '{civilization}'.")
@@ -52,15 +59,10 @@ async def civ(ctx, *, civilization: str):
 @bot.command(name='matchup')
 async def matchup(ctx, *, civilizations: str):
     try:
-        civ1, civ2 = [civ.strip().lower() for civ in civilizations.split('vs')]
-        civ1_info = aoe2_data.get(civ1)
-        civ2_info = aoe2_data.get(civ2)
+        civ1, civ2 = [civ.strip() for civ in civilizations.split('vs')]
+        response = civ_knowledge.matchup_response(civ1, civ2)
         
-        if civ1_info and civ2_info:
-            response = f"**Matchup: {civ1.title()} vs {civ2.title()}**\n\n"
-            response += f"**{civ1.title()} Bonuses:**\n" + "\n".join(civ1_info['bonuses']) + "\n\n"
-            response += f"**{civ2.title()} Bonuses:**\n" + "\n".join(civ2_info['bonuses']) + "\n\n"
-            response += "Strategic Insights:\n"
+        if response:
             await ctx.send(response)
         else:
             await ctx.send("Sorry, I couldn't find information on one or both civilizations.")
@@ -70,7 +72,7 @@ async def matchup(ctx, *, civilizations: str):
 # Command to get player profile
 @bot.command(name='profile')
 async def profile(ctx, *, profile_id: int):
-    profile = get_player_profile(profile_id)
+    profile = await get_player_profile(profile_id)
     if profile:
         response = f"**Player Profile: {profile['name']}**\n\n"
         response += f"**Country:** {profile['country']}\n"
@@ -90,23 +92,16 @@ async def advice(ctx, player_id: int):
     Command to get strategic advice based on player match data.
     """
     try:
-        match_history_url = f"https://aoe2.net/api/player/matches?game=aoe2de&profile_id={player_id}&count=5"
-        match_response = requests.get(match_history_url)
-        match_response.raise_for_status()
-        matches = match_response.json()
+        matches = await aoe2net.get_match_history(player_id, count=5)
         
         # Summarize match data for GPT input
         match_summaries = "\n".join([f"Opponent: {match['opponent_name']}, Result: {'Win' if match['won'] else 'Loss'}, Civ: {match['civ']}" for match in matches])
         prompt = f"Given the recent match data:\n{match_summaries}\nProvide detailed strategic advice for the player."
         
-        gpt_response = openai.Completion.create(
-            engine="text-davinci-003",
-            prompt=prompt,
-            max_tokens=150
-        )
-        advice = gpt_response.choices[0].text.strip()
+        # Match history changes, so share in-flight requests but don't cache the advice
+        advice = await llm.complete(prompt, max_tokens=150, cache=False)
         await ctx.send(f"**Strategic Advice:**\n{advice}")
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         await ctx.send(f"Error fetching match data: {str(e)}")
     except Exception as e:
         await ctx.send(f"Error generating advice: {str(e)}")
@@ -117,15 +112,12 @@ async def lore(ctx, *, civilization: str):
     """
     Command to get lore and backstory for a civilization.
     """
-    prompt = f"Create an immersive lore and backstory for the civilization: {civilization} in Age of Empires II."
+    # Same civ, same prompt: "!lore khmr" reuses the cached Khmer lore
+    civ_key = civ_knowledge.resolve(civilization)
+    prompt = f"Create an immersive lore and backstory for the civilization: {civ_key.title() if civ_key else civilization} in Age of Empires II."
     
     try:
-        gpt_response = openai.Completion.create(
-            engine="text-davinci-003",
-            prompt=prompt,
-            max_tokens=300
-        )
-        lore = gpt_response.choices[0].text.strip()
+        lore = await llm.complete(prompt, max_tokens=300)
         await ctx.send(f"**{civilization} Lore:**\n{lore}")
     except Exception as e:
         await ctx.send(f"Error generating lore: {str(e)}")
@@ -139,12 +131,8 @@ async def scenario(ctx):
     prompt = "Generate a unique custom scenario idea for Age of Empires II, including mission objectives, storyline, and unique challenges."
     
     try:
-        gpt_response = openai.Completion.create(
-            engine="text-davinci-003",
-            prompt=prompt,
-            max_tokens=250
-        )
-        scenario = gpt_response.choices[0].text.strip()
+        # A fresh idea every time, so only identical in-flight requests are shared
+        scenario = await llm.complete(prompt, max_tokens=250, cache=False)
         await ctx.send(f"**Custom Scenario Idea:**\n{scenario}")
     except Exception as e:
         await ctx.send(f"Error generating scenario: {str(e)}")
@@ -181,15 +169,82 @@ async def reminder(ctx, interval: int):
         "Transition to the next age when you have enough resources!"
     ]
     
-    async def send_reminders():
-        for reminder in reminders:
-            await ctx.send(reminder)
-            await asyncio.sleep(interval * 60)  # Wait for the specified interval in minutes
-    
-    bot.loop.create_task(send_reminders())
+    if interval < 1:
+        await ctx.send("The interval is in minutes and must be at least 1.")
+        return
+
+    try:
+        scheduled = reminder_scheduler.add(ctx.author.id, ctx.channel.id, reminders, interval * 60)  # Interval is in minutes
+    except ReminderLimitError as e:
+        await ctx.send(str(e))
+        return
+    await ctx.send(f"Reminder #{scheduled.reminder_id} set: {len(reminders)} tips, one every {interval} minute(s). Use !cancel {scheduled.reminder_id} to stop it.")
+
+# Command to list your pending reminders
+@bot.command(name='reminders')
+async def list_reminders(ctx):
+    """
+    Command to list your pending reminders.
+    """
+    pending = reminder_scheduler.for_user(ctx.author.id)
+    if not pending:
+        await ctx.send("You have no reminders running.")
+        return
+    lines = [f"#{r.reminder_id}: {len(r.messages) - r.index} left, next in {max(0, int(r.next_at - time.time()))}s" for r in pending]
+    await ctx.send("**Your reminders:**\n" + "\n".join(lines))
+
+# Command to cancel one of your reminders
+@bot.command(name='cancel')
+async def cancel(ctx, reminder_id: int):
+    """
+    Command to cancel one of your reminders.
+    """
+    if reminder_scheduler.cancel(reminder_id, user_id=ctx.author.id):
+        await ctx.send(f"Cancelled reminder #{reminder_id}.")
+    else:
+        await ctx.send(f"You have no reminder #{reminder_id}.")
+
+# Match-start notifications for tracked profiles: profile_id -> channels to post in
+match_poller = MatchPoller(client=aoe2net)
+tracked_channels = {}
+
+async def announce_new_matches(profile_id, matches):
+    for match in matches:
+        players = [player.get('name', 'N/A') for player in match.get('players', [])]
+        message = f"**Match started:** {' vs '.join(players)} (Match ID: {match.get('match_id')})"
+        for channel in tracked_channels.get(profile_id, ()):
+            await channel.send(message)
+
+match_poller.subscribe(announce_new_matches)
+
+@bot.event
+async def on_ready():
+    match_poller.start()
+    reminder_scheduler.start()
+
+# Command to get notified when a player starts a match
+@bot.command(name='track')
+async def track(ctx, profile_id: int):
+    """
+    Command to announce new matches for a player in this channel.
+    """
+    tracked_channels.setdefault(profile_id, set()).add(ctx.channel)
+    match_poller.add_profile(profile_id)
+    await ctx.send(f"Tracking matches for profile {profile_id} in this channel.")
+
+# Command to stop match notifications for a player
+@bot.command(name='untrack')
+async def untrack(ctx, profile_id: int):
+    """
+    Command to stop announcing new matches for a player in this channel.
+    """
+    channels = tracked_channels.get(profile_id, set())
+    channels.discard(ctx.channel)
+    if not channels:
+        tracked_channels.pop(profile_id, None)
+        match_poller.remove_profile(profile_id)
+    await ctx.send(f"Stopped tracking profile {profile_id} here.")
 
-# Adding asyncio to the imports
-import asyncio
 
 # Run the bot
 bot.run('your_discord_bot_token')
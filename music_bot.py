@@ -3,11 +3,15 @@
 
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import discord
 from discord.ext import commands
 import yt_dlp
 from dotenv import load_dotenv
 
+from music_player import MusicPlayer, GuildSessions
+from track_cache import TrackCache
+
 
 # Load environment variables
 load_dotenv()
@@ -44,58 +48,35 @@ FFMPEG_OPTIONS = {
 # Create YT DLP client
 ytdl = yt_dlp.YoutubeDL(YTDL_OPTIONS)
 
-class MusicBot:
-    def __init__(self):
-        self.queue = []
-        self.is_playing = False
-        self.current_song = None
-        self.voice_client = None
-
-    async def join_voice_channel(self, ctx):
-        if ctx.author.voice is None:
-            await ctx.send("You're not connected to a voice channel!")
-            return False
-        
-        voice_channel = ctx.author.voice.channel
-        if ctx.voice_client is None:
-            self.voice_client = await voice_channel.connect()
-        else:
-            await ctx.voice_client.move_to(voice_channel)
-            self.voice_client = ctx.voice_client
-        return True
-
-    def play_next(self, ctx):
-        if len(self.queue) > 0 and self.voice_client:
-            self.is_playing = True
-            url = self.queue.pop(0)
-            
-            def after_playing(error):
-                if error:
-                    print(f'Player error: {error}')
-                if len(self.queue) > 0:
-                    self.play_next(ctx)
-                else:
-                    self.is_playing = False
-
-            # Get audio source
-            loop = asyncio.get_event_loop()
-            data = loop.run_until_complete(self.get_audio_source(url))
-            if data:
-                self.voice_client.play(discord.FFmpegPCMAudio(
-                    data['url'], **FFMPEG_OPTIONS), after=after_playing)
-
-    async def get_audio_source(self, url):
-        try:
-            data = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: ytdl.extract_info(url, download=False))
-            if 'entries' in data:  # It's a playlist
-                data = data['entries'][0]
-            return data
-        except Exception as e:
-            print(f"Error extracting info: {e}")
-            return None
-
-music_bot = MusicBot()
+# Number of upcoming tracks whose stream URLs are resolved ahead of time
+PREFETCH_TRACKS = 3
+
+# Resolved titles and stream URLs, kept across restarts until the URLs expire
+track_cache = TrackCache('track_cache.json', max_entries=500)
+
+# Seconds a guild can sit without music before the bot leaves its voice channel
+IDLE_TIMEOUT = 300
+
+# yt-dlp lookups for every guild share one small pool
+ytdl_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ytdl')
+
+# One independent queue and player per guild, created on first use
+sessions = GuildSessions(
+    lambda: MusicPlayer(ytdl, FFMPEG_OPTIONS, prefetch=PREFETCH_TRACKS, cache=track_cache, pool=ytdl_pool),
+    idle_timeout=IDLE_TIMEOUT
+)
+
+async def join_voice_channel(ctx):
+    if ctx.author.voice is None:
+        await ctx.send("You're not connected to a voice channel!")
+        return None
+    
+    voice_channel = ctx.author.voice.channel
+    if ctx.voice_client is None:
+        return await voice_channel.connect()
+    if ctx.voice_client.channel != voice_channel:
+        await ctx.voice_client.move_to(voice_channel)
+    return ctx.voice_client
 
 @bot.event
 async def on_ready():
@@ -103,61 +84,79 @@ async def on_ready():
 
 @bot.command(name='play')
 async def play(ctx, url):
-    """Play a song from YouTube URL"""
+    """Play a song or playlist from YouTube URL"""
     # Connect to voice channel
-    if ctx.author.voice is None:
-        await ctx.send("You're not connected to a voice channel!")
+    voice_client = await join_voice_channel(ctx)
+    if voice_client is None:
         return
+    session = sessions.get(ctx.guild.id)
+    session.text_channel = ctx.channel
+    player = session.player
     
-    voice_channel = ctx.author.voice.channel
-    if ctx.voice_client is None:
-        await voice_channel.connect()
-    
-    # Get the audio
+    # Queue the audio; stream URLs are resolved in the background
     try:
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(None, lambda: ytdl.extract_info(url, download=False))
-        
-        if 'entries' in data:  # It's a playlist
-            url2 = data['entries'][0]['url']
-        else:
-            url2 = data['url']
-        
-        # Play the audio
-        source = discord.FFmpegPCMAudio(url2, **FFMPEG_OPTIONS)
-        ctx.voice_client.play(source)
-        
-        await ctx.send(f'Now playing: {data.get("title", "Unknown title")}')
+        track = await player.enqueue(url)
+        if track is None:
+            await ctx.send("Couldn't find anything to play.")
+            return
+
+        async def announce(track):
+            await session.text_channel.send(f'Now playing: {track.title}')
+
+        player.on_track_start = announce
+        if player.is_playing:
+            await ctx.send(f'Queued: {track.title}')
+        await player.start(voice_client)
         
     except Exception as e:
         print(f"Error details: {str(e)}")  # This will show in your console
         await ctx.send(f'An error occurred while trying to play the audio: {str(e)}')
 
+@bot.command(name='queue')
+async def queue(ctx):
+    """Show the upcoming songs"""
+    # Looking doesn't start a session; only !play does
+    session = sessions.sessions.get(ctx.guild.id)
+    titles = session.player.queued_titles() if session else []
+    if titles:
+        await ctx.send("Up next:\n" + "\n".join(f"{i}. {title}" for i, title in enumerate(titles, 1)))
+    else:
+        await ctx.send('The queue is empty')
+
+@bot.command(name='cachestats')
+async def cachestats(ctx):
+    """Show track cache hit/miss counters"""
+    stats = track_cache.get_stats()
+    await ctx.send(f"Track cache: {stats['size']} tracks | hits {stats['hits']}, misses {stats['misses']}, "
+                   f"expired {stats['expired']}, evictions {stats['evictions']} | hit rate {stats['hit_rate']:.0%}")
+
 @bot.command(name='stop')
 async def stop(ctx):
     """Stop playing and clear the queue"""
-    if ctx.voice_client:
-        music_bot.queue = []
-        ctx.voice_client.stop()
+    session = sessions.sessions.get(ctx.guild.id)
+    if ctx.voice_client and session:
+        session.player.stop()
         await ctx.send('Stopped playing and cleared the queue')
 
 @bot.command(name='skip')
 async def skip(ctx):
     """Skip the current song"""
-    if ctx.voice_client and ctx.voice_client.is_playing():
-        ctx.voice_client.stop()
+    # The player starts the next song from its after-callback
+    session = sessions.sessions.get(ctx.guild.id)
+    if session and session.player.skip():
         await ctx.send('Skipped the current song')
-        music_bot.play_next(ctx)
 
 @bot.command(name='leave')
 async def leave(ctx):
     """Leave the voice channel"""
     if ctx.voice_client:
-        await ctx.voice_client.disconnect()
-        music_bot.queue = []
-        music_bot.is_playing = False
+        await sessions.evict(ctx.guild.id)
+        if ctx.voice_client:
+            await ctx.voice_client.disconnect()
         await ctx.send('Left the voice channel')
 
 # Run the bot
 if __name__ == "__main__":
-    bot.run(TOKEN)
\ No newline at end of file
+    bot.run(TOKEN)
+    # Write out whatever the batched save hasn't yet
+    track_cache.flush()
\ No newline at end of file
@@ -0,0 +1,260 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from track_cache import video_id_from
+
+
+class Track:
+    def __init__(self, query, title=None, video_id=None):
+        self.query = query
+        self.title = title or query
+        self.video_id = video_id or video_id_from(query)
+        self.stream = None  # future resolving to the extract_info dict
+
+    def __repr__(self):
+        return f"Track({self.title!r})"
+
+
+class MusicPlayer:
+    """Asyncio playback queue for one voice client.
+
+    Stream URLs for the next `prefetch` tracks are resolved ahead of time in a
+    small thread pool, so when a song ends the next one starts straight away.
+    Playlists are expanded lazily: entries are pulled from a generator only
+    when the prefetch window needs them.
+    """
+
+    def __init__(self, ytdl, ffmpeg_options, prefetch=3, max_workers=2, source_factory=None, cache=None,
+                 pool=None):
+        self.ytdl = ytdl
+        self.cache = cache
+        self.ffmpeg_options = ffmpeg_options
+        self.prefetch = prefetch
+        # A pool passed in is shared (e.g. by every guild) and not shut down by close()
+        self.owns_pool = pool is None
+        self.pool = pool or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ytdl')
+        self.source_factory = source_factory or self._ffmpeg_source
+        self.voice_client = None
+        self.loop = None
+        self.pending = deque()    # iterators of Track, one per !play
+        self.upcoming = deque()   # Tracks whose streams are being resolved
+        self.current = None
+        self.on_track_start = None
+        self.on_idle = None
+        self._advance_lock = asyncio.Lock()
+        self._prefetch_lock = asyncio.Lock()  # playlist generators can't be advanced concurrently
+
+    @property
+    def is_playing(self):
+        return self.current is not None
+
+    def _ffmpeg_source(self, url):
+        import discord
+        return discord.FFmpegPCMAudio(url, **self.ffmpeg_options)
+
+    def _extract(self, query, **kwargs):
+        return self.ytdl.extract_info(query, download=False, **kwargs)
+
+    def _expand(self, query):
+        """Return a generator of Tracks without resolving any stream URLs"""
+        # A known single video needs no lookup at all
+        video_id = video_id_from(query)
+        if self.cache and video_id and 'list=' not in query:
+            # Only a peek: _resolve does the counted lookup when the track is played
+            cached = self.cache.peek(video_id)
+            if cached:
+                return iter([Track(query, cached['title'], video_id)])
+        info = self._extract(query, process=False)
+        if info.get('_type') not in ('playlist', 'multi_video'):
+            return iter([Track(query, info.get('title'), info.get('id'))])
+        entries = info.get('entries') or []
+        return (Track(entry.get('url') or entry.get('webpage_url') or entry.get('id'), entry.get('title'), entry.get('id'))
+                for entry in entries if entry)
+
+    def _resolve(self, track):
+        if self.cache and track.video_id:
+            cached = self.cache.get(track.video_id)
+            if cached:
+                track.title = cached['title'] or track.title
+                return cached
+        info = self._extract(track.query)
+        if 'entries' in info:  # A search or playlist result; take the first hit
+            info = next(iter(info['entries']))
+        track.title = info.get('title', track.title)
+        if self.cache and info.get('id') and info.get('url'):
+            track.video_id = info['id']
+            return self.cache.put(info)
+        return info
+
+    async def enqueue(self, query):
+        """Queue a URL, search or playlist. Returns the first Track queued, or None"""
+        self.loop = asyncio.get_running_loop()
+        tracks = await self.loop.run_in_executor(self.pool, self._expand, query)
+        first = await self.loop.run_in_executor(self.pool, next, tracks, None)
+        if first is None:
+            return None
+        self.pending.append(itertools.chain([first], tracks))
+        await self._fill_prefetch()
+        return first
+
+    async def _next_pending(self):
+        while self.pending:
+            track = await self.loop.run_in_executor(self.pool, next, self.pending[0], None)
+            if track is not None:
+                return track
+            self.pending.popleft()
+        return None
+
+    async def _fill_prefetch(self):
+        async with self._prefetch_lock:
+            while len(self.upcoming) < self.prefetch:
+                track = await self._next_pending()
+                if track is None:
+                    return
+                track.stream = self.loop.run_in_executor(self.pool, self._resolve, track)
+                self.upcoming.append(track)
+
+    async def start(self, voice_client):
+        """Begin playback on voice_client if nothing is playing"""
+        self.voice_client = voice_client
+        await self.play_next()
+
+    async def play_next(self):
+        async with self._advance_lock:
+            if self.voice_client is None or self.voice_client.is_playing():
+                return
+            self.current = None
+            while self.upcoming:
+                track = self.upcoming.popleft()
+                try:
+                    info = await track.stream
+                except Exception as e:
+                    print(f"Error extracting info for {track.title}: {e}")
+                    await self._fill_prefetch()
+                    continue
+                self.current = track
+                self.voice_client.play(self.source_factory(info['url']), after=self._after_playing)
+                # Refill the window only once the song is already playing
+                await self._fill_prefetch()
+                if self.on_track_start:
+                    await self.on_track_start(track)
+                return
+            if self.on_idle:
+                self.on_idle()
+
+    def _after_playing(self, error):
+        # Runs on discord's audio thread: hand the transition back to the event loop
+        if error:
+            print(f'Player error: {error}')
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(lambda: asyncio.ensure_future(self.play_next()))
+
+    def clear(self):
+        self.pending.clear()
+        for track in self.upcoming:
+            track.stream.cancel()
+        self.upcoming.clear()
+
+    def stop(self):
+        self.clear()
+        self.current = None
+        if self.voice_client and self.voice_client.is_playing():
+            self.voice_client.stop()
+        if self.on_idle:
+            self.on_idle()
+
+    def skip(self):
+        # Stopping fires the after callback, which starts the next track
+        if self.voice_client and self.voice_client.is_playing():
+            self.voice_client.stop()
+            return True
+        return False
+
+    def queued_titles(self, limit=10):
+        return [track.title for track in itertools.islice(self.upcoming, limit)]
+
+    def close(self):
+        self.stop()
+        if self.owns_pool:
+            self.pool.shutdown(wait=False)
+
+
+class GuildSession:
+    def __init__(self, guild_id, player):
+        self.guild_id = guild_id
+        self.player = player
+        self.text_channel = None
+        self.idle_task = None
+        self.last_active = time.monotonic()
+
+
+class GuildSessions:
+    """One MusicPlayer per guild, created on first use.
+
+    A session whose player has nothing left to play disconnects from voice
+    and is dropped after `idle_timeout` seconds, unless playback resumes.
+    """
+
+    def __init__(self, player_factory, idle_timeout=300):
+        self.player_factory = player_factory
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.stats = {'created': 0, 'evicted': 0}
+
+    def get(self, guild_id):
+        session = self.sessions.get(guild_id)
+        if session is None:
+            session = GuildSession(guild_id, self.player_factory())
+            session.player.on_idle = lambda: self._schedule_idle(guild_id)
+            self.sessions[guild_id] = session
+            self.stats['created'] += 1
+        session.last_active = time.monotonic()
+        self._cancel_idle(session)
+        return session
+
+    def _cancel_idle(self, session):
+        if session.idle_task and not session.idle_task.done():
+            session.idle_task.cancel()
+        session.idle_task = None
+
+    def _schedule_idle(self, guild_id):
+        session = self.sessions.get(guild_id)
+        if session is None:
+            return
+        self._cancel_idle(session)
+        session.idle_task = asyncio.ensure_future(self._idle_disconnect(guild_id))
+
+    async def _idle_disconnect(self, guild_id):
+        await asyncio.sleep(self.idle_timeout)
+        session = self.sessions.get(guild_id)
+        if session is None or session.player.is_playing:
+            return
+        if session.text_channel:
+            try:
+                await session.text_channel.send('Leaving the voice channel after being idle')
+            except Exception as e:
+                print(f"Couldn't announce idle disconnect: {e}")
+        await self.evict(guild_id)
+
+    async def evict(self, guild_id):
+        session = self.sessions.pop(guild_id, None)
+        if session is None:
+            return
+        if session.idle_task is not asyncio.current_task():
+            self._cancel_idle(session)
+        voice_client = session.player.voice_client
+        session.player.close()
+        if voice_client is not None and voice_client.is_connected():
+            await voice_client.disconnect()
+        self.stats['evicted'] += 1
+
+    async def close(self):
+        for guild_id in list(self.sessions):
+            await self.evict(guild_id)
+
+    def get_stats(self):
+        playing = sum(1 for session in self.sessions.values() if session.player.is_playing)
+        return dict(self.stats, active=len(self.sessions), playing=playing)
@@ -1,23 +1,11 @@
-import requests
+import sys
 import time
+import random
+import asyncio
+import logging
+from urllib.parse import urlsplit
 
-# Define the base URL for the AoE2.net API
-BASE_URL = "https://aoe2.net/api/player/matches"
-
-# Function to fetch match history
-def fetch_match_history(profile_id, count=10):
-    params = {
-        "game": "aoe2de",
-        "profile_id": profile_id,
-        "count": count
-    }
-    try:
-        response = requests.get(BASE_URL, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching match history: {e}")
-        return None
+from profile_cache import AOE2NET_API, AoE2NetClient
 
 # Function to display match history
 def display_match_history(history):
@@ -34,15 +22,143 @@ def display_match_history(history):
         print(f"Started at: {match.get('started', 'N/A')} (timestamp)")
         print("-" * 40)
 
+# Spaces out requests to the same host so several profiles don't hammer the API
+class HostRateLimiter:
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self.locks = {}
+        self.last_request = {}
+
+    async def wait(self, host):
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self.last_request.get(host, 0) + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.last_request[host] = time.monotonic()
+
+
+# Polls match history for a set of profiles and emits only matches not seen before
+class MatchPoller:
+    def __init__(self, profile_ids=(), interval=60, count=10, min_interval=1.0,
+                 base_backoff=5, max_backoff=600, client=None, fetch=None):
+        self.profile_ids = set(profile_ids)
+        self.interval = interval
+        self.count = count
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = HostRateLimiter(min_interval)
+        # Share the bot's pooled AoE2.net client; only a client we created is closed on stop()
+        self.owns_client = client is None and fetch is None
+        self.client = client or (AoE2NetClient() if self.owns_client else None)
+        self.fetch = fetch or self._fetch
+        self.last_seen = {}   # profile_id -> highest match_id seen
+        self.failures = {}    # profile_id -> consecutive failed polls
+        self.subscribers = []
+        self.tasks = {}
+        self.running = False
+
+    def subscribe(self, callback):
+        """callback(profile_id, new_matches) is called with matches oldest first; may be async"""
+        self.subscribers.append(callback)
+
+    def add_profile(self, profile_id):
+        self.profile_ids.add(profile_id)
+        if self.running and profile_id not in self.tasks:
+            self.tasks[profile_id] = asyncio.ensure_future(self._poll_forever(profile_id))
+
+    def remove_profile(self, profile_id):
+        self.profile_ids.discard(profile_id)
+        task = self.tasks.pop(profile_id, None)
+        if task:
+            task.cancel()
+        self.last_seen.pop(profile_id, None)
+        self.failures.pop(profile_id, None)
+
+    async def _fetch(self, profile_id, count):
+        return await self.client.get_match_history(profile_id, count=count, refresh=True)
+
+    def diff(self, profile_id, history):
+        """Return matches newer than the last seen match_id, oldest first"""
+        matches = sorted((m for m in history or [] if m.get('match_id') is not None),
+                         key=lambda m: int(m['match_id']))
+        if not matches:
+            return []
+        last_seen = self.last_seen.get(profile_id)
+        self.last_seen[profile_id] = max(int(matches[-1]['match_id']), last_seen or 0)
+        if last_seen is None:
+            # First poll only sets the baseline so a restart doesn't replay old games
+            return []
+        return [m for m in matches if int(m['match_id']) > last_seen]
+
+    async def poll_profile(self, profile_id):
+        await self.rate_limiter.wait(urlsplit(AOE2NET_API).netloc)
+        history = await self.fetch(profile_id, self.count)
+        new_matches = self.diff(profile_id, history)
+        if new_matches:
+            await self._emit(profile_id, new_matches)
+        return new_matches
+
+    async def _emit(self, profile_id, new_matches):
+        for callback in list(self.subscribers):
+            try:
+                result = callback(profile_id, new_matches)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logging.error(f"Match poller subscriber failed: {e}")
+
+    def next_delay(self, profile_id):
+        failures = self.failures.get(profile_id, 0)
+        if not failures:
+            return self.interval
+        # Full jitter: anywhere up to the exponential cap
+        return random.uniform(self.base_backoff, min(self.max_backoff, self.base_backoff * 2 ** failures))
+
+    async def _poll_forever(self, profile_id):
+        while True:
+            try:
+                await self.poll_profile(profile_id)
+                self.failures[profile_id] = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures[profile_id] = self.failures.get(profile_id, 0) + 1
+                logging.warning(f"Polling {profile_id} failed ({self.failures[profile_id]} in a row): {e}")
+            await asyncio.sleep(self.next_delay(profile_id))
+
+    def start(self):
+        self.running = True
+        for profile_id in self.profile_ids:
+            if profile_id not in self.tasks:
+                self.tasks[profile_id] = asyncio.ensure_future(self._poll_forever(profile_id))
+
+    async def stop(self):
+        self.running = False
+        tasks = list(self.tasks.values())
+        self.tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.owns_client:
+            await self.client.close()
+
+
 # Main function to run the script
-def main():
-    profile_id = 11539183  # Replace with the desired profile ID
-    while True:
-        print("Polling for match history...")
-        history = fetch_match_history(profile_id)
-        display_match_history(history)
-        print("Sleeping for 60 seconds...\n")
-        time.sleep(60)
+async def main(profile_ids):
+    poller = MatchPoller(profile_ids)
+    poller.subscribe(lambda profile_id, matches: display_match_history(matches))
+    poller.start()
+    print(f"Polling {len(poller.profile_ids)} profile(s) for new matches...")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await poller.stop()
 
 if __name__ == "__main__":
-    main()
+    # Replace with the desired profile IDs, or pass them on the command line
+    profile_ids = [int(arg) for arg in sys.argv[1:]] or [11539183]
+    try:
+        asyncio.run(main(profile_ids))
+    except KeyboardInterrupt:
+        pass
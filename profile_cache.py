@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+# Base URL for the AoE2.net API
+AOE2NET_API = "https://aoe2.net/api"
+
+
+# TTL + LRU cache with coalesced in-flight fetches and an optional JSON file on disk.
+# Disk writes are batched: a miss schedules one write save_delay seconds later, run on
+# the default executor so the event loop never waits on json.dump.
+class TTLCache:
+    def __init__(self, ttl=300, max_entries=1024, disk_path=None, save_delay=5.0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.save_delay = save_delay
+        self.entries = OrderedDict()  # key -> (stored_at, value)
+        self.in_flight = {}
+        self.save_handle = None
+        self.save_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "saves": 0}
+        if disk_path:
+            self._load()
+
+    def _fresh(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value):
+        self.entries[key] = (time.time(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, key, fetch):
+        """Return the cached value for key, or await fetch() once for all concurrent callers"""
+        entry = self._fresh(key)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry[1]
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        self.stats["misses"] += 1
+        task = asyncio.ensure_future(fetch())
+        self.in_flight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+
+        if value is not None:
+            self.put(key, value)
+            self._schedule_save()
+        return value
+
+    def _load(self):
+        if not os.path.exists(self.disk_path):
+            return
+        try:
+            with open(self.disk_path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache file {self.disk_path}: {e}")
+            return
+        now = time.time()
+        for key, (stored_at, value) in sorted(stored.items(), key=lambda item: item[1][0]):
+            if now - stored_at <= self.ttl:
+                self.entries[key] = (stored_at, value)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _schedule_save(self):
+        if not self.disk_path or self.save_handle is not None:
+            return
+        self.save_handle = asyncio.get_running_loop().call_later(self.save_delay, self._save_in_background)
+
+    def _save_in_background(self):
+        self.save_handle = None
+        snapshot = self._snapshot()
+        asyncio.get_running_loop().run_in_executor(None, self._write, snapshot)
+
+    def _snapshot(self):
+        return {key: list(entry) for key, entry in self.entries.items()}
+
+    def _write(self, snapshot):
+        tmp_path = self.disk_path + ".tmp"
+        try:
+            with self.save_lock:
+                with open(tmp_path, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.disk_path)
+            self.stats["saves"] += 1
+        except OSError as e:
+            logging.error(f"Couldn't write cache file {self.disk_path}: {e}")
+
+    def _cancel_pending_save(self):
+        if self.save_handle is not None:
+            self.save_handle.cancel()
+            self.save_handle = None
+
+    def save(self):
+        """Write the cache now, replacing any pending batched write (for shutdown)"""
+        if not self.disk_path:
+            return
+        self._cancel_pending_save()
+        self._write(self._snapshot())
+
+    async def flush(self):
+        """save() on the default executor"""
+        if not self.disk_path:
+            return
+        self._cancel_pending_save()
+        await asyncio.get_running_loop().run_in_executor(None, self._write, self._snapshot())
+
+
+# Pooled aiohttp client for AoE2.net with cached profiles and match histories
+class AoE2NetClient:
+    def __init__(self, profile_ttl=600, history_ttl=60, max_entries=1024, disk_path=None,
+                 pool_size=10, timeout=10):
+        self.profiles = TTLCache(profile_ttl, max_entries, disk_path)
+        self.histories = TTLCache(history_ttl, max_entries)
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+
+    async def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def _get_json(self, path, **params):
+        session = await self._session()
+        async with session.get(f"{AOE2NET_API}/{path}", params=params) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def get_player_profile(self, profile_id):
+        async def fetch():
+            data = await self._get_json("player/profile", game="aoe2de", profile_id=profile_id)
+            return {
+                "name": data['name'],
+                "country": data['country'],
+                "games": data['games'],
+                "wins": data['wins'],
+                "losses": data['losses'],
+                "winrate": data['win_rate'],
+                "favorite_civ": data['favorite_civ']
+            }
+
+        # JSON object keys are strings, so key by str to match what comes back from disk
+        return await self.profiles.get(str(profile_id), fetch)
+
+    async def get_match_history(self, profile_id, count=10, refresh=False):
+        """refresh=True skips the cached copy (pollers want new matches) but still shares in-flight fetches"""
+        async def fetch():
+            return await self._get_json("player/matches", game="aoe2de", profile_id=profile_id, count=count)
+
+        key = f"{profile_id}:{count}"
+        if refresh:
+            self.histories.entries.pop(key, None)
+        return await self.histories.get(key, fetch)
+
+    def get_stats(self):
+        return {"profiles": dict(self.profiles.stats, size=len(self.profiles.entries)),
+                "histories": dict(self.histories.stats, size=len(self.histories.entries))}
+
+    async def close(self):
+        await self.profiles.flush()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
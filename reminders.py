@@ -0,0 +1,198 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+
+
+class Reminder:
+    def __init__(self, reminder_id, user_id, channel_id, messages, interval, next_at, index=0):
+        self.reminder_id = reminder_id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.messages = messages
+        self.interval = interval  # seconds between messages
+        self.next_at = next_at    # wall-clock time of the next message
+        self.index = index        # next message to send
+        self.cancelled = False
+
+    def to_dict(self):
+        return {"reminder_id": self.reminder_id, "user_id": self.user_id, "channel_id": self.channel_id,
+                "messages": self.messages, "interval": self.interval, "next_at": self.next_at,
+                "index": self.index}
+
+
+class ReminderLimitError(Exception):
+    pass
+
+
+class ReminderScheduler:
+    """All reminders share one task sleeping until the earliest due entry in a heap.
+
+    A reminder sends its messages one per interval to its channel, then
+    finishes. Pending reminders are written to `path` whenever they change and
+    reloaded by start(), so they survive restarts.
+    """
+
+    def __init__(self, send, path='reminders.json', max_per_user=5, max_per_channel=20, min_interval=60,
+                 save_retry=30):
+        self.send = send  # async send(channel_id, text)
+        self.path = path
+        self.max_per_user = max_per_user
+        self.max_per_channel = max_per_channel
+        self.min_interval = min_interval  # seconds
+        self.save_retry = save_retry  # seconds before retrying a failed write
+        self.reminders = {}
+        self.heap = []  # (next_at, sequence, reminder_id)
+        self.sequence = itertools.count()
+        self.ids = itertools.count(1)
+        self.wakeup = None
+        self.task = None
+        self.dirty = False
+        self.per_user = {}
+        self.per_channel = {}
+        self.stats = {"sent": 0, "failed": 0, "save_errors": 0}
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self._load()
+            self.task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        self._save()
+
+    def add(self, user_id, channel_id, messages, interval):
+        if interval < self.min_interval:
+            raise ReminderLimitError(f"Reminders can't repeat more often than every {self.min_interval} seconds.")
+        if self.per_user.get(user_id, 0) >= self.max_per_user:
+            raise ReminderLimitError(f"You already have {self.max_per_user} reminders running.")
+        if self.per_channel.get(channel_id, 0) >= self.max_per_channel:
+            raise ReminderLimitError(f"This channel already has {self.max_per_channel} reminders running.")
+        reminder = Reminder(next(self.ids), user_id, channel_id, list(messages), interval, time.time())
+        self._track(reminder)
+        self._push(reminder)
+        self._changed()
+        return reminder
+
+    def cancel(self, reminder_id, user_id=None):
+        """Cancel a reminder; with user_id, only if that user owns it"""
+        reminder = self.reminders.get(reminder_id)
+        if reminder is None or (user_id is not None and reminder.user_id != user_id):
+            return False
+        # Its heap entry stays and is skipped when it comes due
+        reminder.cancelled = True
+        self._untrack(reminder)
+        self._changed()
+        return True
+
+    def _track(self, reminder):
+        self.reminders[reminder.reminder_id] = reminder
+        self.per_user[reminder.user_id] = self.per_user.get(reminder.user_id, 0) + 1
+        self.per_channel[reminder.channel_id] = self.per_channel.get(reminder.channel_id, 0) + 1
+
+    def _untrack(self, reminder):
+        del self.reminders[reminder.reminder_id]
+        for counts, key in ((self.per_user, reminder.user_id), (self.per_channel, reminder.channel_id)):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+
+    def _changed(self):
+        # The timer task writes the file once per pass, so a burst of changes is one write
+        self.dirty = True
+        if self.task is not None and not self.task.done():
+            self.wakeup.set()
+        else:
+            self._save()
+
+    def for_user(self, user_id):
+        return sorted((r for r in self.reminders.values() if r.user_id == user_id), key=lambda r: r.next_at)
+
+    def _push(self, reminder):
+        heapq.heappush(self.heap, (reminder.next_at, next(self.sequence), reminder.reminder_id))
+        # Wake the timer task if this is now the earliest entry
+        if self.wakeup is not None and self.heap[0][2] == reminder.reminder_id:
+            self.wakeup.set()
+
+    async def _run(self):
+        while True:
+            self.wakeup.clear()
+            timeout = None
+            while self.heap:
+                due_at, _, reminder_id = self.heap[0]
+                reminder = self.reminders.get(reminder_id)
+                if reminder is None or reminder.cancelled or reminder.next_at != due_at:
+                    heapq.heappop(self.heap)
+                    continue
+                timeout = due_at - time.time()
+                if timeout > 0:
+                    break
+                heapq.heappop(self.heap)
+                await self._fire(reminder)
+                timeout = None
+            # One write for everything that fired in this pass
+            if self.dirty:
+                self._save()
+            if self.dirty:
+                # The write failed; come back to retry it even if nothing else is due
+                timeout = self.save_retry if timeout is None else min(timeout, self.save_retry)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, reminder):
+        try:
+            await self.send(reminder.channel_id, reminder.messages[reminder.index])
+            self.stats["sent"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.error(f"Reminder {reminder.reminder_id} failed to send: {e}")
+        if reminder.cancelled:
+            return
+        reminder.index += 1
+        if reminder.index >= len(reminder.messages):
+            self._untrack(reminder)
+        else:
+            reminder.next_at = time.time() + reminder.interval
+            self._push(reminder)
+        self.dirty = True
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Couldn't load reminders from {self.path}: {e}")
+            return
+        for data in stored:
+            reminder = Reminder(**data)
+            self._track(reminder)
+            self._push(reminder)
+        self.ids = itertools.count(max(self.reminders, default=0) + 1)
+
+    def _save(self):
+        """Write pending reminders; on failure stay dirty so the next pass retries"""
+        if not self.path:
+            self.dirty = False
+            return
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump([r.to_dict() for r in self.reminders.values()], f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.dirty = True
+            self.stats["save_errors"] += 1
+            logging.error(f"Couldn't save reminders to {self.path}: {e}")
+            return
+        self.dirty = False
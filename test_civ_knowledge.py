@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from civ_knowledge import CACHE_VERSION, CivKnowledge, load_knowledge, render_matchup
+
+# Checks civ lookups (aliases, plurals, trigram + edit-distance typos), the
+# prerendered responses, and the pickled cache that is reused until the JSON
+# changes.
+
+DATA = {
+    'khmer': {'bonuses': ["Farmers don't need drop sites."], 'unique_units': ["Ballista Elephant"],
+              'hidden_stats': ["Ballista Elephants trample."]},
+    'britons': {'bonuses': ["Archers +1 range in Castle Age."], 'unique_units': ["Longbowman"],
+                'hidden_stats': ["Shepherds work 25% faster."]},
+    'magyars': {'bonuses': ["Forging techs free."], 'unique_units': ["Magyar Huszar"],
+                'hidden_stats': ["Scout cavalry cost 15% less."], 'aliases': ["Hungarians"]},
+}
+
+
+def test_resolve():
+    knowledge = CivKnowledge(DATA)
+    for name, key in (('Khmer', 'khmer'), ('KHMERS', 'khmer'), ('Briton', 'britons'), ('the Britons', 'britons'),
+                      ('Hungarians', 'magyars'), ('Magyár', 'magyars')):
+        assert knowledge.resolve(name) == key, name
+
+    # Typos go through the trigram shortlist and edit similarity
+    assert knowledge.resolve('khmr') == 'khmer'
+    assert knowledge.resolve('khemr') == 'khmer'
+    assert knowledge.resolve('bretons') == 'britons'
+    # Too far from anything: no guess
+    assert knowledge.resolve('xyzzy') is None
+    assert knowledge.resolve('franks') is None
+
+
+def test_responses():
+    knowledge = CivKnowledge(DATA)
+    response = knowledge.civ_response('khmr')
+    assert response.startswith("**Khmer Civilization**") and "Ballista Elephant" in response
+    assert knowledge.civ_response('xyzzy') is None
+
+    assert knowledge.matchup_response('khmr', 'xyzzy') is None
+    matchup = knowledge.matchup_response('khmr', 'Briton')
+    assert matchup == render_matchup('khmer', DATA['khmer'], 'britons', DATA['britons'])
+    assert matchup.startswith("**Matchup: Khmer vs Britons**")
+
+
+def test_load_knowledge_cache():
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = os.path.join(directory, 'aoe2_data.json')
+        cache_path = os.path.join(directory, 'aoe2_data.cache')
+        with open(data_path, 'w') as f:
+            json.dump(DATA, f)
+
+        knowledge = load_knowledge(data_path)
+        assert os.path.exists(cache_path) and knowledge.resolve('khmr') == 'khmer'
+
+        # Same JSON hash: the cached object is returned as-is, without rebuilding
+        with open(data_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with open(cache_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, digest, 'cached sentinel'), f)
+        assert load_knowledge(data_path) == 'cached sentinel'
+
+        # Changed JSON: rebuilt and the cache rewritten
+        with open(data_path, 'w') as f:
+            json.dump(dict(DATA, franks={'bonuses': [], 'unique_units': ["Throwing Axeman"], 'hidden_stats': []}), f)
+        rebuilt = load_knowledge(data_path)
+        assert isinstance(rebuilt, CivKnowledge) and rebuilt.resolve('franks') == 'franks'
+        assert load_knowledge(data_path).resolve('frank') == 'franks'
+
+        # A corrupt cache file is ignored and replaced
+        with open(cache_path, 'wb') as f:
+            f.write(b'not a pickle')
+        assert load_knowledge(data_path).resolve('khmer') == 'khmer'
+
+
+if __name__ == "__main__":
+    test_resolve()
+    test_responses()
+    test_load_knowledge_cache()
+    print("PASS")
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+
+from llm_client import LLMClient
+
+# Checks the async completion layer against a local stub of the completions API:
+# concurrency stays bounded, identical prompts coalesce and cached prompts skip
+# the server entirely.
+
+
+class StubCompletionServer:
+    """Answers POST .../completions with the prompt echoed back after `delay` seconds"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+
+    @property
+    def api_base(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with stub.lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.peak_active = max(stub.peak_active, stub.active)
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.active -= 1
+
+                payload = json.dumps({
+                    "id": "cmpl-stub", "object": "text_completion", "model": body.get("model", "stub"),
+                    "choices": [{"text": f" stub: {body.get('prompt')}", "index": 0, "finish_reason": "stop"}],
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+async def run_checks(stub, max_concurrency=3):
+    openai.api_key = "stub-key"
+    llm = LLMClient(max_concurrency=max_concurrency, api_base=stub.api_base)
+    problems = []
+
+    # 20 users ask for the same lore at once: one request
+    answers = await asyncio.gather(*(llm.complete("Khmer lore", max_tokens=300) for _ in range(20)))
+    if stub.requests != 1 or len(set(answers)) != 1:
+        problems.append(f"coalescing: {stub.requests} requests, {len(set(answers))} distinct answers")
+
+    # Asked again later: served from the cache
+    await llm.complete("Khmer lore", max_tokens=300)
+    if stub.requests != 1:
+        problems.append(f"cache: {stub.requests} requests after a repeat prompt")
+
+    # Distinct uncached prompts never exceed the concurrency bound, and the loop stays responsive
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.ensure_future(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(llm.complete(f"scenario {i}", max_tokens=250, cache=False) for i in range(9)))
+    elapsed = time.perf_counter() - started
+    beat.cancel()
+
+    if stub.peak_active > max_concurrency:
+        problems.append(f"concurrency: {stub.peak_active} requests in flight, limit {max_concurrency}")
+    if ticks < elapsed / 0.01 * 0.5:
+        problems.append(f"event loop blocked: {ticks} heartbeats in {elapsed:.2f}s")
+
+    print(f"Requests: {stub.requests}, peak in flight: {stub.peak_active}, 9 uncached in {elapsed:.2f}s")
+    print(f"Stats: {llm.get_stats()}")
+    llm.close()
+    return problems
+
+
+def test_llm_client():
+    with StubCompletionServer() as stub:
+        assert asyncio.run(run_checks(stub)) == []
+
+
+if __name__ == "__main__":
+    with StubCompletionServer() as stub:
+        problems = asyncio.run(run_checks(stub))
+    for problem in problems:
+        print(f"  PROBLEM: {problem}")
+    print("PASS" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,100 @@
+import asyncio
+import sys
+
+from poll_on_going_games import MatchPoller
+
+# Checks match-start detection with an injected fetch: the first poll only
+# sets a baseline, later polls emit only newer match_ids oldest first to both
+# sync and async subscribers, and failures back off until a poll succeeds.
+
+
+def history(*match_ids):
+    # AoE2.net lists newest first
+    return [{'match_id': str(match_id), 'players': [{'name': f"p{match_id}"}]} for match_id in sorted(match_ids, reverse=True)]
+
+
+async def run_checks():
+    problems = []
+    feed = {11539183: history(100, 101)}
+    failing = set()
+
+    async def fetch(profile_id, count):
+        if profile_id in failing:
+            raise ConnectionError("aoe2.net unavailable")
+        return feed[profile_id]
+
+    poller = MatchPoller([11539183], min_interval=0, base_backoff=5, max_backoff=600, fetch=fetch)
+    received_sync, received_async = [], []
+    poller.subscribe(lambda profile_id, matches: received_sync.append((profile_id, [m['match_id'] for m in matches])))
+
+    async def on_matches(profile_id, matches):
+        await asyncio.sleep(0)
+        received_async.append((profile_id, [m['match_id'] for m in matches]))
+
+    poller.subscribe(on_matches)
+
+    # First poll: baseline only, so a restart doesn't announce old games
+    if await poller.poll_profile(11539183) != [] or received_sync or received_async:
+        problems.append(f"first poll emitted {received_sync}")
+    if poller.last_seen[11539183] != 101:
+        problems.append(f"baseline is {poller.last_seen}")
+
+    # Two new games: only those, oldest first, to both subscribers
+    feed[11539183] = history(100, 101, 102, 103)
+    await poller.poll_profile(11539183)
+    expected = [(11539183, ['102', '103'])]
+    if received_sync != expected or received_async != expected:
+        problems.append(f"new matches: sync {received_sync}, async {received_async}")
+
+    # Nothing new, or an older page, emits nothing
+    feed[11539183] = history(99, 100)
+    if await poller.poll_profile(11539183):
+        problems.append("re-emitted old matches")
+    if poller.diff(11539183, [{'match_id': None}, {}]) != []:
+        problems.append("matches without an id were emitted")
+
+    # A failing subscriber doesn't stop the others
+    poller.subscribe(lambda profile_id, matches: 1 / 0)
+    feed[11539183] = history(104)
+    await poller.poll_profile(11539183)
+    if received_async[-1] != (11539183, ['104']):
+        problems.append(f"subscriber failure blocked delivery: {received_async}")
+
+    # Backoff grows with consecutive failures (full jitter up to the cap) and resets after a success
+    if poller.next_delay(11539183) != poller.interval:
+        problems.append("delay without failures isn't the poll interval")
+    for failures, cap in ((1, 10), (3, 40), (10, 600)):
+        poller.failures[11539183] = failures
+        delays = [poller.next_delay(11539183) for _ in range(50)]
+        if not all(poller.base_backoff <= delay <= cap for delay in delays):
+            problems.append(f"{failures} failures: delays outside [5, {cap}]")
+
+    # Through the real loop: a failed poll counts, a good one clears it
+    poller.failures.clear()
+    poller.interval = 0.01
+    poller.base_backoff = poller.max_backoff = 0.01
+    failing.add(11539183)
+    poller.start()
+    await asyncio.sleep(0.1)
+    if poller.failures.get(11539183, 0) < 2:
+        problems.append(f"failures not counted: {poller.failures}")
+    failing.clear()
+    await asyncio.sleep(0.1)
+    await poller.stop()
+    if poller.failures.get(11539183) != 0 or poller.next_delay(11539183) != poller.interval:
+        problems.append(f"failures not reset after a success: {poller.failures}")
+    if poller.tasks:
+        problems.append("stop() left tasks behind")
+    return problems
+
+
+def test_match_poller():
+    assert asyncio.run(run_checks()) == []
+
+
+if __name__ == "__main__":
+    problems = asyncio.run(run_checks())
+    for problem in problems:
+        print(f"  PROBLEM: {problem}")
+    print("PASS" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,111 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+
+# Load test for per-guild music sessions. Runs without Discord: the voice
+# client and yt-dlp are fakes.
+
+from music_player import GuildSessions, MusicPlayer
+
+
+class FakeYoutubeDL:
+    """Resolves "guild-track" queries after a short random delay"""
+
+    def extract_info(self, query, download=False, process=True):
+        if not process:
+            return {'title': query}
+        time.sleep(random.uniform(0.01, 0.05))
+        return {'title': query, 'url': f'stream://{query}'}
+
+
+class FakeVoiceClient:
+    """Plays each source for a fixed time on its own thread, like discord's audio player"""
+
+    def __init__(self, track_seconds):
+        self.track_seconds = track_seconds
+        self.played = []
+        self.connected = True
+        self._stop = threading.Event()
+        self._playing = False
+
+    def is_playing(self):
+        return self._playing
+
+    def is_connected(self):
+        return self.connected
+
+    def play(self, source, after=None):
+        if self.is_playing():
+            raise RuntimeError('Already playing audio.')
+        self.played.append(source)
+        self._stop.clear()
+        self._playing = True
+
+        def run():
+            self._stop.wait(self.track_seconds)
+            # discord.py marks the player finished before calling after()
+            self._playing = False
+            after(None)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    async def disconnect(self):
+        self.connected = False
+
+
+async def simulate_guilds(guilds=50, tracks_per_guild=4, track_seconds=0.05, idle_timeout=0.3):
+    """Every guild queues its own tracks at once; check nothing leaks between guilds"""
+    sessions = GuildSessions(
+        lambda: MusicPlayer(FakeYoutubeDL(), {}, prefetch=2, source_factory=lambda url: url),
+        idle_timeout=idle_timeout
+    )
+    voice_clients = {guild_id: FakeVoiceClient(track_seconds) for guild_id in range(guilds)}
+
+    async def guild_activity(guild_id):
+        await asyncio.sleep(random.random() * 0.2)
+        player = sessions.get(guild_id).player
+        for i in range(tracks_per_guild):
+            await player.enqueue(f'{guild_id}-{i}')
+            await player.start(voice_clients[guild_id])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(guild_activity(guild_id) for guild_id in range(guilds)))
+    peak = sessions.get_stats()
+
+    # Long enough for every queue to drain and every idle timer to fire
+    await asyncio.sleep(tracks_per_guild * track_seconds + idle_timeout + 1.0)
+    elapsed = time.perf_counter() - started
+
+    problems = []
+    for guild_id, voice_client in voice_clients.items():
+        expected = [f'stream://{guild_id}-{i}' for i in range(tracks_per_guild)]
+        if voice_client.played != expected:
+            problems.append(f"guild {guild_id} played {voice_client.played}")
+        if voice_client.connected:
+            problems.append(f"guild {guild_id} still connected after idling")
+
+    stats = sessions.get_stats()
+    if stats['active'] or stats['evicted'] != guilds:
+        problems.append(f"sessions left behind: {stats}")
+
+    print(f"{guilds} guilds x {tracks_per_guild} tracks in {elapsed:.2f}s")
+    print(f"Peak sessions: {peak}")
+    print(f"Final sessions: {stats}")
+    for problem in problems[:10]:
+        print(f"  PROBLEM: {problem}")
+    return not problems
+
+
+def test_music_sessions():
+    assert asyncio.run(simulate_guilds())
+
+
+if __name__ == "__main__":
+    ok = asyncio.run(simulate_guilds(guilds=int(sys.argv[1]) if len(sys.argv) > 1 else 50))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+from profile_cache import AoE2NetClient, TTLCache
+
+# Checks the AoE2.net caching layer without the network: concurrent lookups
+# of one key share a fetch, entries expire and are evicted LRU-first, disk
+# writes are batched, and a restart starts warm from the file.
+
+
+async def run_checks(directory):
+    problems = []
+    calls = []
+
+    def fetcher(key, value=None, delay=0.05):
+        async def fetch():
+            calls.append(key)
+            await asyncio.sleep(delay)
+            return value if value is not None else f"value-{key}"
+        return fetch
+
+    # Ten concurrent lookups of one key: one fetch, everyone gets the value
+    cache = TTLCache(ttl=60, max_entries=2)
+    values = await asyncio.gather(*(cache.get('a', fetcher('a')) for _ in range(10)))
+    if calls != ['a'] or set(values) != {'value-a'}:
+        problems.append(f"coalescing: fetched {calls}, got {set(values)}")
+    if cache.stats['misses'] != 1 or cache.stats['coalesced'] != 9:
+        problems.append(f"coalescing stats: {cache.stats}")
+
+    # LRU eviction at max_entries: touching a makes b the oldest
+    await cache.get('b', fetcher('b'))
+    await cache.get('a', fetcher('a'))
+    await cache.get('c', fetcher('c'))
+    if list(cache.entries) != ['a', 'c']:
+        problems.append(f"eviction kept {list(cache.entries)}")
+
+    # TTL expiry
+    calls.clear()
+    short = TTLCache(ttl=0.1)
+    await short.get('x', fetcher('x'))
+    await short.get('x', fetcher('x'))
+    await asyncio.sleep(0.2)
+    await short.get('x', fetcher('x'))
+    if calls != ['x', 'x'] or short.stats['hits'] != 1:
+        problems.append(f"expiry: fetched {calls}, stats {short.stats}")
+
+    # Misses schedule one batched write; a new cache on the same file starts warm
+    path = os.path.join(directory, 'profile_cache.json')
+    on_disk = TTLCache(ttl=60, disk_path=path, save_delay=0.1)
+    await asyncio.gather(*(on_disk.get(str(i), fetcher(str(i), delay=0)) for i in range(5)))
+    if os.path.exists(path):
+        problems.append("cache written before save_delay")
+    await asyncio.sleep(0.3)
+    if on_disk.stats['saves'] != 1:
+        problems.append(f"expected one batched save: {on_disk.stats}")
+    calls.clear()
+    warm = TTLCache(ttl=60, disk_path=path)
+    if await warm.get('3', fetcher('3')) != 'value-3' or calls:
+        problems.append(f"reload wasn't warm: fetched {calls}")
+
+    # The client shares fetches per profile and refreshes match histories on request
+    requests = []
+
+    async def fake_get_json(endpoint, **params):
+        requests.append(endpoint)
+        await asyncio.sleep(0.05)
+        if endpoint == "player/profile":
+            return {'name': 'Hera', 'country': 'CA', 'games': 10, 'wins': 7, 'losses': 3,
+                    'win_rate': 0.7, 'favorite_civ': 'Mayans'}
+        return [{'match_id': len(requests)}]
+
+    client_path = os.path.join(directory, 'client_cache.json')
+    client = AoE2NetClient(disk_path=client_path)
+    client._get_json = fake_get_json
+    profiles = await asyncio.gather(*(client.get_player_profile(199325) for _ in range(5)))
+    if requests != ["player/profile"] or profiles[0]['name'] != 'Hera':
+        problems.append(f"profile requests: {requests}")
+    first = await client.get_match_history(199325, count=5)
+    cached = await client.get_match_history(199325, count=5)
+    fresh = await client.get_match_history(199325, count=5, refresh=True)
+    if first != cached or fresh == first:
+        problems.append(f"match history caching: {first} {cached} {fresh}")
+    await client.close()
+    if '199325' not in AoE2NetClient(disk_path=client_path).profiles.entries:
+        problems.append("close() didn't save the profile cache")
+
+    print(f"Stats: {cache.stats}, client {client.get_stats()}")
+    return problems
+
+
+def run_all():
+    with tempfile.TemporaryDirectory() as directory:
+        return asyncio.run(run_checks(directory))
+
+
+def test_profile_cache():
+    assert run_all() == []
+
+
+if __name__ == "__main__":
+    problems = run_all()
+    for problem in problems:
+        print(f"  PROBLEM: {problem}")
+    print("PASS" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
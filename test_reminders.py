@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+from reminders import ReminderScheduler, ReminderLimitError
+
+# Checks the shared reminder timer: per-user/channel limits and the minimum
+# interval, cancelling (owner only), resuming pending reminders from disk
+# after a restart, and surviving a reminders.json that can't be written.
+
+
+async def run_checks(path):
+    sent = []
+
+    async def send(channel_id, text):
+        sent.append((channel_id, text))
+
+    problems = []
+    scheduler = ReminderScheduler(send, path=path, max_per_user=2, max_per_channel=3, min_interval=0.05)
+    scheduler.start()
+
+    # Limits and the minimum interval
+    for bad_interval in (0, -60, 0.01):
+        try:
+            scheduler.add(1, 100, ["tip"], bad_interval)
+            problems.append(f"interval {bad_interval} accepted")
+        except ReminderLimitError:
+            pass
+    first = scheduler.add(1, 100, ["a1", "a2", "a3"], 0.1)
+    scheduler.add(1, 100, ["b1"], 0.1)
+    try:
+        scheduler.add(1, 100, ["c1"], 0.1)
+        problems.append("per-user limit not enforced")
+    except ReminderLimitError:
+        pass
+    scheduler.add(2, 100, ["d1", "d2"], 0.1)
+    try:
+        scheduler.add(3, 100, ["e1"], 0.1)
+        problems.append("per-channel limit not enforced")
+    except ReminderLimitError:
+        pass
+
+    # Only the owner can cancel; a cancelled reminder sends nothing more
+    await asyncio.sleep(0.05)
+    if scheduler.cancel(first.reminder_id, user_id=2):
+        problems.append("another user cancelled a reminder")
+    if not scheduler.cancel(first.reminder_id, user_id=1):
+        problems.append("owner couldn't cancel")
+    await asyncio.sleep(0.3)
+    texts = sorted(text for _, text in sent)
+    if texts != ["a1", "b1", "d1", "d2"]:
+        problems.append(f"sent {texts}")
+    if scheduler.reminders or scheduler.per_user or scheduler.per_channel:
+        problems.append(f"finished reminders still tracked: {scheduler.reminders}")
+
+    # A long reminder survives a restart and keeps its place
+    long_running = scheduler.add(1, 200, ["l1", "l2", "l3"], 0.2)
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+    sent.clear()
+
+    restarted = ReminderScheduler(send, path=path, max_per_user=2, max_per_channel=3, min_interval=0.05)
+    restarted.start()
+    reloaded = restarted.reminders.get(long_running.reminder_id)
+    if reloaded is None or reloaded.index != 1:
+        problems.append(f"reload lost the reminder: {restarted.reminders}")
+    if restarted.add(2, 300, ["x"], 1).reminder_id <= long_running.reminder_id:
+        problems.append("reminder ids restarted after reload")
+    await asyncio.sleep(0.6)
+    await restarted.stop()
+    if [text for channel_id, text in sent if channel_id == 200] != ["l2", "l3"]:
+        problems.append(f"resumed reminder sent {sent}")
+
+    print(f"Stats: {scheduler.stats} then {restarted.stats}")
+
+    # The save directory is missing: adding still works, the timer keeps firing and retries the write
+    sent.clear()
+    unwritable = os.path.join(os.path.dirname(path), 'missing', 'reminders.json')
+    failing = ReminderScheduler(send, path=unwritable, min_interval=0.05, save_retry=0.1)
+    failing.add(1, 400, ["before start"], 0.1)
+    failing.start()
+    failing.add(1, 400, ["f1", "f2"], 0.1)
+    await asyncio.sleep(0.3)
+    if failing.task.done():
+        problems.append("timer task died on a failed save")
+    os.makedirs(os.path.dirname(unwritable))
+    await asyncio.sleep(0.3)
+    if not failing.stats["save_errors"] or failing.dirty or not os.path.exists(unwritable):
+        problems.append(f"failed save never retried: {failing.stats}")
+    await failing.stop()
+    if sorted(text for _, text in sent) != ["before start", "f1", "f2"]:
+        problems.append(f"with failing saves sent {sent}")
+    return problems
+
+
+def run_all():
+    with tempfile.TemporaryDirectory() as directory:
+        return asyncio.run(run_checks(os.path.join(directory, 'reminders.json')))
+
+
+def test_reminders():
+    assert run_all() == []
+
+
+if __name__ == "__main__":
+    problems = run_all()
+    for problem in problems:
+        print(f"  PROBLEM: {problem}")
+    print("PASS" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import time
+
+from track_cache import DEFAULT_STREAM_TTL, TrackCache, stream_expiry, video_id_from
+
+# Checks the resolved-track cache behind !play and !cachestats: stream expiry
+# parsing and the safety margin, LRU eviction, the hit/miss/expired counters,
+# and the batched JSON file surviving a reload.
+
+
+def fake_info(video_id, expires_in=3600, title=None):
+    """What yt-dlp's extract_info returns for one video, trimmed to the fields the cache keeps"""
+    expire = int(time.time() + expires_in)
+    return {'id': video_id, 'title': title or f"Track {video_id}", 'duration': 180,
+            'url': f"https://rr1---sn.googlevideo.com/videoplayback?expire={expire}&itag=251&id={video_id}"}
+
+
+def test_stream_expiry():
+    assert stream_expiry("https://rr1.googlevideo.com/videoplayback?itag=251&expire=1700000000&ei=x") == 1700000000
+    assert stream_expiry("https://example.com/audio.webm", now=1000) == 1000 + DEFAULT_STREAM_TTL
+    assert stream_expiry("https://example.com/audio.webm?expire=soon", now=1000) == 1000 + DEFAULT_STREAM_TTL
+    assert video_id_from("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10") == "dQw4w9WgXcQ"
+    assert video_id_from("https://youtu.be/dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+    assert video_id_from("https://example.com/watch?v=dQw4w9WgXcQ") is None
+
+
+def test_lookups_and_eviction():
+    cache = TrackCache(path=None, max_entries=2, expiry_margin=120)
+
+    assert cache.get('aaaaaaaaaaa') is None
+    cache.put(fake_info('aaaaaaaaaaa'))
+    assert cache.get('aaaaaaaaaaa')['title'] == "Track aaaaaaaaaaa"
+
+    # Inside the safety margin counts as expired and is dropped
+    cache.put(fake_info('bbbbbbbbbbb', expires_in=60))
+    assert cache.peek('bbbbbbbbbbb') is None
+    assert cache.get('bbbbbbbbbbb') is None
+    assert 'bbbbbbbbbbb' not in cache.entries
+
+    # peek() neither counts nor refreshes LRU order
+    cache.put(fake_info('ccccccccccc'))
+    assert cache.peek('aaaaaaaaaaa') is not None
+    cache.put(fake_info('ddddddddddd'))
+    assert list(cache.entries) == ['ccccccccccc', 'ddddddddddd']
+
+    # get() does refresh it: c is now the newest, so d goes next
+    cache.get('ccccccccccc')
+    cache.put(fake_info('eeeeeeeeeee'))
+    assert list(cache.entries) == ['ccccccccccc', 'eeeeeeeeeee']
+
+    stats = cache.get_stats()
+    assert stats == {'hits': 2, 'misses': 1, 'expired': 1, 'evictions': 2, 'size': 2, 'hit_rate': 0.5}, stats
+
+
+def test_persistence():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'track_cache.json')
+        cache = TrackCache(path, max_entries=10, save_delay=0.1)
+        for video_id in ('aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc'):
+            cache.put(fake_info(video_id))
+        cache.put(fake_info('ddddddddddd', expires_in=150))
+        cache.get('aaaaaaaaaaa')
+
+        # The puts are written together once, after save_delay
+        assert not os.path.exists(path)
+        time.sleep(0.3)
+        with open(path) as f:
+            assert [entry['id'] for entry in json.load(f)] == ['bbbbbbbbbbb', 'ccccccccccc', 'ddddddddddd', 'aaaaaaaaaaa']
+
+        # flush() writes immediately, e.g. on shutdown
+        cache.put(fake_info('eeeeeeeeeee'))
+        cache.flush()
+        assert cache.save_timer is None
+
+        # A reload keeps LRU order and drops what expires within the (larger) margin
+        reloaded = TrackCache(path, max_entries=3, expiry_margin=200)
+        assert list(reloaded.entries) == ['ccccccccccc', 'aaaaaaaaaaa', 'eeeeeeeeeee']
+        assert reloaded.get('eeeeeeeeeee')['url'] == cache.peek('eeeeeeeeeee')['url']
+
+
+if __name__ == "__main__":
+    test_stream_expiry()
+    test_lookups_and_eviction()
+    test_persistence()
+    print("PASS")
@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+# Used when a stream URL doesn't say when it expires
+DEFAULT_STREAM_TTL = 3600
+
+YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+# Function to get the canonical YouTube video ID from a URL or bare ID, or None
+def video_id_from(query):
+    if YOUTUBE_ID.match(query):
+        return query
+    parts = urlsplit(query)
+    host = parts.netloc.lower()
+    if host.endswith('youtu.be'):
+        candidate = parts.path.strip('/')
+    elif 'youtube.com' in host:
+        if parts.path.startswith(('/shorts/', '/embed/', '/live/')):
+            candidate = parts.path.split('/')[2]
+        else:
+            candidate = parse_qs(parts.query).get('v', [''])[0]
+    else:
+        return None
+    return candidate if YOUTUBE_ID.match(candidate) else None
+
+
+# Function to read the expiry out of a signed stream URL (googlevideo puts it in expire=)
+def stream_expiry(url, now=None):
+    expire = parse_qs(urlsplit(url).query).get('expire')
+    if expire and expire[0].isdigit():
+        return int(expire[0])
+    return (now or time.time()) + DEFAULT_STREAM_TTL
+
+
+class TrackCache:
+    """LRU cache of resolved track metadata keyed by video ID, persisted as JSON.
+
+    Entries keep the title, duration and direct stream URL. A lookup after the
+    stream URL's signed expiry (minus a safety margin) counts as expired and
+    the track is resolved again. Writes to disk are batched: a put() schedules
+    one write `save_delay` seconds later, done outside the lock.
+    """
+
+    def __init__(self, path='track_cache.json', max_entries=500, expiry_margin=120, save_delay=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.expiry_margin = expiry_margin
+        self.save_delay = save_delay
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self.lock = threading.Lock()  # tracks are resolved from a thread pool
+        self.save_lock = threading.Lock()  # one file write at a time, never under self.lock
+        self.save_timer = None
+        self._load()
+
+    def get(self, video_id):
+        with self.lock:
+            entry = self.entries.get(video_id)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry['expires_at'] - self.expiry_margin <= time.time():
+                del self.entries[video_id]
+                self.stats['expired'] += 1
+                return None
+            self.entries.move_to_end(video_id)
+            self.stats['hits'] += 1
+            return dict(entry)
+
+    def peek(self, video_id):
+        """Like get() but without touching the stats or LRU order"""
+        with self.lock:
+            entry = self.entries.get(video_id)
+            if entry is None or entry['expires_at'] - self.expiry_margin <= time.time():
+                return None
+            return dict(entry)
+
+    def put(self, info):
+        """Store an extract_info result; returns the cached entry"""
+        entry = {
+            'id': info['id'],
+            'title': info.get('title'),
+            'duration': info.get('duration'),
+            'url': info['url'],
+            'expires_at': stream_expiry(info['url']),
+        }
+        with self.lock:
+            self.entries[entry['id']] = entry
+            self.entries.move_to_end(entry['id'])
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+            self._schedule_save()
+        return dict(entry)
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses'] + self.stats['expired']
+            hit_rate = self.stats['hits'] / lookups if lookups else 0.0
+            return dict(self.stats, size=len(self.entries), hit_rate=round(hit_rate, 3))
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable track cache {self.path}: {e}")
+            return
+        now = time.time()
+        for entry in stored:
+            if entry.get('expires_at', 0) - self.expiry_margin > now:
+                self.entries[entry['id']] = entry
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _schedule_save(self):
+        # Called with self.lock held
+        if not self.path or self.save_timer is not None:
+            return
+        self.save_timer = threading.Timer(self.save_delay, self.flush)
+        self.save_timer.daemon = True
+        self.save_timer.start()
+
+    def flush(self):
+        """Write the cache now (the batched save timer calls this too)"""
+        if not self.path:
+            return
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+            # Oldest first so LRU order survives a restart
+            snapshot = list(self.entries.values())
+        with self.save_lock:
+            tmp_path = self.path + '.tmp'
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Couldn't write track cache {self.path}: {e}")